@@ -2,12 +2,16 @@
 오라클 정확성 및 합의도 분석 모듈
 
 디코딩된 UMA/Kleros 데이터를 분석하여 build_site.py에서 사용할 dict 생성.
+
+실행 (저장소 루트): python -m analysis.accuracy
 """
 
 from pathlib import Path
 import pandas as pd
 import numpy as np
 
+from analysis.market_links import load_uma_market_requests
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 
 
@@ -40,7 +44,7 @@ def analyze_polymarket_resolved() -> dict:
     high_vol_res = high_vol["resolution"].value_counts().to_dict() if not high_vol.empty else {}
     low_vol_res = low_vol["resolution"].value_counts().to_dict() if not low_vol.empty else {}
 
-    return {
+    result = {
         "total_resolved": total,
         "resolution_distribution": {k: int(v) for k, v in res_counts.items()},
         "yes_count": yes_count,
@@ -55,6 +59,20 @@ def analyze_polymarket_resolved() -> dict:
         "median_volume": float(vol_median),
     }
 
+    # UMA DVM 투표까지 간(분쟁) 마켓 — uma_market_links 조인 인덱스로 연결
+    linked = load_uma_market_requests(columns=["round_id", "ancillary_key"])
+    if not linked.empty:
+        disputed = df[df["id"].astype(str).isin(linked["market_id"])]
+        disputed_res = disputed["resolution"].value_counts().to_dict()
+        result["uma_disputed"] = {
+            "markets": len(disputed),
+            "dvm_requests": len(linked),
+            "resolution_distribution": {k: int(v) for k, v in disputed_res.items()},
+            "total_volume": float(disputed["volume"].sum()),
+        }
+
+    return result
+
 
 def analyze_uma_disputes() -> dict:
     """UMA 분쟁 해결 분석"""
@@ -107,16 +125,19 @@ def analyze_uma_disputes() -> dict:
             "unresolvable_count": int(label_counts.get("Unresolvable", 0)),
         }
 
+        # 투표자 수 / 합의 강도 통계는 공개된 투표가 있는 요청만 (투표 없는 요청은 0)
+        voted = yesno[yesno["num_voters"] > 0] if "num_voters" in yesno.columns else yesno
+
         # 투표자 수 통계
-        if "num_voters" in yesno.columns:
-            voters = yesno["num_voters"].dropna()
+        if "num_voters" in yesno.columns and not voted.empty:
+            voters = voted["num_voters"]
             yesno_stats["avg_voters"] = round(float(voters.mean()), 1)
             yesno_stats["min_voters"] = int(voters.min())
             yesno_stats["max_voters"] = int(voters.max())
 
         # 합의 강도 통계
-        if "consensus_rate" in yesno.columns:
-            cons = yesno["consensus_rate"].dropna()
+        if "consensus_rate" in yesno.columns and not voted.empty:
+            cons = voted["consensus_rate"].dropna()
             yesno_stats["avg_consensus"] = round(float(cons.mean()), 4)
             yesno_stats["min_consensus"] = round(float(cons.min()), 4)
             # 만장일치 비율
@@ -137,32 +158,18 @@ def analyze_uma_disputes() -> dict:
         # Unresolvable 케이스 상세 정보
         unresolvable_cases = yesno[yesno["resolution_label"] == "Unresolvable"].copy()
         if not unresolvable_cases.empty:
+            # ancillary_data 파싱 결과 (uma_ancillary, ancillary_key로 조인)
+            ancillary_path = DATA_DIR / "uma_ancillary.parquet"
+            if "ancillary_key" in unresolvable_cases.columns and ancillary_path.exists():
+                ancillary_df = pd.read_parquet(ancillary_path, columns=["ancillary_key", "title", "description"])
+                unresolvable_cases = unresolvable_cases.merge(ancillary_df, on="ancillary_key", how="left")
+
             unresolvable_list = []
             for _, row in unresolvable_cases.iterrows():
-                # ancillary_data에서 정보 추출
-                ancillary = str(row.get("ancillary_data", ""))
-                title = "Unknown"
-                description = ""
-
-                if "title:" in ancillary:
-                    try:
-                        title_start = ancillary.index("title:") + 6
-                        title_end = ancillary.find(",", title_start)
-                        if title_end == -1:
-                            title_end = ancillary.find("description:", title_start)
-                        if title_end == -1:
-                            title_end = min(title_start + 200, len(ancillary))
-                        title = ancillary[title_start:title_end].strip()
-                    except Exception:
-                        title = ancillary[:100] if ancillary else "Unknown"
-
-                if "description:" in ancillary:
-                    try:
-                        desc_start = ancillary.index("description:") + 12
-                        desc_end = min(desc_start + 300, len(ancillary))
-                        description = ancillary[desc_start:desc_end].strip()
-                    except Exception:
-                        pass
+                title = row.get("title")
+                title = title if isinstance(title, str) else "Unknown"
+                description = row.get("description")
+                description = description[:300] if isinstance(description, str) else ""
 
                 # Unresolvable 이유 자동 판단
                 reason = "Unknown"
@@ -212,6 +219,7 @@ def analyze_uma_disputes() -> dict:
 
     if "num_voters" in req_df.columns:
         voters = req_df["num_voters"].dropna()
+        voters = voters[voters > 0]
         overall_stats["avg_voters_per_request"] = round(float(voters.mean()), 1)
 
     # 투표자 재참여율 분석
@@ -425,6 +433,8 @@ def main():
         print(f"  Yes 해결: {pm['yes_count']} ({pm['yes_ratio']}%)")
         print(f"  No 해결: {pm['no_count']} ({pm['no_ratio']}%)")
         print(f"  Unknown: {pm['unknown_count']}")
+        if "uma_disputed" in pm:
+            print(f"  UMA DVM 분쟁 마켓: {pm['uma_disputed']['markets']} (요청 {pm['uma_disputed']['dvm_requests']})")
         print()
 
     # UMA
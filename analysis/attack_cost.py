@@ -0,0 +1,203 @@
+"""
+UMA 투표 매수(vote-buying) 공격 비용 분석
+
+uma_decoded_votes의 모든 가격 요청(라운드 × 요청)에 대해, 공개된 투표 결과를 뒤집는 데
+필요한 최소 토큰 가중치를 구하고 토큰 가격으로 비용을 환산해 연결된 Polymarket 마켓 거래량과 비교한다.
+
+DVM은 공개된 토큰의 SPAT(기본 65%) 이상이 같은 가격에 투표해야 해결된다. 공격 목표 가격은
+2위 선택지(선택지가 하나면 새 가격)이고, 비용은 두 가지로 본다.
+- flip_tokens: 새 토큰을 추가해 목표 가격을 SPAT로 올리는 데 필요한 토큰
+  (T_alt + x ≥ spat·(T + x) → x = (spat·T − T_alt) / (1 − spat))
+- bribe_tokens: 기존 유권자 표를 사서 목표 가격으로 옮기는 데 필요한 토큰 (spat·T − T_alt),
+  bribe_voters: 목표 가격이 아닌 유권자 중 큰 순서로 매수할 때 필요한 최소 유권자 수
+
+모든 요청을 (요청, 가격) 그룹 합 한 번과 요청 내 정렬 누적합으로 계산 (요청 단위 Python 루프 없음).
+결과: data/uma_attack_surface.parquet (cost_to_volume 오름차순 = 거래량 대비 싼 공격 순)
+
+실행 (저장소 루트): python -m analysis.attack_cost [--token-price P] [--spat S]
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analysis.market_links import LINKS_PATH
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# DVM 2.0 schelling point 임계값 (공개 토큰 중 같은 가격 비율)
+SPAT = 0.65
+# UMA 토큰 가격 가정 (USD) — --token-price로 변경
+DEFAULT_TOKEN_PRICE = 2.0
+
+REQUEST_COLUMNS = ["round_id", "identifier", "request_time", "ancillary_key"]
+ATTACK_COLUMNS = [
+    *REQUEST_COLUMNS, "voters", "total_tokens", "winning_price", "winning_share",
+    "runner_up_price", "runner_up_tokens", "flip_tokens", "bribe_tokens", "bribe_voters",
+    "flip_cost_usd", "bribe_cost_usd", "market_id", "market_volume", "cost_to_volume",
+]
+
+
+def attack_costs(votes_df: pd.DataFrame, token_price: float = DEFAULT_TOKEN_PRICE, spat: float = SPAT) -> pd.DataFrame:
+    """요청별 최소 공격 토큰/비용 (market 컬럼 제외)
+
+    Args:
+        votes_df: uma_decoded_votes (round_id, identifier, timestamp, ancillary_key, voter, voted_price, num_tokens)
+        token_price: 토큰당 USD
+        spat: 해결에 필요한 같은 가격 토큰 비율
+
+    Returns:
+        REQUEST_COLUMNS + voters, total_tokens, winning_price, winning_share, runner_up_price (없으면 NaN),
+        runner_up_tokens, flip_tokens, bribe_tokens, bribe_voters, flip_cost_usd, bribe_cost_usd
+    """
+    votes = votes_df.rename(columns={"timestamp": "request_time"})
+    votes = votes[votes["num_tokens"] > 0]
+    grouper = votes.groupby(REQUEST_COLUMNS, sort=True, dropna=False)
+    request = grouper.ngroup().to_numpy()
+    result = grouper.size().index.to_frame(index=False)
+    n_requests = len(result)
+
+    # 가격 선택지별 토큰 합 → 요청 안 토큰 내림차순 순위 (0 = 다수 가격, 1 = 2위 = 공격 목표)
+    frame = pd.DataFrame({
+        "request": request,
+        "voted_price": votes["voted_price"].to_numpy(dtype=float),
+        "num_tokens": votes["num_tokens"].to_numpy(dtype=float),
+    })
+    choices = frame.groupby(["request", "voted_price"], sort=False)["num_tokens"].sum().reset_index()
+    choices = choices.sort_values(["request", "num_tokens"], ascending=[True, False], kind="stable")
+    choices["rank"] = choices.groupby("request", sort=False).cumcount()
+
+    total = np.bincount(request, weights=frame["num_tokens"].to_numpy(), minlength=n_requests)
+    first = choices[choices["rank"] == 0]
+    second = choices[choices["rank"] == 1]
+    winning_price = np.full(n_requests, np.nan)
+    winning_tokens = np.zeros(n_requests)
+    runner_up_price = np.full(n_requests, np.nan)
+    runner_up_tokens = np.zeros(n_requests)
+    winning_price[first["request"]] = first["voted_price"]
+    winning_tokens[first["request"]] = first["num_tokens"]
+    runner_up_price[second["request"]] = second["voted_price"]
+    runner_up_tokens[second["request"]] = second["num_tokens"]
+
+    need = np.maximum(spat * total - runner_up_tokens, 0.0)
+
+    # 매수 대상: 목표 가격(2위)이 아닌 표를 토큰 내림차순으로, 직전 누적합이 need 미만인 표 수
+    rank = frame.merge(choices[["request", "voted_price", "rank"]], on=["request", "voted_price"], how="left")["rank"]
+    buyable = frame[rank.to_numpy() != 1].sort_values(["request", "num_tokens"], ascending=[True, False], kind="stable")
+    bought_before = buyable.groupby("request", sort=False)["num_tokens"].cumsum() - buyable["num_tokens"]
+    bribed = bought_before.to_numpy() < need[buyable["request"].to_numpy()]
+    bribe_voters = np.bincount(buyable["request"].to_numpy(), weights=bribed, minlength=n_requests)
+
+    flip_tokens = need / (1 - spat)
+    result["voters"] = np.bincount(request, minlength=n_requests)
+    result["total_tokens"] = total
+    result["winning_price"] = winning_price
+    result["winning_share"] = np.round(np.divide(winning_tokens, total, out=np.zeros(n_requests), where=total > 0), 4)
+    result["runner_up_price"] = runner_up_price
+    result["runner_up_tokens"] = runner_up_tokens
+    result["flip_tokens"] = flip_tokens
+    result["bribe_tokens"] = need
+    result["bribe_voters"] = np.where(need > 0, bribe_voters, 0).astype(int)
+    result["flip_cost_usd"] = np.round(flip_tokens * token_price, 2)
+    result["bribe_cost_usd"] = np.round(need * token_price, 2)
+    return result
+
+
+def attach_market_volume(attack_df: pd.DataFrame) -> pd.DataFrame:
+    """ancillary_key → uma_market_links → polymarket_resolved 거래량 조인, cost_to_volume 추가
+
+    cost_to_volume = flip_cost_usd / market_volume (1 미만이면 마켓 거래량보다 싼 공격).
+    연결된 마켓이 없으면 market 컬럼과 cost_to_volume은 NaN.
+    """
+    markets_path = DATA_DIR / "polymarket_resolved.parquet"
+    attack_df = attack_df.copy()
+    if LINKS_PATH.exists() and markets_path.exists():
+        links = pd.read_parquet(LINKS_PATH, columns=["ancillary_key", "market_id"]).dropna(subset=["market_id"])
+        markets = pd.read_parquet(markets_path, columns=["id", "volume"])
+        volume = pd.Series(markets["volume"].to_numpy(dtype=float), index=markets["id"].astype(str)).groupby(level=0).first()
+        market_id = attack_df["ancillary_key"].map(links.drop_duplicates("ancillary_key").set_index("ancillary_key")["market_id"])
+        attack_df["market_id"] = market_id
+        attack_df["market_volume"] = market_id.map(volume).astype(float)
+    else:
+        attack_df["market_id"] = None
+        attack_df["market_volume"] = np.nan
+
+    volume = attack_df["market_volume"].to_numpy(dtype=float)
+    attack_df["cost_to_volume"] = np.round(
+        np.divide(attack_df["flip_cost_usd"].to_numpy(), volume, out=np.full(len(volume), np.nan), where=volume > 0), 6,
+    )
+    return attack_df
+
+
+def build_attack_surface(votes_df: pd.DataFrame, token_price: float = DEFAULT_TOKEN_PRICE, spat: float = SPAT) -> pd.DataFrame:
+    """요청별 공격 비용 + 마켓 거래량, cost_to_volume → flip_cost_usd 오름차순 (NaN은 뒤)"""
+    attack_df = attach_market_volume(attack_costs(votes_df, token_price=token_price, spat=spat))
+    attack_df = attack_df.sort_values(["cost_to_volume", "flip_cost_usd"], na_position="last", kind="stable")
+    return attack_df[ATTACK_COLUMNS].reset_index(drop=True)
+
+
+def analyze_attack_surface(token_price: float = DEFAULT_TOKEN_PRICE, spat: float = SPAT) -> dict:
+    """공격 비용 테이블 생성/저장 후 대시보드용 요약
+
+    Returns:
+        dict with token_price, spat, requests, rounds, median_flip_cost, median_bribe_voters,
+        linked_requests, cheaper_than_volume, cheapest (cost_to_volume 상위 10건)
+    """
+    votes_path = DATA_DIR / "uma_decoded_votes.parquet"
+    if not votes_path.exists():
+        return {}
+    votes_df = pd.read_parquet(
+        votes_path, columns=["round_id", "identifier", "timestamp", "ancillary_key", "voter", "voted_price", "num_tokens"],
+    )
+    attack_df = build_attack_surface(votes_df, token_price=token_price, spat=spat)
+    if attack_df.empty:
+        return {}
+    attack_df.to_parquet(DATA_DIR / "uma_attack_surface.parquet", index=False)
+
+    linked = attack_df[attack_df["market_volume"].notna()]
+    return {
+        "token_price": token_price,
+        "spat": spat,
+        "requests": len(attack_df),
+        "rounds": int(attack_df["round_id"].nunique()),
+        "median_flip_cost": round(float(attack_df["flip_cost_usd"].median()), 2),
+        "median_bribe_voters": float(attack_df["bribe_voters"].median()),
+        "linked_requests": len(linked),
+        "cheaper_than_volume": int((linked["cost_to_volume"] < 1).sum()),
+        "cheapest": linked.head(10)[
+            ["round_id", "identifier", "market_id", "voters", "flip_cost_usd", "bribe_voters", "market_volume", "cost_to_volume"]
+        ].to_dict("records"),
+    }
+
+
+def main(token_price: float = DEFAULT_TOKEN_PRICE, spat: float = SPAT):
+    print("=== UMA 투표 매수 공격 비용 분석 ===\n")
+
+    result = analyze_attack_surface(token_price=token_price, spat=spat)
+    if not result:
+        print("uma_decoded_votes 데이터가 없습니다. 먼저 `python -m collectors.uma_decoder`를 실행하세요.")
+        return
+
+    print(f"토큰 가격 ${result['token_price']}, SPAT {result['spat']:.0%}")
+    print(f"요청: {result['requests']} ({result['rounds']} rounds)")
+    print(f"  뒤집기 비용 중앙값: ${result['median_flip_cost']:,.0f}")
+    print(f"  매수 필요 유권자 중앙값: {result['median_bribe_voters']:.0f}")
+    print(f"마켓 연결 요청: {result['linked_requests']} (거래량보다 싼 공격 {result['cheaper_than_volume']}건)")
+
+    print(f"\n거래량 대비 가장 싼 공격:")
+    for m in result["cheapest"]:
+        print(f"  Round {m['round_id']} {m['identifier']} → {m['market_id']}: "
+              f"${m['flip_cost_usd']:,.0f} / ${m['market_volume']:,.0f} ({m['cost_to_volume']:.2%})")
+
+    print(f"\nSaved: {DATA_DIR / 'uma_attack_surface.parquet'}")
+    print("\n=== 분석 완료 ===")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(
+        token_price=float(args[args.index("--token-price") + 1]) if "--token-price" in args else DEFAULT_TOKEN_PRICE,
+        spat=float(args[args.index("--spat") + 1]) if "--spat" in args else SPAT,
+    )
@@ -14,6 +14,15 @@ from scipy.special import expit
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+BIN_EDGES = np.arange(0, 1.1, 0.1)  # 0, 0.1, 0.2, ..., 1.0
+BIN_MIDS = (BIN_EDGES[:-1] + BIN_EDGES[1:]) / 2  # 0.05, 0.15, ..., 0.95
+
+
+def bin_index(prices: np.ndarray) -> np.ndarray:
+    """가격 → calibration bin 번호 [0, 9]"""
+    idx = np.digitize(prices, BIN_EDGES) - 1
+    return np.clip(idx, 0, len(BIN_MIDS) - 1)
+
 
 def analyze_calibration() -> dict:
     """Calibration 분석 실행.
@@ -52,8 +61,7 @@ def analyze_calibration() -> dict:
     brier_scores = {}
     sharpness = {}
 
-    bin_edges = np.arange(0, 1.1, 0.1)  # 0, 0.1, 0.2, ..., 1.0
-    bin_mids = (bin_edges[:-1] + bin_edges[1:]) / 2  # 0.05, 0.15, ..., 0.95
+    bin_mids = BIN_MIDS
 
     for label, col in price_cols.items():
         valid = df[df[col].notna()].copy()
@@ -73,9 +81,7 @@ def analyze_calibration() -> dict:
 
         # Calibration curve (10 bins)
         curve = []
-        bin_indices = np.digitize(prices, bin_edges) - 1
-        # clamp to valid range [0, 9]
-        bin_indices = np.clip(bin_indices, 0, len(bin_mids) - 1)
+        bin_indices = bin_index(prices)
 
         for i in range(len(bin_mids)):
             mask = bin_indices == i
@@ -231,6 +237,92 @@ def analyze_calibration() -> dict:
     }
 
 
+class RunningCalibration:
+    """해결되는 마켓을 하나씩 누적하는 calibration 통계.
+
+    bin별 (개수, 결과 합, 가격 합)과 전체 제곱오차/sharpness 합만 유지하므로
+    analyze_calibration 전체 재실행 없이 현재 curve와 Brier score를 낼 수 있다.
+    horizon(t0, t1d, ...)별로 독립 누적.
+    """
+
+    def __init__(self, horizons: tuple = ("t0", "t1d", "t7d", "t30d")):
+        n_bins = len(BIN_MIDS)
+        self.horizons = list(horizons)
+        self.counts = {h: np.zeros(n_bins, dtype=np.int64) for h in horizons}
+        self.outcome_sums = {h: np.zeros(n_bins) for h in horizons}
+        self.price_sums = {h: np.zeros(n_bins) for h in horizons}
+        self.sq_error_sums = {h: 0.0 for h in horizons}
+        self.sharpness_sums = {h: 0.0 for h in horizons}
+
+    def add(self, horizon: str, prices, outcomes):
+        """가격(들)과 해결 결과(0/1)를 누적"""
+        prices = np.atleast_1d(np.asarray(prices, dtype=float))
+        outcomes = np.atleast_1d(np.asarray(outcomes, dtype=float))
+        idx = bin_index(prices)
+        n_bins = len(BIN_MIDS)
+
+        self.counts[horizon] += np.bincount(idx, minlength=n_bins)
+        self.outcome_sums[horizon] += np.bincount(idx, weights=outcomes, minlength=n_bins)
+        self.price_sums[horizon] += np.bincount(idx, weights=prices, minlength=n_bins)
+        self.sq_error_sums[horizon] += float(np.sum((prices - outcomes) ** 2))
+        self.sharpness_sums[horizon] += float(np.sum((prices - 0.5) ** 2))
+
+    def total(self, horizon: str) -> int:
+        return int(self.counts[horizon].sum())
+
+    def curve(self, horizon: str) -> list:
+        """analyze_calibration의 calibration_curves[label]과 같은 형식"""
+        curve = []
+        for i, mid in enumerate(BIN_MIDS):
+            count = int(self.counts[horizon][i])
+            actual_rate = self.outcome_sums[horizon][i] / count if count > 0 else None
+            curve.append({
+                "bin_mid": round(float(mid), 2),
+                "actual_rate": round(float(actual_rate), 4) if actual_rate is not None else None,
+                "count": count,
+            })
+        return curve
+
+    def brier(self, horizon: str) -> float:
+        n = self.total(horizon)
+        return round(self.sq_error_sums[horizon] / n, 4) if n else None
+
+    def sharpness(self, horizon: str) -> float:
+        n = self.total(horizon)
+        return round(self.sharpness_sums[horizon] / n, 4) if n else None
+
+    def summary(self) -> dict:
+        """현재 calibration curve / Brier / sharpness (horizon별)"""
+        active = [h for h in self.horizons if self.total(h) > 0]
+        return {
+            "total_markets": {h: self.total(h) for h in self.horizons},
+            "calibration_curves": {h: self.curve(h) for h in active},
+            "brier_scores": {h: self.brier(h) for h in active},
+            "sharpness": {h: self.sharpness(h) for h in active},
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "horizons": self.horizons,
+            "counts": {h: self.counts[h].tolist() for h in self.horizons},
+            "outcome_sums": {h: self.outcome_sums[h].tolist() for h in self.horizons},
+            "price_sums": {h: self.price_sums[h].tolist() for h in self.horizons},
+            "sq_error_sums": self.sq_error_sums,
+            "sharpness_sums": self.sharpness_sums,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RunningCalibration":
+        obj = cls(tuple(state["horizons"]))
+        for h in obj.horizons:
+            obj.counts[h] = np.array(state["counts"][h], dtype=np.int64)
+            obj.outcome_sums[h] = np.array(state["outcome_sums"][h])
+            obj.price_sums[h] = np.array(state["price_sums"][h])
+            obj.sq_error_sums[h] = float(state["sq_error_sums"][h])
+            obj.sharpness_sums[h] = float(state["sharpness_sums"][h])
+        return obj
+
+
 def main():
     print("=== Calibration 분석 ===\n")
 
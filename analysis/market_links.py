@@ -0,0 +1,156 @@
+"""
+UMA 요청 ↔ Polymarket 마켓 조인 인덱스
+
+uma_ancillary(고유 ancillaryData payload)를 polymarket_resolved 마켓에 연결해
+data/uma_market_links.parquet에 저장한다. 요청/투표는 ancillary_key로 이 인덱스에 조인된다.
+
+매칭 순서 (먼저 맞은 방법 사용):
+1. market_id: ancillaryData의 market_id == 마켓 id
+2. slug: ancillaryData URL의 polymarket.com/(event|market)/<slug> == 마켓 slug
+3. question_hash: 정규화한 title 해시 == 정규화한 question 해시
+
+증분 유지: 이미 매칭된 payload는 그대로 두고, 새 payload와 아직 매칭되지 않은 payload만
+현재 마켓 목록에 다시 매칭한다.
+"""
+
+import hashlib
+import re
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+LINKS_PATH = DATA_DIR / "uma_market_links.parquet"
+LINK_COLUMNS = ["ancillary_key", "title_hash", "ref_market_id", "ref_slug", "market_id", "condition_id", "match_method"]
+
+_SLUG_RE = re.compile(r"polymarket\.com/(?:event|market)/([a-z0-9-]+)")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_question(text: str) -> str:
+    """비교용 질문 정규화 (유니코드 호환 분해, 소문자, 영숫자 외 문자 → 공백 하나)"""
+    if not isinstance(text, str):
+        return ""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def question_hashes(texts) -> np.ndarray:
+    """텍스트 컬럼 → 정규화 질문 해시 (16 hex, 빈 질문은 None). 고유값만 해시."""
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+    hashes = []
+    for text in uniques:
+        norm = normalize_question(text)
+        hashes.append(hashlib.blake2b(norm.encode(), digest_size=8).hexdigest() if norm else None)
+    return np.array(hashes + [None], dtype=object)[codes]
+
+
+def link_candidates(ancillary_df: pd.DataFrame) -> pd.DataFrame:
+    """uma_ancillary 행 → 매칭 키(title_hash, ref_market_id, ref_slug)만 가진 미매칭 인덱스 행"""
+    urls = ancillary_df["url"].astype(object).where(ancillary_df["url"].notna(), "")
+    slugs = pd.Series(urls, dtype=object).str.extract(_SLUG_RE, expand=False)
+    market_ids = ancillary_df["market_id"].astype(object).where(ancillary_df["market_id"].notna(), None)
+    return pd.DataFrame({
+        "ancillary_key": ancillary_df["ancillary_key"].to_numpy(),
+        "title_hash": question_hashes(ancillary_df["title"]),
+        "ref_market_id": [str(m).strip() if m else None for m in market_ids],
+        "ref_slug": slugs.to_numpy(dtype=object),
+        "market_id": None,
+        "condition_id": None,
+        "match_method": None,
+    }, columns=LINK_COLUMNS)
+
+
+def match_links(links: pd.DataFrame, markets_df: pd.DataFrame) -> pd.DataFrame:
+    """market_id가 비어 있는 인덱스 행을 마켓 목록에 해시 조인 (id → slug → question_hash 순)"""
+    links = links.copy()
+    markets = pd.DataFrame({
+        "id": markets_df["id"].astype(str).to_numpy(),
+        "slug": markets_df["slug"].astype(object).to_numpy(),
+        "question_hash": question_hashes(markets_df["question"]),
+        "condition_id": markets_df["condition_id"].to_numpy() if "condition_id" in markets_df.columns else None,
+    })
+
+    for method, link_col, market_col in [
+        ("market_id", "ref_market_id", "id"),
+        ("slug", "ref_slug", "slug"),
+        ("question_hash", "title_hash", "question_hash"),
+    ]:
+        pending = links["market_id"].isna() & links[link_col].notna()
+        if not pending.any():
+            continue
+        # 같은 키에 마켓이 여럿이면(질문 중복) 가장 먼저 나온 마켓
+        lookup = markets.dropna(subset=[market_col]).drop_duplicates(market_col).set_index(market_col, drop=False)
+        hit = links.loc[pending, link_col].map(lookup["id"])
+        matched = hit.notna()
+        rows = hit.index[matched]
+        links.loc[rows, "market_id"] = hit[matched]
+        links.loc[rows, "condition_id"] = links.loc[rows, link_col].map(lookup["condition_id"])
+        links.loc[rows, "match_method"] = method
+
+    return links
+
+
+def update_market_links(ancillary_df: pd.DataFrame, markets_df: pd.DataFrame, links: pd.DataFrame = None) -> pd.DataFrame:
+    """조인 인덱스 증분 갱신
+
+    Args:
+        ancillary_df: uma_ancillary 테이블
+        markets_df: polymarket_resolved (id, slug, question, condition_id)
+        links: 기존 인덱스 (None이면 새로 생성)
+
+    Returns:
+        ancillary_key당 한 행인 인덱스. 매칭되지 않은 payload는 market_id = None.
+    """
+    if links is None or links.empty:
+        links = pd.DataFrame(columns=LINK_COLUMNS)
+    new = ancillary_df[~ancillary_df["ancillary_key"].isin(links["ancillary_key"])]
+    if not new.empty:
+        candidates = link_candidates(new)
+        links = candidates if links.empty else pd.concat([links, candidates], ignore_index=True)
+    return match_links(links.reset_index(drop=True), markets_df)
+
+
+def load_uma_market_requests(columns: list = None) -> pd.DataFrame:
+    """Polymarket 마켓에 연결된 UMA 요청 (uma_decoded_requests ⋈ uma_market_links)
+
+    Returns:
+        요청 컬럼 + market_id, condition_id, match_method. 인덱스/요청 파일이 없으면 빈 DataFrame.
+    """
+    requests_path = DATA_DIR / "uma_decoded_requests.parquet"
+    if not LINKS_PATH.exists() or not requests_path.exists():
+        return pd.DataFrame()
+    requests_df = pd.read_parquet(requests_path, columns=columns)
+    links = pd.read_parquet(LINKS_PATH, columns=["ancillary_key", "market_id", "condition_id", "match_method"])
+    return requests_df.merge(links.dropna(subset=["market_id"]), on="ancillary_key", how="inner")
+
+
+def main():
+    print("=== UMA ↔ Polymarket 조인 인덱스 ===\n")
+
+    ancillary_path = DATA_DIR / "uma_ancillary.parquet"
+    markets_path = DATA_DIR / "polymarket_resolved.parquet"
+    if not ancillary_path.exists() or not markets_path.exists():
+        print("uma_ancillary.parquet 또는 polymarket_resolved.parquet이 없습니다.")
+        return
+
+    ancillary_df = pd.read_parquet(ancillary_path, columns=["ancillary_key", "title", "market_id", "url"])
+    markets_df = pd.read_parquet(markets_path, columns=["id", "slug", "question", "condition_id"])
+    links = pd.read_parquet(LINKS_PATH) if LINKS_PATH.exists() else None
+    previous = 0 if links is None else int(links["market_id"].notna().sum())
+
+    links = update_market_links(ancillary_df, markets_df, links)
+    matched = links["market_id"].notna()
+    print(f"payload: {len(links)} (매칭 {int(matched.sum())}, 이번 실행 신규 매칭 {int(matched.sum()) - previous})")
+    for method, count in links.loc[matched, "match_method"].value_counts().items():
+        print(f"  {method}: {count}")
+
+    links.to_parquet(LINKS_PATH, index=False)
+    print(f"\nSaved: {LINKS_PATH} ({len(links)} rows)")
+
+
+if __name__ == "__main__":
+    main()
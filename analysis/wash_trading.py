@@ -0,0 +1,317 @@
+"""
+Polymarket Wash Trading 탐지 모듈
+
+polymarket_trades.py가 저장한 체결 단위 거래 데이터(taker, maker 주소 쌍)에서:
+- Self-trade: taker == maker
+- Round-trip: 같은 주소 쌍이 짧은 시간 안에 비슷한 수량을 반대 방향으로 주고받음
+- Reciprocal pair volume: (마켓, 주소) 희소 행렬에서 양방향 거래량의 min
+- Volume burst: 가격 변화 없이 평소 대비 비정상적으로 큰 거래량 구간
+
+모든 단계는 정렬 + 그룹 경계 기반 NumPy 연산 (거래 단위 Python 루프 없음).
+결과: polymarket_wash_volume.parquet (마켓별 wash volume 추정치)
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+TRADES_DIR = DATA_DIR / "polymarket_trades"
+
+TRADE_COLUMNS = ["trade_id", "maker_order_id", "market_id", "asset_id", "side",
+                 "price", "size", "match_time", "taker", "maker"]
+
+
+def load_trades() -> pd.DataFrame:
+    """파티션 거래 데이터 로드 (필요 컬럼만, 중복 체결 제거)"""
+    if not TRADES_DIR.exists():
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+
+    df = pd.read_parquet(TRADES_DIR, columns=TRADE_COLUMNS)
+    df = df.drop_duplicates(["trade_id", "maker_order_id"])
+    df = df[df["maker"].notna() & df["taker"].notna() & (df["size"] > 0)]
+    df["market_id"] = df["market_id"].astype(str)
+    return df.reset_index(drop=True)
+
+
+def _segment_starts(*keys: np.ndarray) -> np.ndarray:
+    """정렬된 키 배열들에서 그룹 시작 위치 (bool mask)"""
+    n = len(keys[0])
+    starts = np.zeros(n, dtype=bool)
+    if n == 0:
+        return starts
+    starts[0] = True
+    for k in keys:
+        starts[1:] |= k[1:] != k[:-1]
+    return starts
+
+
+def flag_self_trades(buyer: np.ndarray, seller: np.ndarray) -> np.ndarray:
+    """같은 주소가 양쪽에 있는 체결"""
+    return buyer == seller
+
+
+def flag_round_trips(
+    asset: np.ndarray,
+    buyer: np.ndarray,
+    seller: np.ndarray,
+    ts: np.ndarray,
+    size: np.ndarray,
+    window: int = 3600,
+    size_tol: float = 0.1,
+) -> np.ndarray:
+    """주소 쌍 round-trip 탐지.
+
+    (asset, 정규화된 주소쌍, 시각)으로 정렬한 뒤, 같은 그룹의 인접 체결이
+    방향이 반대이고 window초 이내이며 수량 차이가 size_tol 이내이면 두 체결 모두 표시.
+    """
+    lo = np.minimum(buyer, seller).astype(np.int64)
+    hi = np.maximum(buyer, seller).astype(np.int64)
+    direction = buyer == lo  # True: lo가 매수
+    pair = lo * (int(hi.max(initial=0)) + 1) + hi
+
+    # asset(토큰)은 마켓에 종속되므로 (asset, pair, ts) 정렬로 충분
+    order = np.lexsort((ts, pair, asset))
+    a, pr, l, h = asset[order], pair[order], lo[order], hi[order]
+    d, t, s = direction[order], ts[order], size[order]
+
+    same_group = ~_segment_starts(a, pr)[1:]
+    opposite = d[1:] != d[:-1]
+    close_in_time = (t[1:] - t[:-1]) <= window
+    size_match = np.abs(s[1:] - s[:-1]) <= size_tol * np.maximum(s[1:], s[:-1])
+    not_self = l[1:] != h[1:]
+
+    pair_hit = same_group & opposite & close_in_time & size_match & not_self
+
+    flagged_sorted = np.zeros(len(order), dtype=bool)
+    flagged_sorted[1:] |= pair_hit
+    flagged_sorted[:-1] |= pair_hit
+
+    flagged = np.empty_like(flagged_sorted)
+    flagged[order] = flagged_sorted
+    return flagged
+
+
+def reciprocal_pair_volume(
+    market: np.ndarray,
+    buyer: np.ndarray,
+    seller: np.ndarray,
+    notional: np.ndarray,
+    n_addresses: int,
+) -> pd.DataFrame:
+    """(마켓, 주소) 노드 희소 행렬로 주소 쌍별 양방향 거래량 계산.
+
+    M[i, j] = 마켓 내에서 i가 j에게서 산 금액. min(M, Mᵀ)는 양방향으로
+    주고받은 금액 — 실질 포지션 변화 없이 순환한 거래량의 상한.
+
+    Returns:
+        DataFrame [market_code, buyer, seller, volume_ab, volume_ba, reciprocal_volume]
+    """
+    node_buyer = market.astype(np.int64) * n_addresses + buyer
+    node_seller = market.astype(np.int64) * n_addresses + seller
+    nodes, inverse = np.unique(np.concatenate([node_buyer, node_seller]), return_inverse=True)
+    n = len(nodes)
+    rows, cols = inverse[:len(buyer)], inverse[len(buyer):]
+
+    mat = sparse.coo_matrix((notional, (rows, cols)), shape=(n, n)).tocsr()
+    recip = sparse.triu(mat.minimum(mat.T), k=1).tocoo()
+
+    i, j = recip.row, recip.col
+    return pd.DataFrame({
+        "market_code": nodes[i] // n_addresses,
+        "buyer": nodes[i] % n_addresses,
+        "seller": nodes[j] % n_addresses,
+        "volume_ab": np.asarray(mat[i, j]).ravel(),
+        "volume_ba": np.asarray(mat[j, i]).ravel(),
+        "reciprocal_volume": recip.data,
+    })
+
+
+def detect_volume_bursts(
+    market: np.ndarray,
+    asset: np.ndarray,
+    ts: np.ndarray,
+    price: np.ndarray,
+    notional: np.ndarray,
+    bucket_seconds: int = 3600,
+    z_threshold: float = 5.0,
+    price_tol: float = 0.01,
+) -> pd.DataFrame:
+    """가격 변화 대비 비정상 거래량 구간 탐지.
+
+    (market, 시간 버킷)별 거래량을 reduceat으로 집계하고, 마켓별
+    median/MAD 기준 robust z-score가 z_threshold 이상이면서 버킷 내 가격 변화가
+    price_tol 이하인 버킷을 burst로 표시. 초과분(거래량 - median)을 burst volume으로 본다.
+
+    Yes/No 토큰 체결가는 p와 1-p라서 섞으면 평평한 마켓도 가격이 ~1 움직인 것처럼 보인다.
+    가격 변화는 (market, 버킷, asset)별 시가/종가 차이를 구한 뒤 버킷 안 최댓값을 쓴다.
+    """
+    bucket = ts // bucket_seconds
+    order = np.lexsort((ts, asset, bucket, market))
+    m, b, a = market[order], bucket[order], asset[order]
+    p, v = price[order], notional[order]
+
+    bucket_start = _segment_starts(m, b)
+    starts = np.flatnonzero(bucket_start)
+
+    # 토큰별 시가/종가 차이 → 버킷 안 최댓값 (버킷 시작은 항상 토큰 구간 시작)
+    asset_starts = np.flatnonzero(_segment_starts(m, b, a))
+    asset_ends = np.append(asset_starts[1:], len(order)) - 1
+    asset_change = np.abs(p[asset_ends] - p[asset_starts])
+    first_asset = np.flatnonzero(bucket_start[asset_starts])
+
+    buckets = pd.DataFrame({
+        "market_code": m[starts],
+        "bucket": b[starts],
+        "volume": np.add.reduceat(v, starts) if len(starts) else np.array([]),
+        "price_change": np.maximum.reduceat(asset_change, first_asset) if len(starts) else np.array([]),
+    })
+
+    grouped = buckets.groupby("market_code")["volume"]
+    median = grouped.transform("median")
+    mad = (buckets["volume"] - median).abs().groupby(buckets["market_code"]).transform("median")
+    scale = 1.4826 * mad.where(mad > 0, median.where(median > 0, 1.0))
+
+    buckets["z_score"] = (buckets["volume"] - median) / scale
+    buckets["is_burst"] = (buckets["z_score"] >= z_threshold) & (buckets["price_change"] <= price_tol)
+    buckets["burst_volume"] = np.where(buckets["is_burst"], buckets["volume"] - median, 0.0)
+    return buckets
+
+
+def estimate_wash_volume(trades_df: pd.DataFrame, window: int = 3600, size_tol: float = 0.1) -> tuple:
+    """마켓별 wash volume 추정.
+
+    Returns:
+        (market_df, pairs_df)
+        market_df: 마켓별 self/round-trip/reciprocal/burst volume 및 추정치
+        pairs_df: 양방향 거래가 있는 주소 쌍 (reciprocal volume 내림차순)
+    """
+    if trades_df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+
+    market, market_ids = pd.factorize(trades_df["market_id"])
+    asset, _ = pd.factorize(trades_df["asset_id"])
+
+    # 주소를 하나의 코드 공간으로 인코딩
+    n = len(trades_df)
+    addr_codes, addresses = pd.factorize(
+        np.concatenate([trades_df["taker"].to_numpy(dtype=object), trades_df["maker"].to_numpy(dtype=object)])
+    )
+    taker, maker = addr_codes[:n], addr_codes[n:]
+
+    # taker가 BUY면 taker가 매수자, 아니면 maker가 매수자
+    taker_buys = (trades_df["side"].to_numpy(dtype=object) == "BUY")
+    buyer = np.where(taker_buys, taker, maker)
+    seller = np.where(taker_buys, maker, taker)
+
+    ts = trades_df["match_time"].to_numpy(dtype=np.int64)
+    price = trades_df["price"].to_numpy(dtype=float)
+    size = trades_df["size"].to_numpy(dtype=float)
+    notional = price * size
+
+    is_self = flag_self_trades(buyer, seller)
+    is_round_trip = flag_round_trips(asset, buyer, seller, ts, size, window, size_tol)
+    is_wash = is_self | is_round_trip
+
+    n_markets = len(market_ids)
+    per_market = pd.DataFrame({
+        "market_id": market_ids.astype(str),
+        "num_fills": np.bincount(market, minlength=n_markets),
+        "volume": np.bincount(market, weights=notional, minlength=n_markets),
+        "self_trade_volume": np.bincount(market, weights=notional * is_self, minlength=n_markets),
+        "round_trip_volume": np.bincount(market, weights=notional * is_round_trip, minlength=n_markets),
+        "flagged_fills": np.bincount(market, weights=is_wash, minlength=n_markets).astype(int),
+        "wash_volume_estimate": np.bincount(market, weights=notional * is_wash, minlength=n_markets),
+    })
+
+    pairs = reciprocal_pair_volume(market, buyer, seller, notional, len(addresses))
+    per_market["reciprocal_pair_volume"] = np.bincount(
+        pairs["market_code"].to_numpy(), weights=pairs["reciprocal_volume"].to_numpy(), minlength=n_markets
+    )
+
+    bursts = detect_volume_bursts(market, asset, ts, price, notional)
+    per_market["burst_buckets"] = np.bincount(
+        bursts["market_code"].to_numpy(), weights=bursts["is_burst"].to_numpy(), minlength=n_markets
+    ).astype(int)
+    per_market["burst_volume"] = np.bincount(
+        bursts["market_code"].to_numpy(), weights=bursts["burst_volume"].to_numpy(), minlength=n_markets
+    )
+
+    per_market["wash_share"] = np.where(
+        per_market["volume"] > 0, per_market["wash_volume_estimate"] / per_market["volume"], 0.0
+    ).round(4)
+    per_market = per_market.sort_values("wash_volume_estimate", ascending=False).reset_index(drop=True)
+
+    pairs_df = pd.DataFrame({
+        "market_id": market_ids.astype(str)[pairs["market_code"].to_numpy()],
+        "address_a": addresses[pairs["buyer"].to_numpy()],
+        "address_b": addresses[pairs["seller"].to_numpy()],
+        "volume_ab": pairs["volume_ab"].to_numpy(),
+        "volume_ba": pairs["volume_ba"].to_numpy(),
+        "reciprocal_volume": pairs["reciprocal_volume"].to_numpy(),
+    }).sort_values("reciprocal_volume", ascending=False).reset_index(drop=True)
+
+    return per_market, pairs_df
+
+
+def analyze_wash_trading() -> dict:
+    """Wash trading 분석 실행 및 결과 저장.
+
+    Returns:
+        dict with total_fills, total_volume, wash_volume, wash_share,
+        markets_flagged, top_markets
+    """
+    trades_df = load_trades()
+    if trades_df.empty:
+        return {}
+
+    market_df, pairs_df = estimate_wash_volume(trades_df)
+    market_df.to_parquet(DATA_DIR / "polymarket_wash_volume.parquet", index=False)
+    pairs_df.to_parquet(DATA_DIR / "polymarket_wash_pairs.parquet", index=False)
+
+    total_volume = float(market_df["volume"].sum())
+    wash_volume = float(market_df["wash_volume_estimate"].sum())
+
+    return {
+        "total_fills": int(market_df["num_fills"].sum()),
+        "total_markets": len(market_df),
+        "total_volume": total_volume,
+        "wash_volume": wash_volume,
+        "wash_share": round(wash_volume / total_volume * 100, 2) if total_volume > 0 else 0,
+        "self_trade_volume": float(market_df["self_trade_volume"].sum()),
+        "round_trip_volume": float(market_df["round_trip_volume"].sum()),
+        "burst_volume": float(market_df["burst_volume"].sum()),
+        "markets_flagged": int((market_df["wash_volume_estimate"] > 0).sum()),
+        "top_markets": market_df.head(10)[
+            ["market_id", "volume", "wash_volume_estimate", "wash_share"]
+        ].to_dict("records"),
+    }
+
+
+def main():
+    print("=== Wash Trading 분석 ===\n")
+
+    result = analyze_wash_trading()
+    if not result:
+        print("polymarket_trades 데이터가 없습니다. 먼저 `python -m collectors.polymarket_trades`를 실행하세요.")
+        return
+
+    print(f"분석 체결: {result['total_fills']:,} ({result['total_markets']} 마켓)")
+    print(f"총 거래대금: ${result['total_volume']:,.0f}")
+    print(f"Wash volume 추정: ${result['wash_volume']:,.0f} ({result['wash_share']}%)")
+    print(f"  Self-trade: ${result['self_trade_volume']:,.0f}")
+    print(f"  Round-trip: ${result['round_trip_volume']:,.0f}")
+    print(f"  Burst 초과분: ${result['burst_volume']:,.0f}")
+    print(f"Wash 의심 마켓: {result['markets_flagged']}")
+
+    print(f"\n상위 마켓:")
+    for m in result["top_markets"]:
+        print(f"  {m['market_id']}: ${m['wash_volume_estimate']:,.0f} / ${m['volume']:,.0f} ({m['wash_share']:.1%})")
+
+    print("\n=== 분석 완료 ===")
+
+
+if __name__ == "__main__":
+    main()
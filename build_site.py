@@ -8,8 +8,12 @@ import json
 from pathlib import Path
 import pandas as pd
 import numpy as np
-from collectors.concentration_metrics import calculate_all_metrics, interpret_hhi, interpret_gini
+from collectors.concentration_metrics import (
+    bootstrap_metrics, calculate_all_metrics, concentration_curve, interpret_hhi, interpret_gini,
+)
+from collectors.uma_decoder import reveal_rates
 from analysis.accuracy import analyze_all
+from analysis.attack_cost import analyze_attack_surface
 from analysis.calibration import analyze_calibration
 
 DATA_DIR = Path("data")
@@ -51,20 +55,39 @@ def load_data():
         "top_20_markets": markets_df.nlargest(20, "volume")[["question", "volume", "liquidity", "category"]].to_dict("records"),
     }
 
-    # 유동성 집중도 계산
-    total_vol = markets_df["volume"].sum()
-    total_liq = markets_df["liquidity"].sum()
-
-    concentration = []
-    for n in [5, 10, 20, 50, 100]:
-        top_vol = markets_df.nlargest(n, "volume")["volume"].sum()
-        top_liq = markets_df.nlargest(n, "liquidity")["liquidity"].sum()
-        concentration.append({
-            "top_n": n,
-            "volume_share": round(top_vol / total_vol * 100, 1) if total_vol > 0 else 0,
-            "liquidity_share": round(top_liq / total_liq * 100, 1) if total_liq > 0 else 0,
-        })
-    data["liquidity_concentration"] = concentration
+    # 유동성 집중도 계산 (지표별 정렬 1회 + 누적합)
+    curve = concentration_curve(markets_df, ["volume", "liquidity"], ns=[5, 10, 20, 50, 100])
+    data["liquidity_concentration"] = [
+        {
+            "top_n": int(row.top_n),
+            "volume_share": round(row.volume_share, 1),
+            "liquidity_share": round(row.liquidity_share, 1),
+        }
+        for row in curve.itertuples(index=False)
+    ]
+
+    # 카테고리별 전체 집중도 곡선 (N은 로그 간격으로 샘플링)
+    curve_ns = np.unique(np.geomspace(1, max(len(markets_df), 1), 40).astype(int))
+    curve_df = markets_df.assign(category=markets_df["category"].fillna("Uncategorized"))
+    curves = concentration_curve(curve_df, ["volume", "liquidity"], ns=curve_ns).assign(category="All")
+    if curve_df["category"].nunique() > 1:
+        top_categories = curve_df.groupby("category")["volume"].sum().nlargest(6).index
+        by_category = concentration_curve(
+            curve_df[curve_df["category"].isin(top_categories)], ["volume", "liquidity"],
+            ns=curve_ns, group_col="category",
+        )
+        curves = pd.concat([curves, by_category], ignore_index=True)
+    curves = curves[curves["top_n"] <= curves["group_size"]]
+    data["concentration_curves"] = [
+        {
+            "category": category,
+            "markets": int(group["group_size"].iloc[0]),
+            "top_n": group["top_n"].astype(int).tolist(),
+            "volume_share": group["volume_share"].round(2).tolist(),
+            "liquidity_share": group["liquidity_share"].round(2).tolist(),
+        }
+        for category, group in curves.groupby("category", sort=False)
+    ]
 
     # 유동성 분포 (버킷별)
     bins = [0, 100, 1000, 10000, 100000, 1000000, float("inf")]
@@ -77,6 +100,8 @@ def load_data():
     holders_df = pd.read_parquet(DATA_DIR / "uma_holders.parquet")
     total_balance = holders_df["balance"].sum()
     uma_metrics = calculate_all_metrics(holders_df["balance"].values, "UMA")
+    # 상위 홀더 표본 기반 점추정 → 부트스트랩 95% 신뢰구간
+    uma_metrics["ci"] = bootstrap_metrics(holders_df["balance"].values)
 
     data["uma_holders"] = {
         "total_holders": len(holders_df),
@@ -90,6 +115,19 @@ def load_data():
         "metrics": uma_metrics
     }
 
+    # 라운드별 실제 투표권 집중도 (uma_decoder의 uma_round_power) — 라운드 중앙값
+    round_power_path = DATA_DIR / "uma_round_power.parquet"
+    if round_power_path.exists():
+        round_power = pd.read_parquet(round_power_path)
+        if not round_power.empty:
+            data["uma_round_power"] = {
+                "rounds": len(round_power),
+                **{
+                    col: round(float(round_power[col].median()), 4)
+                    for col in ["voters", "swing_set", "nakamoto", "gini", "hhi", "normalized_entropy", "top_voter_share"]
+                },
+            }
+
     # UMA 투표 이벤트 (확장 통계)
     events_df = pd.read_parquet(DATA_DIR / "uma_voting_events.parquet")
     uma_events_stats = {
@@ -110,6 +148,21 @@ def load_data():
         vote_events = events_df[events_df["event_name"].isin(["VoteCommitted", "VoteRevealed", "EncryptedVote"])]
         uma_events_stats["unique_voters_tx"] = int(vote_events["tx_hash"].nunique()) if not vote_events.empty else 0
 
+    # commit ↔ reveal 짝 (uma_decoder의 uma_vote_lifecycle) → 정확한 reveal 비율
+    lifecycle_path = DATA_DIR / "uma_vote_lifecycle.parquet"
+    if lifecycle_path.exists():
+        lifecycle_df = pd.read_parquet(lifecycle_path)
+        committed = lifecycle_df[lifecycle_df["committed"]]
+        if not committed.empty:
+            by_round = reveal_rates(lifecycle_df)
+            uma_events_stats["lifecycle"] = {
+                "commits": len(committed),
+                "reveals": int(committed["revealed"].sum()),
+                "reveal_rate": round(float(committed["revealed"].mean()) * 100, 1),
+                "median_reveal_latency_h": round(float(committed["reveal_latency"].median()) / 3600, 1),
+                "round_reveal_rate_median": round(float(by_round["reveal_rate"].median()) * 100, 1),
+            }
+
     data["uma_events"] = uma_events_stats
 
     # UMA 투표 이벤트 CSV export
@@ -164,6 +217,9 @@ def load_data():
 
     eth_metrics = calculate_all_metrics(kleros_eth["balance"].values, "Kleros Ethereum") if not kleros_eth.empty else {}
     arb_metrics = calculate_all_metrics(kleros_arb["balance"].values, "Kleros Arbitrum") if not kleros_arb.empty else {}
+    for chain_df, chain_metrics in [(kleros_eth, eth_metrics), (kleros_arb, arb_metrics)]:
+        if chain_metrics:
+            chain_metrics["ci"] = bootstrap_metrics(chain_df["balance"].values)
 
     data["kleros"] = {
         "ethereum": {
@@ -195,10 +251,23 @@ def load_data():
     accuracy_data = analyze_all()
     data["accuracy"] = accuracy_data
 
+    # UMA 요청별 투표 매수 공격 비용 (연결된 Polymarket 거래량 대비 순위)
+    data["uma_attack_surface"] = analyze_attack_surface()
+    attack_path = DATA_DIR / "uma_attack_surface.parquet"
+    if data["uma_attack_surface"] and attack_path.exists():
+        attack_df = pd.read_parquet(attack_path)
+        attack_df.to_csv(SITE_DIR / "uma_attack_surface.csv", index=False)
+        print(f"  CSV 저장: site/uma_attack_surface.csv ({len(attack_df)} rows)")
+
     # CSV exports for decoded data
     uma_req_path = DATA_DIR / "uma_decoded_requests.parquet"
     if uma_req_path.exists():
         uma_req_df = pd.read_parquet(uma_req_path)
+        # 요청 테이블은 ancillary_key만 가짐 → CSV에는 제목/원문을 붙여 내보냄
+        uma_anc_path = DATA_DIR / "uma_ancillary.parquet"
+        if "ancillary_key" in uma_req_df.columns and uma_anc_path.exists():
+            uma_anc_df = pd.read_parquet(uma_anc_path, columns=["ancillary_key", "title", "ancillary_data"])
+            uma_req_df = uma_req_df.merge(uma_anc_df, on="ancillary_key", how="left")
         uma_req_df.to_csv(SITE_DIR / "uma_decoded_requests.csv", index=False)
         print(f"  CSV 저장: site/uma_decoded_requests.csv ({len(uma_req_df)} rows)")
 
@@ -230,6 +299,13 @@ def build_html(data):
         """Bilingual span wrapper"""
         return f'<span class="lang-ko">{ko}</span><span class="lang-en">{en}</span>'
 
+    def ci(metrics, key):
+        """부트스트랩 95% 신뢰구간 표기 (없으면 빈 문자열)"""
+        bounds = metrics.get("ci", {}).get(key)
+        if not bounds:
+            return ""
+        return f'<div class="metric-name" style="font-size: 0.75rem;">95% CI {bounds[0]}–{bounds[1]}</div>'
+
     # Pre-compute values for Section 4 (f-string에서 dict.get() 체이닝 불가)
     uma_by_type = data["uma_events"].get("by_type", {})
     uma_date_range = data["uma_events"].get("date_range", ["?", "?"])
@@ -239,9 +315,25 @@ def build_html(data):
     uma_vote_revealed = uma_by_type.get("VoteRevealed", 0)
     uma_price_resolved = uma_by_type.get("PriceResolved", 0)
     uma_rewards = uma_by_type.get("RewardsRetrieved", 0)
-    uma_reveal_rate = uma_vote_revealed / max(uma_vote_committed, 1) * 100
+    uma_lifecycle = data["uma_events"].get("lifecycle")
+    # 유권자별 commit ↔ reveal 짝이 있으면 정확한 비율, 없으면 이벤트 수 비율
+    uma_reveal_rate = uma_lifecycle["reveal_rate"] if uma_lifecycle else uma_vote_revealed / max(uma_vote_committed, 1) * 100
     uma_votes_per_req = uma_vote_committed / max(uma_price_req, 1)
 
+    # 오라클 비교 차트: 라운드별 공개 투표 토큰 기준 UMA 집중도 (있을 때만)
+    uma_round_power = data.get("uma_round_power")
+    uma_round_power_dataset = "" if not uma_round_power else f""", {{
+                    label: 'UMA (라운드 투표권, 중앙값)',
+                    data: [
+                        {uma_round_power["nakamoto"]},
+                        {uma_round_power["gini"]},
+                        {uma_round_power["hhi"] / 1000:.2f},
+                        {1 - uma_round_power["normalized_entropy"]:.2f}
+                    ],
+                    backgroundColor: 'rgba(255, 107, 107, 0.4)',
+                    borderWidth: 0
+                }}"""
+
     kc = data.get("kleros_court", {})
     kc_date_range = kc.get("date_range", ["?", "?"])
     kc_disputes = kc.get("disputes_created", 0)
@@ -261,6 +353,7 @@ def build_html(data):
     acc_uma = acc.get("uma_disputes", {})
     acc_uma_overall = acc_uma.get("overall", {})
     acc_uma_yesno = acc_uma.get("yesno", {})
+    attack = data.get("uma_attack_surface") or {}
     acc_kleros = acc.get("kleros_disputes", {})
     acc_pm = acc.get("polymarket_resolved", {})
 
@@ -532,6 +625,11 @@ def build_html(data):
                 <canvas id="concentrationChart" height="100"></canvas>
             </div>
 
+            <div class="chart-container">
+                <div class="chart-title">{t('카테고리별 집중도 곡선: 상위 N개 마켓 거래량 점유율', 'Concentration Curves by Category: Top N Market Volume Share')}</div>
+                <canvas id="concentrationCurveChart" height="100"></canvas>
+            </div>
+
             <div class="chart-container">
                 <div class="chart-title">{t('유동성 분포 (마켓 수)', 'Liquidity Distribution (Market Count)')}</div>
                 <canvas id="distributionChart" height="100"></canvas>
@@ -633,10 +731,12 @@ def build_html(data):
                         <div class="metric">
                             <div class="metric-value danger">{data["uma_holders"]["metrics"]["nakamoto"]}</div>
                             <div class="metric-name">{t('나카모토 계수', 'Nakamoto Coeff.')}</div>
+                            {ci(data["uma_holders"]["metrics"], "nakamoto")}
                         </div>
                         <div class="metric">
                             <div class="metric-value danger">{data["uma_holders"]["metrics"]["gini"]}</div>
                             <div class="metric-name">{t('지니 계수', 'Gini Coeff.')}</div>
+                            {ci(data["uma_holders"]["metrics"], "gini")}
                         </div>
                         <div class="metric">
                             <div class="metric-value warning">{data["uma_holders"]["metrics"]["hhi"]:,.0f}</div>
@@ -669,10 +769,12 @@ def build_html(data):
                         <div class="metric">
                             <div class="metric-value danger">{data["kleros"]["arbitrum"]["metrics"].get("nakamoto", 0)}</div>
                             <div class="metric-name">{t('나카모토 계수', 'Nakamoto Coeff.')}</div>
+                            {ci(data["kleros"]["arbitrum"]["metrics"], "nakamoto")}
                         </div>
                         <div class="metric">
                             <div class="metric-value danger">{data["kleros"]["arbitrum"]["metrics"].get("gini", 0)}</div>
                             <div class="metric-name">{t('지니 계수', 'Gini Coeff.')}</div>
+                            {ci(data["kleros"]["arbitrum"]["metrics"], "gini")}
                         </div>
                         <div class="metric">
                             <div class="metric-value warning">{data["kleros"]["arbitrum"]["metrics"].get("hhi", 0):,.0f}</div>
@@ -705,10 +807,12 @@ def build_html(data):
                         <div class="metric">
                             <div class="metric-value warning">{data["kleros"]["ethereum"]["metrics"].get("nakamoto", 0)}</div>
                             <div class="metric-name">{t('나카모토 계수', 'Nakamoto Coeff.')}</div>
+                            {ci(data["kleros"]["ethereum"]["metrics"], "nakamoto")}
                         </div>
                         <div class="metric">
                             <div class="metric-value warning">{data["kleros"]["ethereum"]["metrics"].get("gini", 0)}</div>
                             <div class="metric-name">{t('지니 계수', 'Gini Coeff.')}</div>
+                            {ci(data["kleros"]["ethereum"]["metrics"], "gini")}
                         </div>
                         <div class="metric">
                             <div class="metric-value">{data["kleros"]["ethereum"]["metrics"].get("hhi", 0):,.0f}</div>
@@ -993,6 +1097,47 @@ def build_html(data):
                 </tbody>
             </table>
 
+            {"" if not attack.get("cheapest") else f'''
+            <h3 style="margin-top: 50px;">{t('💸 투표 매수 공격 비용', '💸 Vote-Buying Attack Cost')}</h3>
+            <div class="insight-box" style="background: linear-gradient(135deg, rgba(255, 107, 107, 0.15), rgba(255, 165, 0, 0.15));">
+                <h4 style="color: #ff6b6b;">{t('결과를 뒤집는 데 얼마가 드는가?', 'How Much Does It Cost to Flip a Vote?')}</h4>
+                <p class="lang-ko">{attack["rounds"]}개 라운드의 {attack["requests"]}건 요청에서, 2위 가격을 SPAT {attack["spat"]:.0%}까지 올리는 데 필요한 추가 토큰 비용의 중앙값은
+                ${attack["median_flip_cost"]:,.0f}입니다 (토큰 가격 ${attack["token_price"]} 가정). 기존 표를 사는 경우 중앙값 {attack["median_bribe_voters"]:.0f}명의 유권자면 충분합니다.
+                Polymarket 마켓에 연결된 {attack["linked_requests"]}건 중 {attack["cheaper_than_volume"]}건은 공격 비용이 마켓 거래량보다 작았습니다.</p>
+                <p class="lang-en">Across {attack["requests"]} requests in {attack["rounds"]} rounds, the median cost of extra tokens needed to lift the runner-up price to the {attack["spat"]:.0%} SPAT
+                is ${attack["median_flip_cost"]:,.0f} (assuming ${attack["token_price"]} per token). Buying existing votes takes a median of {attack["median_bribe_voters"]:.0f} voters.
+                Of {attack["linked_requests"]} requests linked to Polymarket markets, {attack["cheaper_than_volume"]} cost less to flip than the market's volume.</p>
+            </div>
+
+            <table>
+                <thead>
+                    <tr>
+                        <th>Round</th>
+                        <th>{t('식별자', 'Identifier')}</th>
+                        <th>{t('마켓', 'Market')}</th>
+                        <th>{t('투표자', 'Voters')}</th>
+                        <th>{t('뒤집기 비용', 'Flip Cost')}</th>
+                        <th>{t('매수 유권자', 'Voters to Bribe')}</th>
+                        <th>{t('마켓 거래량', 'Market Volume')}</th>
+                        <th>{t('비용/거래량', 'Cost / Volume')}</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {"".join(f"""
+                    <tr>
+                        <td>{m["round_id"]}</td>
+                        <td>{m["identifier"]}</td>
+                        <td>{m["market_id"]}</td>
+                        <td>{m["voters"]}</td>
+                        <td>${m["flip_cost_usd"]:,.0f}</td>
+                        <td>{m["bribe_voters"]}</td>
+                        <td>${m["market_volume"]:,.0f}</td>
+                        <td style="color: {'#ff6b6b' if m["cost_to_volume"] < 1 else '#888'};">{m["cost_to_volume"]:.2%}</td>
+                    </tr>""" for m in attack["cheapest"])}
+                </tbody>
+            </table>
+            '''}
+
             <h3 style="margin-top: 50px;">{t('Kleros Court 분쟁 해결 분석', 'Kleros Court Dispute Resolution Analysis')}</h3>
             <p style="color: #888; font-size: 0.9rem; margin-bottom: 20px;">
                 {t(f'데이터 기간: {kleros_period.get("start_date", "?")} ~ {kleros_period.get("end_date", "?")} ({kleros_period.get("days", 0)}일)',
@@ -1082,6 +1227,7 @@ def build_html(data):
 
             <div class="download-links">
                 <a href="uma_decoded_requests.csv" download>📥 {t('UMA 디코딩 요청', 'UMA Decoded Requests')}</a>
+                <a href="uma_attack_surface.csv" download>📥 {t('UMA 공격 비용', 'UMA Attack Cost')}</a>
                 <a href="kleros_decoded_disputes.csv" download>📥 {t('Kleros 디코딩 분쟁', 'Kleros Decoded Disputes')}</a>
             </div>
         </section>
@@ -1294,6 +1440,57 @@ def build_html(data):
             }}
         }});
 
+        // 카테고리별 집중도 곡선 차트 (로그 스케일 N)
+        const curveData = {json.dumps(data["concentration_curves"])};
+        const curveColors = ['rgba(255, 165, 0, 1)', 'rgba(100, 200, 255, 1)', 'rgba(144, 238, 144, 1)',
+                             'rgba(255, 107, 107, 1)', 'rgba(200, 150, 255, 1)', 'rgba(255, 220, 100, 1)', 'rgba(180, 180, 180, 1)'];
+        const curveDatasets = curveData.map((c, i) => ({{
+            label: c.category + ' (' + c.markets.toLocaleString() + ')',
+            data: c.top_n.map((n, j) => ({{ x: n, y: c.volume_share[j] }})),
+            borderColor: curveColors[i % curveColors.length],
+            borderWidth: c.category === 'All' ? 3 : 1.5,
+            pointRadius: 0,
+            fill: false,
+            tension: 0.1,
+        }}));
+        if (curveData.length > 0) {{
+            curveDatasets.push({{
+                label: 'All (liquidity)',
+                data: curveData[0].top_n.map((n, j) => ({{ x: n, y: curveData[0].liquidity_share[j] }})),
+                borderColor: 'rgba(255, 107, 107, 0.8)',
+                borderDash: [6, 4],
+                borderWidth: 2,
+                pointRadius: 0,
+                fill: false,
+                tension: 0.1,
+            }});
+        }}
+        new Chart(document.getElementById('concentrationCurveChart'), {{
+            type: 'line',
+            data: {{ datasets: curveDatasets }},
+            options: {{
+                responsive: true,
+                scales: {{
+                    x: {{
+                        type: 'logarithmic',
+                        title: {{ display: true, text: 'Top N', color: '#888' }},
+                        grid: {{ color: '#333' }},
+                        ticks: {{ color: '#888' }}
+                    }},
+                    y: {{
+                        min: 0, max: 100,
+                        title: {{ display: true, text: 'Share (%)', color: '#888' }},
+                        grid: {{ color: '#333' }},
+                        ticks: {{ color: '#888' }}
+                    }}
+                }},
+                plugins: {{
+                    legend: {{ labels: {{ color: '#ccc' }} }},
+                    tooltip: {{ callbacks: {{ label: ctx => ctx.dataset.label + ' — Top ' + ctx.parsed.x + ': ' + ctx.parsed.y.toFixed(1) + '%' }} }}
+                }}
+            }}
+        }});
+
         // 유동성 분포 차트
         const distData = {json.dumps(data["liquidity_distribution"])};
         const chartDistribution = new Chart(document.getElementById('distributionChart'), {{
@@ -1352,7 +1549,7 @@ def build_html(data):
                     ],
                     backgroundColor: 'rgba(100, 200, 255, 0.8)',
                     borderWidth: 0
-                }}]
+                }}{uma_round_power_dataset}]
             }},
             options: {{
                 responsive: true,
@@ -0,0 +1,7 @@
+"""
+데이터 수집/디코딩 모듈
+
+모듈끼리 `collectors.` 절대 경로로 import하므로 저장소 루트에서 모듈로 실행한다:
+    python -m collectors.uma_oracle
+    python -m collectors.uma_decoder [--full] [--workers N]
+"""
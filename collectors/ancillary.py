@@ -0,0 +1,91 @@
+"""
+UMA ancillaryData 파서
+
+ancillaryData는 "q: title: ..., description: ... res_data: p1: 0, p2: 1, ...,ooRequester:..."
+형태의 key: value 나열이다. 같은 payload가 요청/투표마다 반복되므로
+고유 payload만 한 번 파싱해 해시 키(ancillary_key)로 참조한다.
+
+- ancillary_keys: 텍스트 컬럼 → 행별 키 (고유값만 해시)
+- parse_ancillary: payload 하나 → 구조화 필드 dict
+- build_ancillary_table: 고유 payload별 uma_ancillary 테이블
+"""
+
+import hashlib
+import re
+
+import numpy as np
+import pandas as pd
+
+# 필드 표식 → 출력 컬럼 (먼저 나온 표식만 필드 경계로 인정, 이후 반복은 값의 일부)
+FIELDS = {
+    "title": "title",
+    "description": "description",
+    "res_data": "res_data",
+    "uma_resolution_data": "res_data",
+    "market_id": "market_id",
+    "initializer": "initializer",
+    "ooRequester": "oo_requester",
+    "childRequester": "child_requester",
+    "childChainId": "child_chain_id",
+    "relayHash": "relay_hash",
+}
+ANCILLARY_COLUMNS = ["ancillary_key", "ancillary_data", "url", *dict.fromkeys(FIELDS.values())]
+
+_FIELD_RE = re.compile(r"(?:^|(?<=[\s,.]))(" + "|".join(FIELDS) + r"):\s*")
+_URL_RE = re.compile(r"https?://[^\s,)\"'”]+")
+
+
+def ancillary_key(text: str) -> str:
+    """payload 텍스트의 해시 키 (16 hex)"""
+    return hashlib.blake2b((text or "").encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+
+
+def ancillary_keys(texts) -> np.ndarray:
+    """텍스트 컬럼 → 행별 ancillary_key (고유값만 해시, 빈 payload/NaN은 None)"""
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+    keys = np.array([ancillary_key(t) if t else None for t in uniques] + [None], dtype=object)
+    return keys[codes]  # 코드 -1(NaN) → 마지막 None
+
+
+def parse_ancillary(text: str) -> dict:
+    """payload 하나를 구조화 필드로 분해
+
+    표식 사이의 텍스트를 값으로 보고 끝의 구분자(, .)와 공백을 제거한다.
+    url은 payload 안 첫 번째 http(s) 링크. 없는 필드는 None.
+    """
+    result = {col: None for col in FIELDS.values()}
+    result["url"] = None
+    if not text:
+        return result
+
+    marks = []
+    seen = set()
+    for m in _FIELD_RE.finditer(text):
+        col = FIELDS[m.group(1)]
+        if col not in seen:
+            seen.add(col)
+            marks.append((col, m.start(), m.end()))
+
+    for i, (col, _, value_start) in enumerate(marks):
+        value_end = marks[i + 1][1] if i + 1 < len(marks) else len(text)
+        value = text[value_start:value_end].strip().rstrip(",").strip()
+        result[col] = value or None
+
+    url = _URL_RE.search(text)
+    if url:
+        result["url"] = url.group(0).rstrip(".;")
+    return result
+
+
+def build_ancillary_table(texts) -> pd.DataFrame:
+    """고유 payload별 파싱 결과 (uma_ancillary 테이블)
+
+    Returns:
+        ANCILLARY_COLUMNS 순서의 DataFrame, ancillary_key 기준 중복 없음
+    """
+    uniques = pd.Series(texts, dtype=object).dropna().unique()
+    records = [
+        {"ancillary_key": ancillary_key(text), "ancillary_data": text, **parse_ancillary(text)}
+        for text in uniques if text
+    ]
+    return pd.DataFrame(records, columns=ANCILLARY_COLUMNS)
@@ -0,0 +1,267 @@
+"""
+전송 로그 재생용 잔고 장부 (순서 통계 Fenwick 트리)
+
+매일/매 블록 집중도를 구할 때마다 전체 잔고를 다시 정렬하면 O(기간 수 × n log n)이다.
+BalanceBook은 재생 중 나올 수 있는 모든 잔고 값을 미리 순위 압축해 두고,
+순위별 (개수, 합) Fenwick 트리와 누적 합 Σx, Σx², Σx·ln x, Σ 순위·x를 유지한다.
+잔고 하나가 바뀌면 O(log n)으로 갱신되고 지니/HHI/엔트로피는 O(1), 나카모토는 O(log n).
+
+재생 전체 비용 ≈ 전송 로그 한 번 훑기 (전송당 Fenwick 갱신 두 번).
+
+전송 로그 컬럼: from, to, value (토큰 단위), block_number, timestamp, chain (선택, 없으면 "ethereum")
+민팅(from = 0x0)과 소각(to = 0x0)은 0x0 주소의 잔고를 만들지 않는다.
+체인마다 잔고가 따로이므로 (Kleros PNK: Ethereum / Arbitrum) main은 (토큰, 체인)별로 따로 재생한다.
+"""
+
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+# chain 컬럼이 없는 전송 로그의 체인
+DEFAULT_CHAIN = "ethereum"
+
+
+class BalanceBook:
+    """양수 잔고 멀티셋의 순서 통계 장부
+
+    Args:
+        universe: 등장할 수 있는 모든 양수 잔고 값 (순위 압축용, 중복/정렬 무관)
+    """
+
+    def __init__(self, universe):
+        self.values = np.unique(np.asarray(universe, dtype=float))
+        self.size = len(self.values)
+        self._value_list = self.values.tolist()
+        # 1-based Fenwick 트리 (Python 리스트가 numpy 스칼라 인덱싱보다 빠름)
+        self._count = [0] * (self.size + 1)
+        self._sum = [0.0] * (self.size + 1)
+        self._top_bit = 1 << max(self.size.bit_length() - 1, 0)
+
+        self.n = 0
+        self.total = 0.0
+        self.sum_sq = 0.0
+        self.sum_xlogx = 0.0
+        self.rank_weighted = 0.0  # Σ i·x_(i), x 오름차순, i는 1부터
+
+    def rank(self, value: float) -> int:
+        """잔고 값 → 1-based 순위 (universe에 있어야 함)"""
+        return int(np.searchsorted(self.values, value)) + 1
+
+    def _add(self, rank: int, count: int, value: float):
+        counts, sums, size = self._count, self._sum, self.size  # 루프 안 속성 조회 제거
+        i = rank
+        while i <= size:
+            counts[i] += count
+            sums[i] += value
+            i += i & -i
+
+    def _prefix(self, rank: int) -> tuple:
+        """순위 ≤ rank인 (개수, 합)"""
+        counts, sums = self._count, self._sum
+        count, total = 0, 0.0
+        i = rank
+        while i > 0:
+            count += counts[i]
+            total += sums[i]
+            i -= i & -i
+        return count, total
+
+    def insert(self, rank: int):
+        """값 하나 추가 — 같은 값들의 맨 뒤에 놓이고, 더 큰 값들의 순위가 하나씩 밀린다"""
+        value = self._value_list[rank - 1]
+        count_le, sum_le = self._prefix(rank)
+        self.rank_weighted += value * (count_le + 1) + (self.total - sum_le)
+        self._add(rank, 1, value)
+        self.n += 1
+        self.total += value
+        self.sum_sq += value * value
+        self.sum_xlogx += value * math.log(value)
+
+    def remove(self, rank: int):
+        """값 하나 제거 (같은 값들의 맨 뒤 것을 뺀다)"""
+        value = self._value_list[rank - 1]
+        count_le, sum_le = self._prefix(rank)
+        self.rank_weighted -= value * count_le + (self.total - sum_le)
+        self._add(rank, -1, -value)
+        self.n -= 1
+        self.total -= value
+        self.sum_sq -= value * value
+        self.sum_xlogx -= value * math.log(value)
+
+    def gini(self) -> float:
+        """지니 계수: (2 Σ i·x_(i)) / (n Σx) - (n+1)/n"""
+        if self.n == 0 or self.total <= 0:
+            return 0.0
+        return round(2 * self.rank_weighted / (self.n * self.total) - (self.n + 1) / self.n, 4)
+
+    def hhi(self) -> float:
+        if self.n == 0 or self.total <= 0:
+            return 0.0
+        return round(self.sum_sq / self.total ** 2 * 10000, 2)
+
+    def entropy(self) -> float:
+        """섀넌 엔트로피 (bits): log2(T) - Σ x·log2(x) / T"""
+        if self.n == 0 or self.total <= 0:
+            return 0.0
+        return round((math.log(self.total) - self.sum_xlogx / self.total) / math.log(2), 4)
+
+    def nakamoto(self, threshold: float = 0.51) -> int:
+        """상위 보유자부터 threshold를 넘길 때까지 필요한 수 (Fenwick 하강 탐색)
+
+        상위 보유분이 threshold·T 이상 ⇔ 하위 합 ≤ (1 - threshold)·T.
+        하위 합이 한도를 넘지 않는 가장 큰 순위 구간을 찾고, 경계 순위(같은 값 묶음)에서는 필요한 개수만 센다.
+        """
+        if self.n == 0 or self.total <= 0:
+            return 0
+        limit = (1 - threshold) * self.total
+        pos, count, total = 0, 0, 0.0
+        bit = self._top_bit
+        while bit:
+            nxt = pos + bit
+            if nxt <= self.size and total + self._sum[nxt] <= limit:
+                pos = nxt
+                count += self._count[nxt]
+                total += self._sum[nxt]
+            bit >>= 1
+        if pos >= self.size:
+            return min(self.n, 1)
+
+        # pos + 1 순위의 값 묶음 중 일부만 하위에 남길 수 있음
+        value = self._value_list[pos]
+        tied = self._prefix(pos + 1)[0] - count
+        kept_low = min(int((limit - total) // value), tied) if value > 0 else tied
+        return max(self.n - count - kept_low, 1)
+
+    def snapshot(self) -> dict:
+        return {
+            "holders": self.n,
+            "total": self.total,
+            "gini": self.gini(),
+            "hhi": self.hhi(),
+            "nakamoto": self.nakamoto(),
+            "entropy": self.entropy(),
+        }
+
+
+def balance_deltas(transfers_df: pd.DataFrame) -> pd.DataFrame:
+    """전송 로그 → 주소별 잔고 변화 (전송 순서, 보낸 쪽 먼저)
+
+    주소는 소문자로 맞춰 대/소문자만 다른 같은 주소가 따로 장부에 잡히지 않게 한다.
+
+    Returns:
+        address, before, after, block_number, timestamp (행 = 잔고가 바뀐 주소 하나)
+    """
+    n = len(transfers_df)
+    value = transfers_df["value"].to_numpy(dtype=float)
+    deltas = pd.DataFrame({
+        "address": np.concatenate([
+            transfers_df["from"].astype(str).str.lower().to_numpy(dtype=object),
+            transfers_df["to"].astype(str).str.lower().to_numpy(dtype=object),
+        ]),
+        "delta": np.concatenate([-value, value]),
+        "order": np.concatenate([np.arange(n) * 2, np.arange(n) * 2 + 1]),
+        "block_number": np.tile(transfers_df["block_number"].to_numpy(), 2),
+        "timestamp": np.tile(transfers_df["timestamp"].to_numpy(), 2),
+    })
+    deltas = deltas[deltas["address"] != ZERO_ADDRESS].sort_values("order", kind="stable")
+
+    # 주소별 누적합 = 각 변화 직후 잔고 (벡터화, 재생 루프에서 dict 조회 없음)
+    # before는 직전 after를 그대로 써야 장부에 넣은 값과 비트 단위로 같다 (after - delta는 반올림 오차)
+    deltas["after"] = deltas.groupby("address", sort=False)["delta"].cumsum()
+    deltas["before"] = deltas.groupby("address", sort=False)["after"].shift(fill_value=0.0)
+    return deltas[["address", "before", "after", "block_number", "timestamp"]].reset_index(drop=True)
+
+
+def replay_concentration(transfers_df: pd.DataFrame, period: str = "day", min_balance: float = 1e-9) -> pd.DataFrame:
+    """전송 로그를 한 번 재생하며 기간 끝마다 집중도 스냅샷
+
+    Args:
+        transfers_df: from, to, value, block_number, timestamp (블록/로그 순서)
+        period: "day" (UTC 일자) 또는 "block"
+        min_balance: 이 값 이하 잔고는 보유자로 세지 않음 (전액 전송 후 남는 부동소수 잔여 제외)
+
+    Returns:
+        date 또는 block_number, holders, total, gini, hhi, nakamoto, entropy
+        (전송이 있었던 기간만, 기간 마지막 전송 직후 상태)
+    """
+    deltas = balance_deltas(transfers_df)
+    if period == "day":
+        key_col = "date"
+        keys = pd.to_datetime(deltas["timestamp"], unit="s").dt.strftime("%Y-%m-%d").to_numpy()
+    elif period == "block":
+        key_col = "block_number"
+        keys = deltas["block_number"].to_numpy()
+    else:
+        raise ValueError(f"unknown period: {period}")
+
+    before = deltas["before"].to_numpy()
+    after = deltas["after"].to_numpy()
+    had, has = before > min_balance, after > min_balance
+    book = BalanceBook(np.concatenate([before[had], after[has]]))
+    before_rank = (np.searchsorted(book.values, before) + 1).tolist()
+    after_rank = (np.searchsorted(book.values, after) + 1).tolist()
+    had, has = had.tolist(), has.tolist()
+
+    # 기간 마지막 변화 위치
+    keys_list = keys.tolist()
+    last = np.flatnonzero(np.append(keys[1:] != keys[:-1], True)).tolist() if len(keys) else []
+
+    rows = []
+    j = 0
+    for i in range(len(keys_list)):
+        if had[i]:
+            book.remove(before_rank[i])
+        if has[i]:
+            book.insert(after_rank[i])
+        if j < len(last) and i == last[j]:
+            rows.append({key_col: keys_list[i], **book.snapshot()})
+            j += 1
+
+    return pd.DataFrame(rows, columns=[key_col, "holders", "total", "gini", "hhi", "nakamoto", "entropy"])
+
+
+def save_data(df: pd.DataFrame, name: str):
+    path = DATA_DIR / f"{name}.parquet"
+    df.to_parquet(path, index=False)
+    print(f"Saved: {path} ({len(df)} rows)")
+
+
+def main():
+    print("=== 전송 로그 재생 → 일별 집중도 ===\n")
+
+    for token in ["uma", "kleros"]:
+        path = DATA_DIR / f"{token}_transfers.parquet"
+        if not path.exists():
+            print(f"{path.name} 없음 — 건너뜀")
+            continue
+        columns = ["from", "to", "value", "block_number", "timestamp"]
+        has_chain = "chain" in pq.read_schema(path).names
+        transfers_df = pd.read_parquet(path, columns=columns + ["chain"] if has_chain else columns)
+        if not has_chain:
+            transfers_df["chain"] = DEFAULT_CHAIN
+
+        # 체인별 장부 (같은 주소라도 체인이 다르면 다른 잔고)
+        chain_series = []
+        for chain, chain_df in transfers_df.groupby("chain", sort=True):
+            series = replay_concentration(chain_df.reset_index(drop=True), period="day")
+            print(f"[{token} - {chain}] 전송 {len(chain_df):,}건 → {len(series)}일")
+            if not series.empty:
+                last = series.iloc[-1]
+                print(f"  {last['date']}: holders={last['holders']:,}, gini={last['gini']}, "
+                      f"hhi={last['hhi']}, nakamoto={last['nakamoto']}")
+            chain_series.append(series.assign(chain=chain))
+        if not chain_series:
+            print(f"[{token}] 전송 없음")
+            continue
+        series = pd.concat(chain_series, ignore_index=True)
+        save_data(series[["chain", *series.columns.drop("chain")]], f"{token}_concentration_series")
+
+
+if __name__ == "__main__":
+    main()
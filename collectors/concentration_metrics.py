@@ -5,32 +5,248 @@
 - 나카모토 계수 (Nakamoto Coefficient)
 - 섀넌 엔트로피 (Shannon Entropy)
 - 타일 지수 (Theil Index)
+
+모집단 하나는 ConcentrationProfile, 여러 그룹(체인/일자/라운드/카테고리)은 grouped_metrics로 한 번에 계산.
 """
 
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 from typing import List, Dict
 
 
-def gini_coefficient(values: np.ndarray) -> float:
+class ConcentrationProfile:
     """
-    지니 계수 계산
-    0 = 완전 평등, 1 = 완전 불평등
+    한 모집단의 집중도 지표 커널
+
+    양수 값만 한 번 필터링해 내림차순으로 한 번 정렬하고 누적합/누적 점유율을 한 번 구해 두면,
+    모든 지표(지니, HHI, 임계값별 나카모토, 엔트로피, 타일, 상위 N 점유율, 로렌츠 곡선)를
+    정렬 없이 이 배열들에서 유도한다. 아래 모듈 함수들은 이 클래스의 얇은 래퍼.
 
-    공식: G = (2 * Σ(i * x_i)) / (n * Σx_i) - (n+1)/n
+    keys(주소 등)를 함께 주면 같은 순서로 정렬해 self.keys에 두고, simulate의 exclude/merge에서 쓴다.
     """
-    values = np.array(values, dtype=float)
-    values = values[values > 0]  # 0 제외
 
-    if len(values) == 0:
-        return 0.0
+    def __init__(self, values: np.ndarray, keys=None):
+        values = np.asarray(values, dtype=float)
+        positive = values > 0
+        if keys is None:
+            self.keys = None
+            self.values = -np.sort(-values[positive])  # 내림차순
+        else:
+            order = np.argsort(-values[positive], kind="stable")
+            self.keys = np.asarray(keys, dtype=object)[positive][order]
+            self.values = values[positive][order]
+        self.n = len(self.values)
+        self.cumsum = np.cumsum(self.values)
+        self.total = float(self.cumsum[-1]) if self.n else 0.0
+        self.cum_share = self.cumsum / self.total if self.n else self.cumsum
+
+    def gini(self) -> float:
+        """
+        지니 계수
+        0 = 완전 평등, 1 = 완전 불평등
+
+        공식: G = (2 * Σ(i * x_i)) / (n * Σx_i) - (n+1)/n  (x 오름차순)
+        """
+        if self.n == 0:
+            return 0.0
+        n = self.n
+        ascending = self.values[::-1]
+        gini = (2 * np.sum(np.arange(1, n + 1) * ascending)) / (n * self.total) - (n + 1) / n
+        return round(float(gini), 4)
+
+    def hhi(self) -> float:
+        """
+        허핀달-허쉬만 지수 (HHI)
+        0 = 완전 분산, 10000 = 완전 독점
+
+        공식: HHI = Σ(s_i^2) * 10000, s_i = 시장 점유율
+        """
+        if self.n == 0:
+            return 0.0
+        shares = self.values / self.total
+        return round(float(np.sum(shares ** 2) * 10000), 2)
+
+    def nakamoto(self, threshold=0.51):
+        """
+        threshold를 장악하기 위해 필요한 최소 엔티티 수 (누적 점유율 이진 탐색)
+
+        threshold가 배열이면 임계값별 계수 배열을 반환.
+        """
+        thresholds = np.asarray(threshold, dtype=float)
+        if self.n == 0:
+            counts = np.zeros(thresholds.shape, dtype=np.int64)
+        else:
+            counts = np.minimum(np.searchsorted(self.cum_share, thresholds, side="left") + 1, self.n)
+        return int(counts) if counts.ndim == 0 else counts
+
+    def entropy(self) -> float:
+        """
+        섀넌 엔트로피 (bits)
+        높을수록 분산됨
+
+        공식: H = -Σ(p_i * log2(p_i))
+        """
+        if self.n == 0:
+            return 0.0
+        probs = self.values / self.total
+        return round(float(-np.sum(probs * np.log2(probs))), 4)
+
+    def normalized_entropy(self) -> float:
+        """
+        정규화된 엔트로피 (0~1)
+        0 = 완전 집중, 1 = 완전 분산
+        """
+        if self.n <= 1:
+            return 0.0
+        return round(self.entropy() / np.log2(self.n), 4)
+
+    def theil(self) -> float:
+        """
+        타일 지수 (Theil Index)
+        0 = 완전 평등, 값이 클수록 불평등
+
+        지니 계수보다 극단값에 민감
+        """
+        if self.n == 0:
+            return 0.0
+        ratio = self.values / (self.total / self.n)
+        return round(float(np.sum(ratio * np.log(ratio)) / self.n), 4)
+
+    def top_n_share(self, n):
+        """상위 N개의 점유율 (%). n이 배열이면 N별 배열."""
+        ns = np.asarray(n, dtype=np.int64)
+        if self.n == 0:
+            shares = np.zeros(ns.shape)
+        else:
+            top = np.minimum(ns, self.n)
+            top_sum = np.where(top > 0, self.cumsum[np.maximum(top, 1) - 1], 0.0)
+            shares = np.round(top_sum / self.total * 100, 2)
+        return float(shares) if shares.ndim == 0 else shares
+
+    def lorenz_curve(self, points: int = None) -> tuple:
+        """
+        로렌츠 곡선 (인구 누적 비율, 값 누적 비율), 오름차순, (0, 0)에서 시작
+
+        points를 주면 인구 축을 균등 간격 points개 위치로 줄여 반환 (수백만 홀더 차트용).
+        """
+        if self.n == 0:
+            return np.array([0.0, 1.0]), np.array([0.0, 0.0])
+        # 하위 k명 합 = 전체 - 상위 (n-k)명 합
+        top = np.concatenate([[0.0], self.cumsum])
+        lower = (self.total - top[::-1]) / self.total
+        ranks = np.arange(self.n + 1) if points is None else np.unique(np.linspace(0, self.n, points).round().astype(np.int64))
+        return ranks / self.n, lower[ranks]
+
+    def simulate(self, scenarios: List[Dict], threshold: float = 0.51, max_cells: int = 4_000_000) -> pd.DataFrame:
+        """
+        what-if 시나리오 묶음을 한 번의 행렬 연산으로 평가 (행 = 시나리오, 열 = 내림차순 홀더)
+
+        시나리오 dict (모두 선택, 적용 순서대로):
+            name: 이름
+            exclude: 제외할 keys (거래소 지갑 등, keys 필요)
+            exclude_top: 상위 k개 제외
+            merge: 한 홀더로 합칠 keys 묶음 목록 (엔티티 클러스터 등, keys 필요)
+            merge_top: 남은 홀더 중 상위 k개를 한 홀더로 합침
+            cap: 한 홀더 최대 점유율 (0~1, 적용 전 합계 기준, 초과분은 제거)
+
+        제외/상위 병합/상한은 내림차순을 깨지 않으므로 마스크와 행 합/누적합만으로 처리한다.
+        임의 묶음 병합이 있는 시나리오 청크만 행 정렬을 한 번 더 한다.
+        시나리오는 max_cells 원소 이하 청크로 나눠 메모리를 제한.
+
+        Returns:
+            scenario + METRIC_COLUMNS (calculate_all_metrics와 같은 반올림). 첫 행은 baseline.
+        """
+        scenarios = [{"name": "baseline"}] + list(scenarios)
+        n = max(self.n, 1)
+        rows = max(1, max_cells // n)
+        parts = []
+        for start in range(0, len(scenarios), rows):
+            chunk = scenarios[start:start + rows]
+            parts.append(sorted_matrix_metrics(self._scenario_matrix(chunk, n), threshold))
+
+        result = pd.DataFrame({"scenario": [sc.get("name", f"scenario_{i}") for i, sc in enumerate(scenarios)]})
+        for name in ["sample_size", "total", *BOOTSTRAP_METRICS]:
+            values = np.concatenate([part[name] for part in parts])
+            digits = BOOTSTRAP_METRICS.get(name)
+            result[name] = values if name in ("sample_size", "total") or digits is None else np.round(values, digits)
+        return result[["scenario", *METRIC_COLUMNS]]
+
+    def _scenario_matrix(self, scenarios: List[Dict], n: int) -> np.ndarray:
+        """시나리오별 변형된 내림차순 값 행렬 (제외/병합된 자리는 0)"""
+        values = np.zeros(n)
+        values[:self.n] = self.values
+        matrix = np.tile(values, (len(scenarios), 1))
+        position = np.arange(n)
+
+        def key_mask(keys):
+            if self.keys is None:
+                raise ValueError("exclude/merge by key needs ConcentrationProfile(values, keys)")
+            mask = np.zeros(n, dtype=bool)
+            mask[:self.n] = np.isin(self.keys, list(keys))
+            return mask
+
+        exclude_top = np.array([sc.get("exclude_top", 0) for sc in scenarios])
+        matrix[position[None, :] < exclude_top[:, None]] = 0.0
+        for i, sc in enumerate(scenarios):
+            if sc.get("exclude"):
+                matrix[i, key_mask(sc["exclude"])] = 0.0
+
+        # 임의 묶음 병합: 묶음 합을 첫 자리에 두고 나머지는 0 → 순서가 깨지므로 행 재정렬
+        merged_any = False
+        for i, sc in enumerate(scenarios):
+            for group in sc.get("merge", []):
+                members = np.flatnonzero(key_mask(group) & (matrix[i] > 0))
+                if len(members) > 1:
+                    matrix[i, members[0]] = matrix[i, members].sum()
+                    matrix[i, members[1:]] = 0.0
+                    merged_any = True
+        if merged_any:
+            matrix = -np.sort(-matrix, axis=1)
+
+        # 상위 k 병합: 남은 홀더 순위 ≤ k를 첫 남은 자리로 모음 (합친 값이 가장 크므로 순서 유지)
+        merge_top = np.array([sc.get("merge_top", 0) for sc in scenarios])
+        rank = np.cumsum(matrix > 0, axis=1)
+        group = (rank <= merge_top[:, None]) & (matrix > 0) & (merge_top[:, None] > 1)
+        merged = np.sum(matrix * group, axis=1)
+        first = np.argmax(matrix > 0, axis=1)
+        target = group.any(axis=1)
+        matrix[group] = 0.0
+        matrix[np.flatnonzero(target), first[target]] = merged[target]
+
+        cap = np.array([sc.get("cap", np.inf) for sc in scenarios], dtype=float)
+        return np.minimum(matrix, (cap * matrix.sum(axis=1))[:, None])
+
+    def metrics(self, name: str = "") -> Dict:
+        """calculate_all_metrics와 같은 dict"""
+        top5, top10, top20 = self.top_n_share(np.array([5, 10, 20])).tolist() if self.n else (0.0, 0.0, 0.0)
+        return {
+            "name": name,
+            "sample_size": self.n,
+            "total": self.total,
+
+            # 기본 점유율
+            "top5_share": top5,
+            "top10_share": top10,
+            "top20_share": top20,
+
+            # 학술적 지표
+            "gini": self.gini(),
+            "hhi": self.hhi(),
+            "nakamoto": self.nakamoto(),
+            "entropy": self.entropy(),
+            "normalized_entropy": self.normalized_entropy(),
+            "theil": self.theil(),
+        }
 
-    values = np.sort(values)
-    n = len(values)
-    cumsum = np.cumsum(values)
 
-    gini = (2 * np.sum((np.arange(1, n + 1) * values))) / (n * cumsum[-1]) - (n + 1) / n
-    return round(gini, 4)
+def gini_coefficient(values: np.ndarray) -> float:
+    """
+    지니 계수 계산
+    0 = 완전 평등, 1 = 완전 불평등
+    """
+    return ConcentrationProfile(values).gini()
 
 
 def herfindahl_hirschman_index(values: np.ndarray) -> float:
@@ -42,20 +258,8 @@ def herfindahl_hirschman_index(values: np.ndarray) -> float:
     - < 1500: 경쟁적 시장
     - 1500-2500: 중간 집중
     - > 2500: 고도 집중
-
-    공식: HHI = Σ(s_i^2) * 10000, s_i = 시장 점유율
     """
-    values = np.array(values, dtype=float)
-    values = values[values > 0]
-
-    if len(values) == 0:
-        return 0.0
-
-    total = np.sum(values)
-    shares = values / total  # 점유율
-    hhi = np.sum(shares ** 2) * 10000
-
-    return round(hhi, 2)
+    return ConcentrationProfile(values).hhi()
 
 
 def nakamoto_coefficient(values: np.ndarray, threshold: float = 0.51) -> int:
@@ -65,129 +269,310 @@ def nakamoto_coefficient(values: np.ndarray, threshold: float = 0.51) -> int:
 
     값이 낮을수록 중앙화됨 (1 = 완전 중앙화)
     """
-    values = np.array(values, dtype=float)
-    values = values[values > 0]
-
-    if len(values) == 0:
-        return 0
-
-    values = np.sort(values)[::-1]  # 내림차순
-    total = np.sum(values)
-
-    cumsum = 0
-    for i, v in enumerate(values):
-        cumsum += v
-        if cumsum / total >= threshold:
-            return i + 1
-
-    return len(values)
+    return ConcentrationProfile(values).nakamoto(threshold)
 
 
 def shannon_entropy(values: np.ndarray) -> float:
     """
     섀넌 엔트로피 계산
     높을수록 분산됨
+    """
+    return ConcentrationProfile(values).entropy()
+
 
-    공식: H = -Σ(p_i * log2(p_i))
+def normalized_entropy(values: np.ndarray) -> float:
     """
-    values = np.array(values, dtype=float)
-    values = values[values > 0]
+    정규화된 엔트로피 (0~1)
+    0 = 완전 집중, 1 = 완전 분산
+    """
+    return ConcentrationProfile(values).normalized_entropy()
 
-    if len(values) == 0:
-        return 0.0
 
-    total = np.sum(values)
-    probs = values / total
+def theil_index(values: np.ndarray) -> float:
+    """
+    타일 지수 (Theil Index) 계산
+    0 = 완전 평등, 값이 클수록 불평등
+    """
+    return ConcentrationProfile(values).theil()
 
-    # log(0) 방지
-    probs = probs[probs > 0]
-    entropy = -np.sum(probs * np.log2(probs))
 
-    return round(entropy, 4)
+def top_n_share(values: np.ndarray, n: int) -> float:
+    """상위 N개의 점유율 (%)"""
+    return ConcentrationProfile(values).top_n_share(n)
 
 
-def normalized_entropy(values: np.ndarray) -> float:
+def concentration_curve(
+    df: pd.DataFrame,
+    value_cols,
+    ns=None,
+    group_col: str = None,
+) -> pd.DataFrame:
     """
-    정규화된 엔트로피 (0~1)
-    0 = 완전 집중, 1 = 완전 분산
+    상위 N개 점유율 곡선 (정렬 1회 + 누적합)
+
+    지표마다 (그룹, 값 내림차순)으로 한 번만 정렬하고, 그룹 구간별 누적합으로
+    모든 N의 점유율을 한 번에 구한다. nlargest(n)을 N마다 반복하는 것과 같은 값.
+
+    Args:
+        df: 원본 DataFrame
+        value_cols: 지표 컬럼 (문자열 하나 또는 리스트). NaN은 0으로 취급
+        ns: 조회할 N 목록. None이면 그룹 내 모든 순위(1..그룹 크기)
+        group_col: 그룹 컬럼 (카테고리, 시간 버킷 등). None이면 전체 한 그룹
+
+    Returns:
+        [group_col,] top_n, group_size, <col>_share (%) 컬럼의 tidy DataFrame.
+        N이 그룹 크기보다 크면 점유율은 100 (합계 0인 그룹은 0).
     """
-    values = np.array(values, dtype=float)
-    values = values[values > 0]
+    if isinstance(value_cols, str):
+        value_cols = [value_cols]
 
-    if len(values) <= 1:
-        return 0.0
+    if group_col is None:
+        codes = np.zeros(len(df), dtype=np.int64)
+        groups = None
+    else:
+        codes, groups = pd.factorize(df[group_col], sort=True, use_na_sentinel=False)
 
-    max_entropy = np.log2(len(values))
-    if max_entropy == 0:
-        return 0.0
+    sizes = np.bincount(codes, minlength=0 if groups is None else len(groups))
+    present = np.flatnonzero(sizes)
+    ends = np.cumsum(sizes)
+    starts = ends - sizes
 
-    return round(shannon_entropy(values) / max_entropy, 4)
+    # 출력할 (그룹, 순위) 위치 — 모든 지표가 같은 그룹 크기를 공유
+    if ns is None:
+        out_group = np.repeat(present, sizes[present])
+        top_n = np.arange(len(df)) - starts[out_group] + 1
+    else:
+        ns = np.asarray(ns, dtype=np.int64)
+        out_group = np.repeat(present, len(ns))
+        top_n = np.tile(ns, len(present))
+    pos = starts[out_group] + np.minimum(top_n, sizes[out_group]) - 1
 
+    result = {}
+    if group_col is not None:
+        result[group_col] = np.asarray(groups)[out_group]
+    result["top_n"] = top_n
+    result["group_size"] = sizes[out_group]
 
-def theil_index(values: np.ndarray) -> float:
+    for col in value_cols:
+        values = np.nan_to_num(df[col].to_numpy(dtype=float), nan=0.0)
+        order = np.lexsort((-values, codes))
+        cumsum = np.cumsum(values[order])
+
+        # 그룹 구간별 누적합 = 전체 누적합 - 그룹 시작 직전 누적합
+        offset = np.concatenate([[0.0], cumsum])[starts]
+        totals = np.concatenate([[0.0], cumsum])[ends] - offset
+
+        top_sum = cumsum[pos] - offset[out_group]
+        total = totals[out_group]
+        share = np.divide(top_sum, total, out=np.zeros_like(top_sum), where=total > 0) * 100
+        result[f"{col}_share"] = share
+
+    return pd.DataFrame(result)
+
+
+METRIC_COLUMNS = [
+    "sample_size", "total", "top5_share", "top10_share", "top20_share",
+    "gini", "hhi", "nakamoto", "entropy", "normalized_entropy", "theil",
+]
+
+
+def grouped_metrics(df: pd.DataFrame, value_col: str, group_col) -> pd.DataFrame:
     """
-    타일 지수 (Theil Index) 계산
-    0 = 완전 평등, 값이 클수록 불평등
+    그룹별 집중도 지표를 한 번의 벡터 연산으로 계산 (체인/일자/라운드/카테고리 등)
+
+    (그룹, 값 내림차순)으로 한 번 정렬한 뒤 그룹 구간별 합은 np.add.reduceat,
+    순위 지표(상위 N 점유율, 나카모토)는 그룹 내 누적 점유율로 구한다.
+    누적 점유율은 그룹 합으로 나눈 값을 누적하므로 큰 그룹 뒤의 작은 그룹도 정밀도를 잃지 않는다.
+    그룹마다 calculate_all_metrics를 호출한 것과 (부동소수 반올림 범위에서) 같은 값.
 
-    지니 계수보다 극단값에 민감
+    Args:
+        df: 원본 DataFrame
+        value_col: 지표 대상 컬럼 (0 이하/NaN은 제외)
+        group_col: 그룹 컬럼 (문자열 하나 또는 리스트)
+
+    Returns:
+        group_col + METRIC_COLUMNS의 tidy DataFrame (그룹 키 오름차순).
+        양수 값이 없는 그룹은 sample_size 0, 지표 0.
     """
-    values = np.array(values, dtype=float)
-    values = values[values > 0]
+    keys = [group_col] if isinstance(group_col, str) else list(group_col)
+    grouper = df.groupby(keys, sort=True, dropna=False)
+    codes = grouper.ngroup().to_numpy()
+    result = grouper.size().index.to_frame(index=False)
+    n_groups = len(result)
+
+    values = df[value_col].to_numpy(dtype=float)
+    positive = values > 0
+    values, codes = values[positive], codes[positive]
+
+    # 그룹 오름차순, 그룹 안에서 값 내림차순: 값 정렬 후 그룹 코드로 안정 정렬
+    # (그룹이 65536개 이하면 uint16 코드 → numpy가 radix sort 사용, lexsort보다 수 배 빠름)
+    order = np.argsort(-values)
+    code_dtype = np.uint16 if n_groups <= 1 << 16 else np.int64
+    order = order[np.argsort(codes[order].astype(code_dtype), kind="stable")]
+    values, codes = values[order], codes[order]
+    sizes = np.bincount(codes, minlength=n_groups)
+    present = np.flatnonzero(sizes)
+    starts = np.cumsum(sizes) - sizes
+    rank = np.arange(len(values)) - starts[codes]  # 그룹 내 0부터 시작하는 내림차순 순위
+
+    def segment_sum(x):
+        out = np.zeros(n_groups)
+        if len(present):
+            out[present] = np.add.reduceat(x, starts[present])
+        return out
+
+    total = segment_sum(values)
+    share = values / total[codes]
+    n = sizes.astype(float)
+    safe_n = np.maximum(n, 1)
+
+    # 그룹 내 누적 점유율 (직전 그룹까지의 누적을 빼서 구간별로 0부터 시작)
+    cum = np.cumsum(share)
+    offset = np.concatenate([[0.0], cum])[starts]
+    cum_share = cum - offset[codes]
+
+    result["sample_size"] = sizes
+    result["total"] = total
+    for top_n in [5, 10, 20]:
+        pos = starts + np.minimum(top_n, sizes) - 1
+        top = np.where(sizes > 0, cum[np.maximum(pos, 0)] - offset, 0.0) if len(values) else np.zeros(n_groups)
+        result[f"top{top_n}_share"] = np.round(top * 100, 2)
+
+    # 지니: 오름차순 순위 i = n - rank
+    weighted = segment_sum((sizes[codes] - rank) * values)
+    gini = np.divide(2 * weighted, n * total, out=np.zeros(n_groups), where=sizes > 0) - (n + 1) / safe_n
+    result["gini"] = np.round(np.where(sizes > 0, gini, 0.0), 4)
+    result["hhi"] = np.round(segment_sum(share ** 2) * 10000, 2)
+
+    # 나카모토: 누적 점유율이 51%에 못 미치는 순위 수 + 1
+    below = np.bincount(codes, weights=cum_share < 0.51, minlength=n_groups).astype(np.int64)
+    result["nakamoto"] = np.where(sizes > 0, np.minimum(below + 1, sizes), 0)
+
+    entropy = segment_sum(-share * np.log2(share))
+    result["entropy"] = np.round(entropy, 4)
+    max_entropy = np.log2(np.maximum(n, 2))
+    result["normalized_entropy"] = np.where(sizes > 1, np.round(np.round(entropy, 4) / max_entropy, 4), 0.0)
+
+    ratio = share * sizes[codes]  # x / 평균
+    result["theil"] = np.round(segment_sum(ratio * np.log(ratio)) / safe_n, 4)
+    return result
 
-    if len(values) == 0:
-        return 0.0
 
-    n = len(values)
-    mean = np.mean(values)
+def calculate_all_metrics(values: np.ndarray, name: str = "") -> Dict:
+    """모든 집중도 지표 계산 (필터/정렬 1회, ConcentrationProfile 참고)"""
+    return ConcentrationProfile(values).metrics(name)
 
-    if mean == 0:
-        return 0.0
 
-    theil = np.sum((values / mean) * np.log(values / mean)) / n
+# ─── 부트스트랩 신뢰구간 ─────────────────────────────────────────
 
-    return round(theil, 4)
+# 지표별 반올림 자릿수 (calculate_all_metrics와 같게, None은 정수)
+BOOTSTRAP_METRICS = {
+    "top5_share": 2, "top10_share": 2, "top20_share": 2,
+    "gini": 4, "hhi": 2, "nakamoto": None, "entropy": 4, "normalized_entropy": 4, "theil": 4,
+}
 
 
-def top_n_share(values: np.ndarray, n: int) -> float:
-    """상위 N개의 점유율 (%)"""
-    values = np.array(values, dtype=float)
-    values = values[values > 0]
+def sorted_matrix_metrics(desc: np.ndarray, threshold: float = 0.51) -> Dict[str, np.ndarray]:
+    """
+    행마다 내림차순인 (S × n) 행렬의 행별 집중도 지표 — 0은 '홀더 없음'으로 보고 건너뜀
 
-    if len(values) == 0:
-        return 0.0
+    0을 빼고 앞으로 당기는 대신 양수 마스크의 누적합을 행 안 순위로 써서
+    정렬 없이 순위 지표(지니, 나카모토, 상위 N)를 구한다. 모든 연산은 axis=1.
+
+    Returns:
+        sample_size, total, BOOTSTRAP_METRICS 지표의 반올림하지 않은 배열 (nakamoto는 정수).
+        양수가 없는 행은 모두 0.
+    """
+    positive = desc > 0
+    n = positive.sum(axis=1)
+    total = desc.sum(axis=1)
+    has = n > 0
+    safe_n = np.maximum(n, 1)
+    shares = desc / np.where(total > 0, total, 1.0)[:, None]
+    cum_share = np.cumsum(shares, axis=1)
+    rank = np.cumsum(positive, axis=1)  # 양수 중 내림차순 순위 (1부터)
+
+    result = {"sample_size": n, "total": total}
+    for k in [5, 10, 20]:
+        result[f"top{k}_share"] = np.sum(shares * (rank <= k), axis=1) * 100
+    # 지니: 오름차순 순위 i = n - rank + 1
+    weighted = np.sum(desc * (n[:, None] - rank + 1), axis=1)
+    result["gini"] = np.where(has, 2 * weighted / (safe_n * np.where(has, total, 1.0)) - (n + 1) / safe_n, 0.0)
+    result["hhi"] = np.sum(shares ** 2, axis=1) * 10000
+    result["nakamoto"] = np.where(has, np.minimum(np.sum(positive & (cum_share < threshold), axis=1) + 1, n), 0)
+
+    log2_shares = np.log2(shares, where=positive, out=np.zeros_like(shares))
+    result["entropy"] = 0.0 - np.sum(shares * log2_shares, axis=1)
+    result["normalized_entropy"] = np.where(n > 1, result["entropy"] / np.log2(np.maximum(n, 2)), 0.0)
+    ratio = shares * n[:, None]  # x / 평균
+    log_ratio = np.log(ratio, where=positive, out=np.zeros_like(ratio))
+    result["theil"] = np.sum(ratio * log_ratio, axis=1) / safe_n
+    return result
+
+
+def matrix_metrics(samples: np.ndarray, threshold: float = 0.51) -> Dict[str, np.ndarray]:
+    """
+    (B × n) 양수 행렬의 행별 집중도 지표 — 행 정렬 1회 후 sorted_matrix_metrics
 
-    values = np.sort(values)[::-1]
-    total = np.sum(values)
+    반올림하지 않은 float 배열 (nakamoto만 정수 배열)을 반환.
+    """
+    return sorted_matrix_metrics(-np.sort(-samples, axis=1), threshold)
 
-    top_sum = np.sum(values[:n])
 
-    return round(top_sum / total * 100, 2)
+def _bootstrap_chunk(values: np.ndarray, n_rows: int, seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    """워커: 재표본 n_rows개를 (n_rows × n) 인덱스 행렬 하나로 뽑아 matrix_metrics"""
+    rng = np.random.default_rng(seed)
+    index = rng.integers(0, len(values), size=(n_rows, len(values)))
+    return matrix_metrics(values[index])
 
 
-def calculate_all_metrics(values: np.ndarray, name: str = "") -> Dict:
-    """모든 집중도 지표 계산"""
+def bootstrap_metrics(
+    values: np.ndarray,
+    n_resamples: int = 10_000,
+    confidence: float = 0.95,
+    seed: int = 0,
+    max_cells: int = 4_000_000,
+    workers: int = 1,
+) -> Dict[str, list]:
+    """
+    집중도 지표의 부트스트랩 백분위 신뢰구간
+
+    재표본을 max_cells 원소 이하의 (행 × n) 인덱스 행렬 청크로 나눠 뽑는다.
+    청크마다 SeedSequence.spawn으로 독립 시드를 주므로 workers 수와 무관하게 같은 seed면 같은 결과.
+
+    Args:
+        values: 잔고 배열 (0 이하/NaN 제외)
+        n_resamples: 재표본 수
+        confidence: 신뢰수준
+        seed: 난수 시드
+        max_cells: 청크 하나의 최대 원소 수 (메모리 상한)
+        workers: 프로세스 수 (1이면 현재 프로세스)
 
-    values = np.array(values, dtype=float)
+    Returns:
+        {지표: [하한, 상한]} (BOOTSTRAP_METRICS 지표, calculate_all_metrics와 같은 반올림)
+    """
+    values = np.asarray(values, dtype=float)
     values = values[values > 0]
+    if len(values) == 0:
+        return {name: [0, 0] for name in BOOTSTRAP_METRICS}
 
-    return {
-        "name": name,
-        "sample_size": len(values),
-        "total": float(np.sum(values)),
+    rows = max(1, min(n_resamples, max_cells // len(values)))
+    sizes = [min(rows, n_resamples - start) for start in range(0, n_resamples, rows)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
 
-        # 기본 점유율
-        "top5_share": top_n_share(values, 5),
-        "top10_share": top_n_share(values, 10),
-        "top20_share": top_n_share(values, 20),
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_bootstrap_chunk, [values] * len(sizes), sizes, seeds))
+    else:
+        parts = [_bootstrap_chunk(values, size, s) for size, s in zip(sizes, seeds)]
 
-        # 학술적 지표
-        "gini": gini_coefficient(values),
-        "hhi": herfindahl_hirschman_index(values),
-        "nakamoto": nakamoto_coefficient(values),
-        "entropy": shannon_entropy(values),
-        "normalized_entropy": normalized_entropy(values),
-        "theil": theil_index(values),
-    }
+    alpha = (1 - confidence) / 2
+    result = {}
+    for name, digits in BOOTSTRAP_METRICS.items():
+        samples = np.concatenate([part[name] for part in parts])
+        low, high = np.quantile(samples, [alpha, 1 - alpha])
+        result[name] = [int(round(low)), int(round(high))] if digits is None else [round(float(low), digits), round(float(high), digits)]
+    return result
 
 
 def interpret_hhi(hhi: float) -> str:
@@ -230,12 +615,22 @@ if __name__ == "__main__":
     print(f"  정규화 엔트로피: {uma_metrics['normalized_entropy']} (1에 가까울수록 분산)")
     print()
 
-    # Kleros
+    # what-if: 상위 홀더 제외/병합, 단일 홀더 상한
+    profile = ConcentrationProfile(uma_df["balance"].values, uma_df["address"].str.lower().values)
+    scenarios = [{"name": f"exclude_top{k}", "exclude_top": k} for k in [1, 3, 10]]
+    scenarios += [{"name": "merge_top5", "merge_top": 5}, {"name": "cap_10pct", "cap": 0.10}]
+    print("[UMA what-if]")
+    print(profile.simulate(scenarios)[["scenario", "sample_size", "gini", "hhi", "nakamoto", "top10_share"]].to_string(index=False))
+    print()
+
+    # Kleros (체인별 지표를 한 번에)
     kleros_df = pd.read_parquet(DATA_DIR / "kleros_holders.parquet")
+    by_chain = grouped_metrics(kleros_df, "balance", "chain").set_index("chain")
 
     for chain in ["ethereum", "arbitrum"]:
-        chain_df = kleros_df[kleros_df["chain"] == chain]
-        metrics = calculate_all_metrics(chain_df["balance"].values, f"Kleros ({chain})")
+        if chain not in by_chain.index:
+            continue
+        metrics = by_chain.loc[chain]
 
         print(f"[Kleros - {chain.upper()}]")
         print(f"  샘플 수: {metrics['sample_size']}")
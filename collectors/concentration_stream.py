@@ -0,0 +1,303 @@
+"""
+스트리밍 집중도 지표 (고정 메모리)
+
+먼지 잔고까지 포함한 전체 홀더 원장(수백만 주소)을 한 번에 float64 배열로 올리지 않고
+청크 단위로 읽으면서 지표를 누적한다.
+
+- 정확: sample_size, total, HHI (Σx²), 엔트로피/타일 (Σx·ln x), 상위 K 홀더와 상위 N 점유율 (N ≤ K)
+- 근사 + 오차 한계: 지니, 나카모토
+  상위 K를 제외한 꼬리는 로그 버킷 히스토그램(상대 오차 relative_accuracy인 병합 가능한 분위수 스케치)에
+  버킷별 개수와 합을 정확히 누적한다. 버킷 안의 값은 [lo, hi] 구간에 있다는 것만 알므로
+  로렌츠 곡선을 버킷 경계에서 정확히, 버킷 안에서는 위/아래 한계로 감싸 지니 구간을 구한다.
+
+메모리는 top_k + 버킷 수(값 범위 / log(gamma))에 비례하고 홀더 수와 무관하다.
+두 프로필은 merge로 합칠 수 있다 (체인별/파일별 병렬 스캔 후 합산).
+"""
+
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pyarrow.dataset as ds
+
+from collectors.concentration_metrics import interpret_gini, interpret_hhi
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+class StreamingProfile:
+    """청크를 update로 누적하는 집중도 프로필
+
+    Args:
+        top_k: 정확히 유지할 상위 홀더 수 (top20_share를 위해 20 이상)
+        relative_accuracy: 꼬리 스케치의 버킷 상대 폭 α (버킷 hi/lo = (1+α)/(1-α))
+    """
+
+    def __init__(self, top_k: int = 1000, relative_accuracy: float = 0.01):
+        if top_k < 20:
+            raise ValueError("top_k must be >= 20")
+        self.top_k = top_k
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+
+        self.n = 0
+        self.total = 0.0
+        self.sum_sq = 0.0
+        self.sum_xlogx = 0.0
+        self.min_value = np.inf
+        self.max_value = 0.0
+        self.top = np.zeros(0)
+
+        # 버킷 i는 (gamma^(i-1), gamma^i] — base는 counts[0]의 버킷 번호
+        self.base = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros(0)
+
+    # ─── 누적 ───────────────────────────────────────────────────
+
+    def _bucket(self, values: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(values) / self._log_gamma).astype(np.int64)
+
+    def _grow(self, lo: int, hi: int):
+        """버킷 배열이 [lo, hi] 번호를 담도록 확장"""
+        if len(self.counts) == 0:
+            self.base = lo
+            self.counts = np.zeros(hi - lo + 1, dtype=np.int64)
+            self.sums = np.zeros(hi - lo + 1)
+            return
+        before = max(self.base - lo, 0)
+        after = max(hi - (self.base + len(self.counts) - 1), 0)
+        if before or after:
+            self.counts = np.pad(self.counts, (before, after))
+            self.sums = np.pad(self.sums, (before, after))
+            self.base -= before
+
+    def _keep_top(self, candidates: np.ndarray):
+        if len(candidates) > self.top_k:
+            candidates = np.partition(candidates, len(candidates) - self.top_k)[-self.top_k:]
+        self.top = candidates
+
+    def update(self, values) -> "StreamingProfile":
+        """청크 하나 누적 (0 이하/NaN 제외)"""
+        values = np.asarray(values, dtype=float)
+        values = values[values > 0]
+        if len(values) == 0:
+            return self
+
+        self.n += len(values)
+        self.total += float(np.sum(values))
+        self.sum_sq += float(np.sum(values ** 2))
+        self.sum_xlogx += float(np.sum(values * np.log(values)))
+        self.min_value = min(self.min_value, float(values.min()))
+        self.max_value = max(self.max_value, float(values.max()))
+
+        buckets = self._bucket(values)
+        self._grow(int(buckets.min()), int(buckets.max()))
+        offset = buckets - self.base
+        self.counts += np.bincount(offset, minlength=len(self.counts))
+        self.sums += np.bincount(offset, weights=values, minlength=len(self.sums))
+
+        self._keep_top(np.concatenate([self.top, values]))
+        return self
+
+    def merge(self, other: "StreamingProfile") -> "StreamingProfile":
+        """다른 프로필을 합침 (같은 top_k / relative_accuracy)"""
+        if other.gamma != self.gamma or other.top_k != self.top_k:
+            raise ValueError("profiles must share top_k and relative_accuracy")
+        if other.n == 0:
+            return self
+
+        self.n += other.n
+        self.total += other.total
+        self.sum_sq += other.sum_sq
+        self.sum_xlogx += other.sum_xlogx
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+
+        self._grow(other.base, other.base + len(other.counts) - 1)
+        start = other.base - self.base
+        self.counts[start:start + len(other.counts)] += other.counts
+        self.sums[start:start + len(other.sums)] += other.sums
+
+        self._keep_top(np.concatenate([self.top, other.top]))
+        return self
+
+    # ─── 지표 ───────────────────────────────────────────────────
+
+    def _tail(self) -> tuple:
+        """상위 K를 뺀 꼬리 버킷 (오름차순): counts, sums, lo, hi"""
+        counts = self.counts.copy()
+        sums = self.sums.copy()
+        if len(self.top):
+            offset = self._bucket(self.top) - self.base
+            counts -= np.bincount(offset, minlength=len(counts))
+            sums -= np.bincount(offset, weights=self.top, minlength=len(sums))
+
+        keep = counts > 0
+        index = np.flatnonzero(keep) + self.base
+        lo = np.maximum(self.gamma ** (index - 1), self.min_value)
+        # 꼬리 값은 상위 K의 최솟값 이하
+        hi = np.minimum(self.gamma ** index, self.top.min() if len(self.top) else self.max_value)
+        sums = np.clip(sums[keep], counts[keep] * lo, counts[keep] * hi)
+        return counts[keep], sums, lo, hi
+
+    def gini_bounds(self) -> tuple:
+        """지니 계수 (하한, 상한)
+
+        로렌츠 곡선은 버킷 경계 점에서 정확하다. 버킷 안의 곡선은 기울기가 [lo/μ, hi/μ]인 볼록 꺾은선이므로
+        현(chord)보다 아래, 기울기 lo → hi로 꺾이는 곡선보다 위에 있다. 지니 = 1 - 2 × 곡선 아래 면적.
+        """
+        if self.n == 0:
+            return 0.0, 0.0
+        tail_counts, tail_sums, tail_lo, tail_hi = self._tail()
+        top = np.sort(self.top)
+        counts = np.concatenate([tail_counts, np.ones(len(top))])
+        sums = np.concatenate([tail_sums, top])
+        lo = np.concatenate([tail_lo, top])
+        hi = np.concatenate([tail_hi, top])
+
+        mean = self.total / self.n
+        w = counts / self.n
+        h = sums / self.total
+        level = np.concatenate([[0.0], np.cumsum(h)[:-1]])
+        a, b = lo / mean, hi / mean
+
+        chord = np.sum(w * level + w * h / 2)
+        # 기울기 a로 w1만큼, 이후 b로 올라가는 가장 낮은 곡선
+        w1 = np.clip(np.divide(b * w - h, b - a, out=w.copy(), where=b > a), 0, w)
+        lowest = np.sum(w * level + a * w1 ** 2 / 2 + a * w1 * (w - w1) + b * (w - w1) ** 2 / 2)
+        return round(float(1 - 2 * chord), 4), round(float(1 - 2 * lowest), 4)
+
+    def nakamoto_bounds(self, threshold: float = 0.51) -> tuple:
+        """나카모토 계수 (추정, 하한, 상한) — 상위 K 안에서 결정되면 세 값이 같다"""
+        if self.n == 0:
+            return 0, 0, 0
+        target = threshold * self.total
+        top = -np.sort(-self.top)
+        cum_top = np.cumsum(top)
+        if len(top) and cum_top[-1] >= target:
+            count = min(int(np.searchsorted(cum_top / self.total, threshold, side="left")) + 1, len(top))
+            return count, count, count
+
+        # 꼬리 버킷을 큰 값부터 누적해 임계값을 넘는 버킷 안에서 필요한 개수의 범위
+        counts, sums, lo, hi = (x[::-1] for x in self._tail())
+        if len(counts) == 0:
+            return self.n, self.n, self.n
+        needed = target - (cum_top[-1] if len(top) else 0.0)
+        cum_sums = np.cumsum(sums)
+        j = min(int(np.searchsorted(cum_sums, needed, side="left")), len(counts) - 1)
+        before = len(top) + int(counts[:j].sum())
+        rest = needed - (cum_sums[j - 1] if j else 0.0)
+
+        def within(per_holder):
+            return int(np.clip(np.ceil(rest / per_holder), 1, counts[j]))
+
+        return before + within(sums[j] / counts[j]), before + within(hi[j]), before + within(lo[j])
+
+    def top_n_share(self, n: int) -> float:
+        """상위 N개 점유율 (%) — N ≤ top_k에서 정확"""
+        if n > self.top_k:
+            raise ValueError(f"n must be <= top_k ({self.top_k})")
+        if self.n == 0:
+            return 0.0
+        top = -np.sort(-self.top)
+        return round(float(np.sum(top[:n]) / self.total * 100), 2)
+
+    def entropy(self) -> float:
+        """섀넌 엔트로피 (bits): H = log2(T) - Σ x·log2(x) / T"""
+        if self.n == 0:
+            return 0.0
+        return round(float((np.log(self.total) - self.sum_xlogx / self.total) / np.log(2)), 4)
+
+    def metrics(self, name: str = "") -> Dict:
+        """calculate_all_metrics와 같은 키 + gini_bounds, nakamoto_bounds
+
+        gini는 구간 중앙값, nakamoto는 버킷 평균값 기준 추정치.
+        """
+        if self.n == 0:
+            hhi = theil = 0.0
+        else:
+            hhi = round(self.sum_sq / self.total ** 2 * 10000, 2)
+            mean = self.total / self.n
+            theil = round(float(self.sum_xlogx / self.total - np.log(mean)), 4)
+        entropy = self.entropy()
+        gini_low, gini_high = self.gini_bounds()
+        nakamoto, nakamoto_low, nakamoto_high = self.nakamoto_bounds()
+
+        return {
+            "name": name,
+            "sample_size": self.n,
+            "total": self.total,
+
+            # 기본 점유율 (정확)
+            "top5_share": self.top_n_share(5),
+            "top10_share": self.top_n_share(10),
+            "top20_share": self.top_n_share(20),
+
+            # 학술적 지표
+            "gini": round((gini_low + gini_high) / 2, 4),
+            "gini_bounds": (gini_low, gini_high),
+            "hhi": hhi,
+            "nakamoto": nakamoto,
+            "nakamoto_bounds": (nakamoto_low, nakamoto_high),
+            "entropy": entropy,
+            "normalized_entropy": round(entropy / np.log2(self.n), 4) if self.n > 1 else 0.0,
+            "theil": theil,
+        }
+
+
+def stream_parquet_metrics(
+    path: Path,
+    column: str,
+    filter=None,
+    name: str = "",
+    batch_size: int = 1 << 20,
+    top_k: int = 1000,
+    relative_accuracy: float = 0.01,
+) -> Dict:
+    """parquet 한 컬럼을 배치 단위로 스캔해 스트리밍 지표 계산 (메모리는 배치 하나 + 프로필)
+
+    Args:
+        path: parquet 파일/디렉터리
+        column: 잔고 컬럼
+        filter: pyarrow.dataset 필터 식 (예: pc.field("chain") == "ethereum")
+    """
+    profile = StreamingProfile(top_k=top_k, relative_accuracy=relative_accuracy)
+    dataset = ds.dataset(path, format="parquet")
+    for batch in dataset.to_batches(columns=[column], filter=filter, batch_size=batch_size):
+        profile.update(batch.column(0).to_numpy(zero_copy_only=False))
+    return profile.metrics(name)
+
+
+def print_metrics(metrics: Dict):
+    print(f"[{metrics['name']}]")
+    print(f"  샘플 수: {metrics['sample_size']:,}")
+    print(f"  지니 계수: {metrics['gini']} [{metrics['gini_bounds'][0]}, {metrics['gini_bounds'][1]}] "
+          f"({interpret_gini(metrics['gini'])})")
+    print(f"  HHI: {metrics['hhi']} ({interpret_hhi(metrics['hhi'])})")
+    print(f"  나카모토 계수: {metrics['nakamoto']} [{metrics['nakamoto_bounds'][0]}, {metrics['nakamoto_bounds'][1]}]")
+    print(f"  정규화 엔트로피: {metrics['normalized_entropy']}")
+    print()
+
+
+def main():
+    import pyarrow.compute as pc
+
+    print("=== 스트리밍 집중도 지표 ===\n")
+
+    uma_path = DATA_DIR / "uma_holders.parquet"
+    if uma_path.exists():
+        print_metrics(stream_parquet_metrics(uma_path, "balance", name="UMA"))
+
+    kleros_path = DATA_DIR / "kleros_holders.parquet"
+    if kleros_path.exists():
+        for chain in ["ethereum", "arbitrum"]:
+            metrics = stream_parquet_metrics(
+                kleros_path, "balance", filter=pc.field("chain") == chain, name=f"Kleros ({chain})",
+            )
+            if metrics["sample_size"]:
+                print_metrics(metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+주소 → 엔티티 클러스터링 (Transfer 그래프 휴리스틱 + union-find)
+
+거래소 핫월렛, 멀티시그, 같이 움직이는 지갑들을 한 엔티티로 묶어
+홀더/유권자 집중도를 주소 단위가 아니라 엔티티 단위로 계산한다.
+
+연결 규칙 (허브 주소는 제외: 서로 다른 상대 주소가 max_degree개 초과):
+1. 공통 자금원: 첫 입금(first funder)이 같은 주소끼리
+2. 잦은 직접 전송: 두 주소 사이 전송이 min_pair_transfers회 이상
+3. 라벨 파일 (선택): data/address_labels.csv (address, label)에서 같은 라벨끼리
+
+전송 로그 (data/uma_transfers.parquet, data/kleros_transfers.parquet) 컬럼:
+from, to, block_number, timestamp (unix 초), chain (선택, 없으면 전부 "ethereum").
+Kleros PNK는 Ethereum과 Arbitrum에 걸쳐 있고 체인마다 블록 번호 척도가 달라서
+체인 간 순서는 timestamp로 정한다 (같은 초 안에서는 chain 이름, block_number 순).
+
+누적 상태만 저장하고 전송 로그는 다시 읽지 않는다:
+- entity_addresses.parquet: address, first_funder, entity, label (첫 등장 순서)
+- entity_pairs.parquet: 주소 쌍별 전송 횟수
+- entity_state_<chain>.json: 체인별로 상태에 합친 마지막 블록 (DecodeWatermark)
+매 실행은 모든 전송 로그의 새 전송을 합쳐 시간 순으로 한 번에 상태에 합치고,
+union-find를 상태 전체에 다시 돌린다 (벡터화, 수백만 간선도 수 초).
+(전송 로그, 체인)마다 수집된 마지막 시각이 다르면 가장 뒤처진 로그의 마지막 시각 직전까지만 합친다
+(그 초의 블록이 아직 덜 수집됐을 수 있어 같은 초는 다음 실행으로 미룸).
+그래야 나중에 뒤처진 로그가 따라와도 이미 합친 전송보다 이른 전송이 끼어들지 않아
+첫 자금원/첫 등장 순서(= 엔티티 id)가 전체 재계산과 같다.
+새 전송 로그나 새 체인이 생기면 `--full`로 다시 계산해야 한다.
+
+실행 (저장소 루트): python -m collectors.entity_clusters [--full]
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from collectors.concentration_metrics import calculate_all_metrics
+from collectors.event_pipeline import DecodeWatermark
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+ADDRESSES_PATH = DATA_DIR / "entity_addresses.parquet"
+PAIRS_PATH = DATA_DIR / "entity_pairs.parquet"
+LABELS_PATH = DATA_DIR / "address_labels.csv"
+# 체인별 워터마크 파일 (STATE_PATH.format(chain=...))
+STATE_PATH = str(DATA_DIR / "entity_state_{chain}.json")
+
+TRANSFER_SOURCES = ["uma_transfers", "kleros_transfers"]
+# chain 컬럼이 없는 전송 로그의 체인
+DEFAULT_CHAIN = "ethereum"
+# 전송 순서 (체인 간 비교 가능한 timestamp가 우선)
+ORDER_COLUMNS = ["timestamp", "chain", "block_number"]
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+ADDRESS_COLUMNS = ["address", "first_funder", "entity", "label"]
+PAIR_COLUMNS = ["a", "b", "transfers"]
+
+
+# ─── union-find ─────────────────────────────────────────────────
+
+def union_find(n: int, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """간선 (u, v) 목록의 연결 요소 → 노드별 루트 (요소 안 가장 작은 인덱스)
+
+    벡터화 union-find: 모든 간선에서 큰 루트를 작은 루트 아래로 한 번에 붙이고(np.minimum.at),
+    포인터 점프로 경로를 완전히 압축하기를 바뀌는 간선이 없을 때까지 반복한다.
+    루트는 항상 더 작은 인덱스로만 붙으므로 순환이 생기지 않는다.
+    """
+    parent = np.arange(n)
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    while len(u):
+        pu, pv = parent[u], parent[v]
+        pending = pu != pv
+        if not pending.any():
+            break
+        u, v, pu, pv = u[pending], v[pending], pu[pending], pv[pending]
+        np.minimum.at(parent, np.maximum(pu, pv), np.minimum(pu, pv))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    return parent
+
+
+# ─── 누적 상태 ──────────────────────────────────────────────────
+
+def clean_transfers(transfers_df: pd.DataFrame) -> pd.DataFrame:
+    """소문자 주소, 민팅/소각(0x0)과 자기 전송 제외, ORDER_COLUMNS 순 안정 정렬"""
+    chain = transfers_df["chain"].to_numpy(dtype=object) if "chain" in transfers_df else DEFAULT_CHAIN
+    df = pd.DataFrame({
+        "from": transfers_df["from"].astype(str).str.lower().to_numpy(),
+        "to": transfers_df["to"].astype(str).str.lower().to_numpy(),
+        "timestamp": transfers_df["timestamp"].to_numpy(),
+        "chain": chain,
+        "block_number": transfers_df["block_number"].to_numpy(),
+    })
+    df = df[(df["from"] != ZERO_ADDRESS) & (df["to"] != ZERO_ADDRESS) & (df["from"] != df["to"])]
+    return df.sort_values(ORDER_COLUMNS, kind="stable").reset_index(drop=True)
+
+
+def update_state(addresses: pd.DataFrame, pairs: pd.DataFrame, transfers_df: pd.DataFrame) -> tuple:
+    """새 전송을 주소 테이블(첫 자금원)과 주소쌍 전송 횟수에 합침
+
+    모든 전송 로그의 새 전송을 한 번에 넘겨야 한다 (로그별로 나눠 넘기면
+    먼저 넘긴 로그의 입금이 더 이른 다른 로그 입금보다 앞서 첫 자금원이 된다).
+
+    Returns:
+        (addresses, pairs) — 새 주소는 첫 등장 순서로 뒤에 추가, entity는 cluster에서 채움
+    """
+    transfers = clean_transfers(transfers_df)
+    if transfers.empty:
+        return addresses, pairs
+
+    # 첫 등장 순서: 전송마다 (from, to) 순
+    seen = pd.unique(np.column_stack([transfers["from"], transfers["to"]]).ravel())
+    new = seen[~pd.Index(seen).isin(addresses["address"])]
+    if len(new):
+        added = pd.DataFrame({"address": new, "first_funder": None, "entity": None, "label": None}, columns=ADDRESS_COLUMNS)
+        addresses = added if addresses.empty else pd.concat([addresses, added], ignore_index=True)
+
+    # 첫 자금원은 아직 비어 있는 주소만 채운다 (이미 있는 값은 더 이른 입금)
+    first_in = transfers.drop_duplicates("to").set_index("to")["from"]
+    missing = addresses["first_funder"].isna()
+    addresses.loc[missing, "first_funder"] = addresses.loc[missing, "address"].map(first_in)
+
+    a = np.minimum(transfers["from"].to_numpy(dtype=object), transfers["to"].to_numpy(dtype=object))
+    b = np.maximum(transfers["from"].to_numpy(dtype=object), transfers["to"].to_numpy(dtype=object))
+    counts = pd.DataFrame({"a": a, "b": b}).groupby(["a", "b"], sort=False).size().rename("transfers").reset_index()
+    if not pairs.empty:
+        counts = pd.concat([pairs, counts], ignore_index=True).groupby(["a", "b"], sort=False)["transfers"].sum().reset_index()
+    return addresses, counts[PAIR_COLUMNS]
+
+
+def load_labels(path: Path = LABELS_PATH) -> pd.Series:
+    """라벨 파일 (address, label) → 소문자 주소 인덱스 Series. 파일이 없으면 빈 Series."""
+    if not path.exists():
+        return pd.Series(dtype=object)
+    labels = pd.read_csv(path, usecols=["address", "label"]).dropna()
+    return labels.assign(address=labels["address"].str.lower()).drop_duplicates("address").set_index("address")["label"]
+
+
+def _star_edges(codes: np.ndarray, members: np.ndarray) -> tuple:
+    """같은 코드의 멤버들을 그룹 첫 멤버에 잇는 간선 (codes < 0은 제외)"""
+    keep = codes >= 0
+    codes, members = codes[keep], members[keep]
+    if len(codes) == 0:
+        return members, members
+    first = pd.Series(members).groupby(codes).transform("first").to_numpy()
+    return members, first
+
+
+def cluster(
+    addresses: pd.DataFrame,
+    pairs: pd.DataFrame,
+    labels: pd.Series = None,
+    max_degree: int = 50,
+    min_pair_transfers: int = 3,
+) -> pd.DataFrame:
+    """누적 상태에서 간선을 만들고 union-find로 entity / label 컬럼 채움"""
+    addresses = addresses.reset_index(drop=True).copy()
+    index = pd.Index(addresses["address"])
+    n = len(addresses)
+
+    a = index.get_indexer(pairs["a"])
+    b = index.get_indexer(pairs["b"])
+    degree = np.bincount(np.concatenate([a, b]), minlength=n)
+    hub = degree > max_degree
+
+    # 1. 공통 자금원 (허브 자금원 / 허브 주소 제외)
+    funder = index.get_indexer(addresses["first_funder"].where(addresses["first_funder"].notna(), ""))
+    funded = np.arange(n)
+    funder_ok = (funder >= 0) & ~hub[np.maximum(funder, 0)] & ~hub
+    funder_u, funder_v = _star_edges(np.where(funder_ok, funder, -1), funded)
+
+    # 2. 잦은 직접 전송
+    frequent = (pairs["transfers"].to_numpy() >= min_pair_transfers) & ~hub[a] & ~hub[b]
+    pair_u, pair_v = a[frequent], b[frequent]
+
+    # 3. 라벨
+    label = addresses["address"].map(labels) if labels is not None and len(labels) else pd.Series(None, index=addresses.index, dtype=object)
+    label_codes = pd.factorize(label)[0]
+    label_u, label_v = _star_edges(label_codes, funded)
+
+    root = union_find(n, np.concatenate([funder_u, pair_u, label_u]), np.concatenate([funder_v, pair_v, label_v]))
+    addresses["entity"] = addresses["address"].to_numpy(dtype=object)[root]
+    # 엔티티 라벨 = 멤버 중 첫 라벨
+    entity_label = label.groupby(root).first()
+    addresses["label"] = pd.Series(root).map(entity_label).to_numpy(dtype=object)
+    return addresses[ADDRESS_COLUMNS]
+
+
+# ─── 엔티티 단위 지표 ────────────────────────────────────────────
+
+def map_entities(address_series: pd.Series, addresses: pd.DataFrame) -> pd.Series:
+    """주소 컬럼 → 엔티티 id (클러스터에 없는 주소는 자기 자신)"""
+    lowered = address_series.astype(str).str.lower()
+    return lowered.map(addresses.set_index("address")["entity"]).fillna(lowered)
+
+
+def entity_metrics(df: pd.DataFrame, addresses: pd.DataFrame, value_col: str = "balance",
+                   address_col: str = "address", name: str = "") -> dict:
+    """주소별 값(잔고, 투표 토큰)을 엔티티로 합산한 뒤 calculate_all_metrics"""
+    totals = df[value_col].groupby(map_entities(df[address_col], addresses).to_numpy()).sum()
+    return calculate_all_metrics(totals.to_numpy(), name)
+
+
+# ─── 실행 ───────────────────────────────────────────────────────
+
+def save_data(df: pd.DataFrame, name: str):
+    path = DATA_DIR / f"{name}.parquet"
+    df.to_parquet(path, index=False)
+    print(f"Saved: {path} ({len(df)} rows)")
+
+
+def read_transfer_log(path: Path, columns: list, filters: list = None) -> pd.DataFrame:
+    """전송 로그 읽기 — chain 컬럼이 없는 로그는 DEFAULT_CHAIN으로 채움
+
+    Args:
+        filters: (chain, 조건 목록) 목록 — 체인별 조건을 OR로 묶어 읽음 (None이면 전체)
+    """
+    has_chain = "chain" in pq.read_schema(path).names
+    read_columns = columns + ["chain"] if has_chain else columns
+    dnf = None
+    if filters is not None:
+        dnf = [conditions + ([("chain", "==", chain)] if has_chain else []) for chain, conditions in filters]
+        if not dnf:
+            return pd.DataFrame(columns=columns + ["chain"])
+    df = pd.read_parquet(path, columns=read_columns, filters=dnf)
+    return df if has_chain else df.assign(chain=DEFAULT_CHAIN)
+
+
+def main(full: bool = False):
+    print("=== 주소 → 엔티티 클러스터링 ===\n")
+
+    sources = [s for s in TRANSFER_SOURCES if (DATA_DIR / f"{s}.parquet").exists()]
+    if not sources:
+        print(f"전송 로그 없음 ({', '.join(s + '.parquet' for s in TRANSFER_SOURCES)})")
+        return
+
+    # (전송 로그, 체인)별 마지막 시각 → 모두 수집된 시각 직전까지만 합침
+    last_times = {
+        source: read_transfer_log(DATA_DIR / f"{source}.parquet", ["timestamp"]).groupby("chain")["timestamp"].max()
+        for source in sources
+    }
+    chains = sorted({chain for times in last_times.values() for chain in times.index})
+    horizon = min((int(t) for times in last_times.values() for t in times), default=None)
+    if horizon is None:
+        print("전송 없음")
+        return
+
+    watermarks = {chain: DecodeWatermark(Path(STATE_PATH.format(chain=chain))) for chain in chains}
+    fresh = all(w.last_block is None for w in watermarks.values())
+    if full or fresh or not ADDRESSES_PATH.exists() or not PAIRS_PATH.exists():
+        for watermark in watermarks.values():
+            watermark.reset()
+        addresses = pd.DataFrame(columns=ADDRESS_COLUMNS)
+        pairs = pd.DataFrame(columns=PAIR_COLUMNS)
+    else:
+        addresses = pd.read_parquet(ADDRESSES_PATH)
+        pairs = pd.read_parquet(PAIRS_PATH)
+
+    # 체인별 마지막 블록 이후 새 전송을 모든 로그에서 모아 시간 순으로 한 번에 상태에 합침
+    batches = []
+    for source in sources:
+        filters = []
+        for chain in last_times[source].index:
+            conditions = [("timestamp", "<", horizon)]
+            if watermarks[chain].next_block is not None:
+                conditions.append(("block_number", ">=", watermarks[chain].next_block))
+            filters.append((chain, conditions))
+        transfers = read_transfer_log(DATA_DIR / f"{source}.parquet", ["from", "to", "block_number", "timestamp"], filters)
+        print(f"{source}: 새 전송 {len(transfers):,}건")
+        batches.append(transfers)
+    transfers = pd.concat(batches, ignore_index=True)
+    print(f"합친 시각: < {pd.to_datetime(horizon, unit='s')} UTC")
+    for chain, blocks in transfers.groupby("chain")["block_number"]:
+        print(f"  [{chain}] {len(blocks):,}건, 블록 {blocks.min()} ~ {blocks.max()}")
+    addresses, pairs = update_state(addresses, pairs, transfers)
+
+    addresses = cluster(addresses, pairs, load_labels(LABELS_PATH))
+    sizes = addresses["entity"].value_counts()
+    print(f"\n주소 {len(addresses):,} → 엔티티 {len(sizes):,} (2개 이상 주소 엔티티 {int((sizes > 1).sum()):,}, 최대 {sizes.max() if len(sizes) else 0})")
+
+    # 홀더 집중도: 주소 단위 vs 엔티티 단위
+    for holders_name, label in [("uma_holders", "UMA"), ("kleros_holders", "Kleros")]:
+        holders_path = DATA_DIR / f"{holders_name}.parquet"
+        if holders_path.exists():
+            holders_df = pd.read_parquet(holders_path, columns=["address", "balance"])
+            by_address = calculate_all_metrics(holders_df["balance"].to_numpy(), label)
+            by_entity = entity_metrics(holders_df, addresses, name=label)
+            print(f"  [{label}] 나카모토 {by_address['nakamoto']} → {by_entity['nakamoto']}, "
+                  f"지니 {by_address['gini']} → {by_entity['gini']} (엔티티 {by_entity['sample_size']})")
+
+    # 상태 저장 후 체인별 워터마크 전진
+    save_data(addresses, "entity_addresses")
+    save_data(pairs, "entity_pairs")
+    for chain, watermark in watermarks.items():
+        watermark.advance(transfers[transfers["chain"] == chain])
+
+
+if __name__ == "__main__":
+    main(full="--full" in sys.argv[1:])
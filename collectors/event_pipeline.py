@@ -0,0 +1,244 @@
+"""
+raw 이벤트 단일 패스 디코딩 파이프라인
+
+1. parquet에서 필요한 topic0/블록 범위의 row group만 읽음 (pyarrow.dataset 필터 pushdown)
+2. 전체 topics/data를 EventColumns로 한 번만 변환
+3. topic0 기준 안정 정렬로 이벤트 타입별 행 구간을 만들고, 구간별로 레지스트리 decoder에 전달
+   (바이트 버퍼는 공유하고 행 인덱스만 나눈다)
+
+이벤트 타입 수만큼 원본 테이블을 다시 필터링하지 않으므로 비용은 전체 이벤트 수에 비례한다.
+큰 입력은 decode_partitioned로 블록 구간별로 나눠 프로세스 풀에서 디코딩할 수 있다.
+
+증분 실행은 DecodeWatermark에 기록된 마지막 블록 이후의 raw 이벤트만 디코딩하고,
+집계 테이블은 새 이벤트가 닿은 키의 행만 replace_keys로 교체한다.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from collectors.columnar_decoder import EventColumns
+from collectors.event_registry import EVENTS, META_COLUMNS, lookup
+
+# 디코딩에 필요한 raw 컬럼 (event_name, datetime 등은 읽지 않음)
+RAW_COLUMNS = ["block_number", "timestamp", "tx_hash", "contract", "topic0", "topics", "data"]
+
+
+def read_raw_table(path: Path, events: list = None, min_block: int = None, max_block: int = None) -> pa.Table:
+    """raw 이벤트 parquet 중 등록된 topic0 / 블록 범위에 해당하는 행만 Arrow 테이블로 로드
+
+    필터는 pyarrow.dataset으로 넘겨 row group 통계(min/max)로 건너뛸 수 있는
+    구간은 아예 읽지 않는다.
+    """
+    events = EVENTS if events is None else events
+    dataset = ds.dataset(path, format="parquet")
+    columns = [c for c in RAW_COLUMNS if c in dataset.schema.names]
+
+    condition = pc.field("topic0").isin([e.topic0 for e in events])
+    if min_block is not None:
+        condition &= pc.field("block_number") >= min_block
+    if max_block is not None:
+        condition &= pc.field("block_number") <= max_block
+
+    return dataset.to_table(columns=columns, filter=condition)
+
+
+def read_raw_events(path: Path, events: list = None, min_block: int = None, max_block: int = None) -> pd.DataFrame:
+    """read_raw_table의 DataFrame 버전"""
+    return read_raw_table(path, events, min_block, max_block).to_pandas()
+
+
+def decode_all(events_df: pd.DataFrame, events: list = None) -> dict:
+    """raw 이벤트를 topic0로 한 번 그룹핑해 타입별 decoder로 디스패치
+
+    Args:
+        events_df: 여러 이벤트 타입이 섞인 raw DataFrame (topic0, topics, data 컬럼)
+        events: 디코딩할 EventABI 목록 (기본: 레지스트리 전체)
+
+    Returns:
+        {event.key: 디코딩된 DataFrame}. 행이 없는 이벤트도 빈 DataFrame으로 포함.
+        각 DataFrame은 원본 순서(안정 정렬)를 유지한다.
+    """
+    events = EVENTS if events is None else events
+    by_topic = {e.topic0: e for e in events}
+
+    topic0 = events_df["topic0"].fillna("").str.lower()
+    wanted = topic0.isin(list(by_topic)).to_numpy()
+    if not wanted.all():
+        events_df = events_df[wanted]
+        topic0 = topic0[wanted]
+    codes, uniques = pd.factorize(topic0)
+
+    # topics/data 바이트 변환은 전체에 대해 한 번만
+    cols = EventColumns.from_frame(events_df)
+    meta = events_df[[c for c in META_COLUMNS if c in events_df.columns]]
+
+    # topic0 코드 순 안정 정렬 → 이벤트 타입별 연속 구간 (원본 순서 유지)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+
+    result = {}
+    for i, topic in enumerate(uniques):
+        event = by_topic[topic]
+        rows = order[bounds[i]:bounds[i + 1]]
+        result[event.key] = event.decode(cols.take(rows), meta=meta.iloc[rows])
+
+    empty = events_df.iloc[:0]
+    for event in events:
+        if event.key not in result:
+            result[event.key] = event.decode(empty)
+    return result
+
+
+# ─── 병렬 디코딩 ─────────────────────────────────────────────────
+
+# 파티션이 이보다 작으면 프로세스 간 전송 비용이 디코딩 시간보다 커짐
+MIN_PARTITION_ROWS = 50_000
+
+
+def partition_bounds(blocks: np.ndarray, n_partitions: int) -> np.ndarray:
+    """정렬된 block_number 배열을 행 수가 비슷한 n개 구간으로 나눈 경계 (행 위치)
+
+    같은 블록은 한 파티션에만 들어가도록 경계를 블록 시작 위치로 당긴다.
+    """
+    targets = np.linspace(0, len(blocks), n_partitions + 1).astype(np.int64)[1:-1]
+    cuts = np.searchsorted(blocks, blocks[targets], side="left") if len(targets) else targets
+    return np.unique(np.concatenate([[0], cuts, [len(blocks)]]))
+
+
+def _table_to_ipc(table: pa.Table) -> pa.Buffer:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _decode_partition(buffer: pa.Buffer, topics: list) -> dict:
+    """워커: Arrow IPC 버퍼 하나를 받아 decode_all (EventABI 대신 topic0만 전달)"""
+    table = pa.ipc.open_stream(buffer).read_all()
+    return decode_all(table.to_pandas(), [lookup(t) for t in topics])
+
+
+def decode_partitioned(table: pa.Table, events: list = None, workers: int = None, partitions: int = None) -> dict:
+    """raw Arrow 테이블을 블록 구간 파티션으로 나눠 ProcessPoolExecutor에서 디코딩
+
+    각 워커에는 파티션 하나가 Arrow IPC 버퍼 한 덩어리로 전달되므로 행 단위 pickle이 없다.
+    결과는 파티션(블록) 순서대로 이어 붙여 실행마다 같은 순서가 된다.
+    raw가 블록 순으로 저장되어 있으면 decode_all과 같은 결과.
+
+    Args:
+        table: read_raw_table 결과
+        events: 디코딩할 EventABI 목록 (기본: 레지스트리 전체)
+        workers: 프로세스 수 (기본: CPU 코어 수). 1이면 현재 프로세스에서 decode_all
+        partitions: 파티션 수 (기본: workers * 4, 부하 분산용)
+
+    Returns:
+        decode_all과 같은 {event.key: DataFrame}
+    """
+    events = EVENTS if events is None else events
+    workers = workers or os.cpu_count() or 1
+    partitions = min(partitions or workers * 4, table.num_rows // MIN_PARTITION_ROWS)
+    if workers <= 1 or partitions <= 1:
+        return decode_all(table.to_pandas(), events)
+
+    # 블록 순 안정 정렬 → 파티션은 연속 구간 slice (복사 없음)
+    table = table.take(pc.sort_indices(table, sort_keys=[("block_number", "ascending")]))
+    bounds = partition_bounds(table["block_number"].to_numpy(), partitions)
+    buffers = [_table_to_ipc(table.slice(start, end - start)) for start, end in zip(bounds[:-1], bounds[1:])]
+
+    topics = [e.topic0 for e in events]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = list(executor.map(_decode_partition, buffers, [topics] * len(buffers)))
+
+    result = {}
+    for event in events:
+        frames = [part[event.key] for part in parts]
+        non_empty = [f for f in frames if not f.empty]
+        if not non_empty:
+            result[event.key] = frames[0]
+        elif len(non_empty) == 1:
+            result[event.key] = non_empty[0].reset_index(drop=True)
+        else:
+            result[event.key] = pd.concat(non_empty, ignore_index=True)
+    return result
+
+
+# ─── 증분 디코딩 ─────────────────────────────────────────────────
+
+class DecodeWatermark:
+    """마지막으로 디코딩한 raw 이벤트 block_number (JSON 상태 파일)
+
+    {"last_block": int|None, "raw_events": int, "updated_at": str}
+    다음 실행은 last_block + 1 이후 블록의 raw 이벤트만 읽는다.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.last_block = None
+        self.raw_events = 0
+        if self.path.exists():
+            with open(self.path) as f:
+                state = json.load(f)
+            self.last_block = state.get("last_block")
+            self.raw_events = state.get("raw_events", 0)
+
+    @property
+    def next_block(self):
+        return None if self.last_block is None else self.last_block + 1
+
+    def reset(self):
+        self.last_block = None
+        self.raw_events = 0
+
+    def advance(self, events):
+        """디코딩 결과를 모두 저장한 뒤 호출 — 읽은 raw 이벤트(DataFrame 또는 Arrow 테이블)의 최대 블록까지 전진"""
+        blocks = np.asarray(events["block_number"])
+        if len(blocks) == 0:
+            return
+        self.last_block = int(blocks.max())
+        self.raw_events += len(blocks)
+
+        # 임시 파일에 쓴 뒤 교체 — 중간에 죽어도 상태 파일이 깨지지 않음
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({
+                "last_block": self.last_block,
+                "raw_events": self.raw_events,
+                "updated_at": datetime.now().isoformat(),
+            }, f)
+        os.replace(tmp, self.path)
+
+
+def append_rows(existing: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """기존 테이블 뒤에 새 행 추가 (한쪽이 비어 있으면 다른 쪽 dtype 유지)"""
+    if new_rows.empty:
+        return existing
+    if existing.empty:
+        return new_rows.reset_index(drop=True)
+    return pd.concat([existing, new_rows], ignore_index=True)
+
+
+def key_mask(df: pd.DataFrame, keys: pd.DataFrame) -> np.ndarray:
+    """df 행 중 (keys 컬럼 조합)이 keys에 포함된 행의 bool 마스크"""
+    if df.empty or keys.empty:
+        return np.zeros(len(df), dtype=bool)
+    cols = list(keys.columns)
+    return pd.MultiIndex.from_frame(df[cols]).isin(pd.MultiIndex.from_frame(keys))
+
+
+def replace_keys(existing: pd.DataFrame, updated: pd.DataFrame, keys: pd.DataFrame, order_col="block_number") -> pd.DataFrame:
+    """키 단위 집계 테이블에서 keys에 해당하는 행을 다시 계산한 행으로 교체
+
+    전체 재계산 결과와 같은 순서가 되도록 order_col(컬럼 하나 또는 목록) 기준 안정 정렬한다.
+    """
+    kept = existing[~key_mask(existing, keys)]
+    merged = append_rows(kept, updated)
+    return merged.sort_values(order_col, kind="stable").reset_index(drop=True)
@@ -0,0 +1,351 @@
+"""
+이벤트 ABI 레지스트리
+
+이벤트마다 Solidity 시그니처를 한 번만 선언하면:
+- topic0 (keccak256 of canonical signature)를 직접 계산하고
+- indexed 필드(topics)와 data 필드(정적 word, 동적 bytes/string/배열)를
+  컬럼 단위로 디코딩하는 decoder를 자동으로 만든다.
+
+새 이벤트 타입을 추가할 때는 register(...) 한 줄이면 된다.
+
+    VOTE_REVEALED = register(
+        UMA_VOTING,
+        "VoteRevealed(address indexed voter, uint256 indexed roundId, ...)",
+        decimals={"price": 18, "numTokens": 18},
+        text=("identifier", "ancillaryData"),
+    )
+    votes_df = VOTE_REVEALED.decode(VOTE_REVEALED.select(events_df))
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from collectors.columnar_decoder import EventColumns, to_address, to_ascii, to_float, to_hex, to_int
+
+# 컨트랙트 라벨 (raw 이벤트의 contract 컬럼 값)
+UMA_VOTING = "Voting"
+KLEROS_CORE = "KlerosCore"
+DISPUTE_KIT_CLASSIC = "DisputeKitClassic"
+
+# decode 결과에 함께 싣는 raw 메타데이터 컬럼 (raw 이름 → 출력 이름)
+META_COLUMNS = {
+    "block_number": "block_number",
+    "timestamp": "block_time",
+    "tx_hash": "tx_hash",
+}
+
+
+# ─── keccak256 ───────────────────────────────────────────────────
+# hashlib.sha3_256은 NIST SHA-3(패딩이 다름)이라 이더리움 keccak256과 결과가 다르다.
+# 시그니처 해시 몇 개만 계산하면 되므로 keccak-f[1600]를 직접 구현한다.
+
+_MASK64 = (1 << 64) - 1
+_ROUND_CONSTANTS = [
+    0x0000000000000001, 0x0000000000008082, 0x800000000000808A, 0x8000000080008000,
+    0x000000000000808B, 0x0000000080000001, 0x8000000080008081, 0x8000000000008009,
+    0x000000000000008A, 0x0000000000000088, 0x0000000080008009, 0x000000008000000A,
+    0x000000008000808B, 0x800000000000008B, 0x8000000000008089, 0x8000000000008003,
+    0x8000000000008002, 0x8000000000000080, 0x000000000000800A, 0x800000008000000A,
+    0x8000000080008081, 0x8000000000008080, 0x0000000080000001, 0x8000000080008008,
+]
+# 회전 오프셋 [x][y]
+_ROTATIONS = [
+    [0, 36, 3, 41, 18],
+    [1, 44, 10, 45, 2],
+    [62, 6, 43, 15, 61],
+    [28, 55, 25, 21, 56],
+    [27, 20, 39, 8, 14],
+]
+_RATE = 136  # 1088비트 (keccak256)
+
+
+def _rotl(value: int, shift: int) -> int:
+    return ((value << shift) | (value >> (64 - shift))) & _MASK64 if shift else value
+
+
+def _keccak_f(state: list) -> list:
+    for rc in _ROUND_CONSTANTS:
+        # θ
+        c = [state[x][0] ^ state[x][1] ^ state[x][2] ^ state[x][3] ^ state[x][4] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rotl(c[(x + 1) % 5], 1) for x in range(5)]
+        state = [[state[x][y] ^ d[x] for y in range(5)] for x in range(5)]
+        # ρ, π
+        b = [[0] * 5 for _ in range(5)]
+        for x in range(5):
+            for y in range(5):
+                b[y][(2 * x + 3 * y) % 5] = _rotl(state[x][y], _ROTATIONS[x][y])
+        # χ
+        state = [[b[x][y] ^ (~b[(x + 1) % 5][y] & b[(x + 2) % 5][y]) for y in range(5)] for x in range(5)]
+        # ι
+        state[0][0] ^= rc
+    return state
+
+
+def keccak256(data: bytes) -> bytes:
+    """이더리움 keccak256 해시 (32바이트)"""
+    padded = bytearray(data) + b"\x01"
+    padded += b"\x00" * (-len(padded) % _RATE)
+    padded[-1] |= 0x80
+
+    state = [[0] * 5 for _ in range(5)]
+    for block in range(0, len(padded), _RATE):
+        for i in range(_RATE // 8):
+            lane = padded[block + 8 * i:block + 8 * i + 8]
+            state[i % 5][i // 5] ^= int.from_bytes(lane, "little")
+        state = _keccak_f(state)
+
+    return b"".join(state[i % 5][i // 5].to_bytes(8, "little") for i in range(4))
+
+
+# ─── 시그니처 파싱 ────────────────────────────────────────────────
+
+_SIGNATURE = re.compile(r"^\s*(\w+)\s*\((.*)\)\s*$")
+
+
+def snake_case(name: str) -> str:
+    """Solidity 파라미터 이름 → 컬럼 이름 (roundId → round_id, _disputeID → dispute_id)"""
+    name = name.lstrip("_")
+    name = re.sub(r"(?<=[A-Z])(?=[A-Z][a-z]{2,})|(?<=[a-z0-9])(?=[A-Z])", "_", name)
+    return name.lower()
+
+
+def _is_dynamic(abi_type: str) -> bool:
+    return abi_type in ("bytes", "string") or abi_type.endswith("[]")
+
+
+class EventABI:
+    """이벤트 하나의 ABI 정의와 컬럼 단위 decoder
+
+    Args:
+        contract: 컨트랙트 라벨 (raw 이벤트의 contract 컬럼 값)
+        signature: 'Name(type [indexed] name, ...)' 형태의 Solidity 시그니처
+        decimals: 파라미터 이름 → 소수 자릿수. 지정한 정수 필드는 float로 변환
+            (64비트를 넘는 토큰 수량/가격용). 나머지 정수 필드는 int64
+        text: 텍스트로 디코딩할 bytes32/bytes 파라미터 이름 (기본은 hex 문자열)
+        key: decode_all 결과에서 쓰는 이름 (기본은 이벤트 이름의 snake_case)
+    """
+
+    def __init__(self, contract: str, signature: str, decimals: dict = None, text: tuple = (), key: str = None):
+        match = _SIGNATURE.match(signature)
+        if match is None:
+            raise ValueError(f"이벤트 시그니처 형식 오류: {signature}")
+
+        self.contract = contract
+        self.name = match.group(1)
+        self.inputs = []  # [(type, name, indexed)]
+        for i, part in enumerate(p for p in match.group(2).split(",") if p.strip()):
+            tokens = part.split()
+            indexed = "indexed" in tokens[1:]
+            names = [t for t in tokens[1:] if t != "indexed"]
+            self.inputs.append((tokens[0], names[0] if names else f"arg{i}", indexed))
+
+        self.decimals = decimals or {}
+        self.text = set(text)
+        for field in list(self.decimals) + list(self.text):
+            if field not in {name for _, name, _ in self.inputs}:
+                raise ValueError(f"{self.name}: 알 수 없는 파라미터 {field}")
+
+        self.signature = f"{self.name}({','.join(t for t, _, _ in self.inputs)})"
+        self.topic0 = "0x" + keccak256(self.signature.encode()).hex()
+        self.key = key or snake_case(self.name)
+
+    def __repr__(self):
+        return f"EventABI({self.contract}.{self.signature} {self.topic0[:10]}…)"
+
+    @property
+    def columns(self) -> list:
+        return [snake_case(name) for _, name, _ in self.inputs]
+
+    def select(self, events_df: pd.DataFrame) -> pd.DataFrame:
+        """raw 이벤트 중 이 이벤트에 해당하는 행 (topic0 기준)"""
+        return events_df[events_df["topic0"].str.lower() == self.topic0]
+
+    def decode(self, events, meta: pd.DataFrame = None) -> pd.DataFrame:
+        """raw 이벤트 → 타입이 적용된 DataFrame
+
+        Args:
+            events: 이 이벤트만 담은 raw DataFrame, 또는 이미 변환한 EventColumns
+            meta: events가 EventColumns일 때 메타데이터 컬럼을 가져올 DataFrame
+
+        Returns:
+            파라미터별 snake_case 컬럼 + block_number / block_time / tx_hash
+        """
+        if isinstance(events, EventColumns):
+            cols = events
+        else:
+            cols = EventColumns.from_frame(events)
+            meta = events
+
+        result = {}
+        topic_index = 1
+        head_index = 0
+        for abi_type, name, indexed in self.inputs:
+            if indexed:
+                words = cols.topic(topic_index)
+                result[snake_case(name)] = self._convert_word(words, abi_type, name, hashed=_is_dynamic(abi_type))
+                topic_index += 1
+            else:
+                if _is_dynamic(abi_type):
+                    result[snake_case(name)] = self._convert_dynamic(cols, head_index, abi_type, name)
+                else:
+                    result[snake_case(name)] = self._convert_word(cols.word(head_index), abi_type, name)
+                head_index += 1
+
+        df = pd.DataFrame(result)
+        if meta is not None:
+            for raw_col, out_col in META_COLUMNS.items():
+                if raw_col in meta.columns:
+                    df[out_col] = meta[raw_col].to_numpy()
+        return df
+
+    def _convert_word(self, words: np.ndarray, abi_type: str, name: str, hashed: bool = False) -> np.ndarray:
+        if hashed:
+            # indexed 동적 타입은 topic에 keccak 해시만 남는다
+            return to_hex(words)
+        if abi_type == "address":
+            return to_address(words)
+        if abi_type == "bool":
+            return to_int(words) != 0
+        if abi_type.startswith(("uint", "int")):
+            if name in self.decimals:
+                return to_float(words, signed=abi_type.startswith("int"), decimals=self.decimals[name])
+            return to_int(words)
+        if abi_type.startswith("bytes") and name in self.text:
+            return to_ascii(words)
+        return to_hex(words)
+
+    def _convert_dynamic(self, cols: EventColumns, head_index: int, abi_type: str, name: str) -> np.ndarray:
+        if abi_type == "string" or (abi_type == "bytes" and name in self.text):
+            return cols.dynamic_text(head_index)
+        if abi_type == "bytes":
+            return cols.dynamic_hex(head_index)
+
+        # T[] — 원소별 변환 후 행별 리스트로 분리
+        words, counts = cols.dynamic_array(head_index)
+        values = self._convert_word(words, abi_type[:-2], name)
+        flat = values.tolist()
+        ends = np.cumsum(counts).tolist()
+        out = np.empty(len(counts), dtype=object)
+        out[:] = [flat[end - count:end] for end, count in zip(ends, counts.tolist())]
+        return out
+
+
+# ─── 레지스트리 ───────────────────────────────────────────────────
+
+EVENTS = []
+
+
+def register(contract: str, signature: str, decimals: dict = None, text: tuple = (), key: str = None) -> EventABI:
+    """이벤트 선언 (topic0 자동 계산)"""
+    event = EventABI(contract, signature, decimals, text, key)
+    if any(e.key == event.key for e in EVENTS):
+        raise ValueError(f"이벤트 key 중복: {event.key}")
+    EVENTS.append(event)
+    return event
+
+
+def event_names(contracts: tuple = None) -> dict:
+    """topic0 → 이벤트 이름 매핑 (raw 수집 시 event_name 컬럼용)"""
+    return {
+        event.topic0: event.name
+        for event in EVENTS
+        if contracts is None or event.contract in contracts
+    }
+
+
+def events_for(contracts: tuple) -> list:
+    """컨트랙트 라벨에 속한 이벤트 정의 목록"""
+    return [event for event in EVENTS if event.contract in contracts]
+
+
+def lookup(topic0: str) -> EventABI:
+    """topic0로 이벤트 정의 조회 (없으면 None)"""
+    topic0 = (topic0 or "").lower()
+    for event in EVENTS:
+        if event.topic0 == topic0:
+            return event
+    return None
+
+
+# ─── UMA Voting (v1) ──────────────────────────────────────────────
+
+UMA_TEXT = ("identifier", "ancillaryData")
+
+OWNERSHIP_TRANSFERRED = register(
+    UMA_VOTING,
+    "OwnershipTransferred(address indexed previousOwner, address indexed newOwner)",
+)
+PRICE_REQUEST_ADDED = register(
+    UMA_VOTING,
+    "PriceRequestAdded(uint256 indexed roundId, bytes32 indexed identifier, uint256 time)",
+    text=("identifier",),
+)
+VOTE_COMMITTED = register(
+    UMA_VOTING,
+    "VoteCommitted(address indexed voter, uint256 indexed roundId, bytes32 indexed identifier, uint256 time, bytes ancillaryData)",
+    text=UMA_TEXT,
+)
+ENCRYPTED_VOTE = register(
+    UMA_VOTING,
+    "EncryptedVote(address indexed voter, uint256 indexed roundId, bytes32 indexed identifier, uint256 time, bytes ancillaryData, bytes encryptedVote)",
+    text=UMA_TEXT,
+)
+VOTE_REVEALED = register(
+    UMA_VOTING,
+    "VoteRevealed(address indexed voter, uint256 indexed roundId, bytes32 indexed identifier, uint256 time, int256 price, bytes ancillaryData, uint256 numTokens)",
+    decimals={"price": 18, "numTokens": 18},
+    text=UMA_TEXT,
+)
+PRICE_RESOLVED = register(
+    UMA_VOTING,
+    "PriceResolved(uint256 indexed roundId, bytes32 indexed identifier, uint256 time, int256 price, bytes ancillaryData)",
+    decimals={"price": 18},
+    text=UMA_TEXT,
+)
+REWARDS_RETRIEVED = register(
+    UMA_VOTING,
+    "RewardsRetrieved(address indexed voter, uint256 indexed roundId, bytes32 indexed identifier, uint256 time, bytes ancillaryData, uint256 numTokens)",
+    decimals={"numTokens": 18},
+    text=UMA_TEXT,
+)
+
+# ─── Kleros v2 (Arbitrum) ─────────────────────────────────────────
+
+DISPUTE_CREATION = register(
+    KLEROS_CORE,
+    "DisputeCreation(uint256 indexed _disputeID, address indexed _arbitrable)",
+)
+DRAW = register(
+    KLEROS_CORE,
+    "Draw(address indexed _address, uint256 indexed _disputeID, uint256 _roundID, uint256 _voteID)",
+)
+RULING = register(
+    KLEROS_CORE,
+    "Ruling(address indexed _arbitrable, uint256 indexed _disputeID, uint256 _ruling)",
+)
+NEW_PERIOD = register(
+    KLEROS_CORE,
+    "NewPeriod(uint256 indexed _disputeID, uint8 _period)",
+)
+APPEAL_POSSIBLE = register(
+    KLEROS_CORE,
+    "AppealPossible(uint256 indexed _disputeID, address indexed _arbitrable)",
+)
+TOKEN_AND_ETH_SHIFT = register(
+    KLEROS_CORE,
+    "TokenAndETHShift(address indexed _account, uint256 indexed _disputeID, uint256 indexed _roundID, uint256 _degreeOfCoherency, int256 _pnkAmount, int256 _feeAmount, address _feeToken)",
+    # _feeAmount는 _feeToken(ETH 또는 ERC-20)마다 자릿수가 달라 raw 단위 float로 두고
+    # kleros_decoder.build_stake_flows에서 토큰별로 환산
+    decimals={"_pnkAmount": 18, "_feeAmount": 0},
+)
+VOTE_CAST = register(
+    DISPUTE_KIT_CLASSIC,
+    "VoteCast(uint256 indexed _coreDisputeID, address indexed _juror, uint256[] _voteIDs, uint256 indexed _choice, string _justification)",
+)
+DK_DISPUTE_CREATION = register(
+    DISPUTE_KIT_CLASSIC,
+    "DisputeCreation(uint256 indexed _coreDisputeID, uint256 _numberOfChoices, bytes _extraData)",
+    key="dispute_kit_creation",
+)
@@ -4,194 +4,279 @@ Kleros raw hex 이벤트 디코딩
 기존 kleros_court_events.parquet의 raw topics/data 필드를 디코딩하여:
 - kleros_decoded_disputes.parquet: DisputeCreation + Ruling 매칭
 - kleros_decoded_votes.parquet: VoteCast 디코딩
+- kleros_dispute_rounds.parquet: (dispute_id, round_id)별 다수파 선택/비율, 이전 라운드 대비 번복 여부
+- kleros_dispute_periods.parquet: NewPeriod → (dispute_id, round_id)별 기간 시작 시각 타임라인
+- kleros_stake_flows.parquet: TokenAndETHShift → 분쟁/배심원별 PNK·수수료 이동 합계
+
+증분 실행: kleros_decode_state.json의 마지막 블록 이후 raw 이벤트만 디코딩해 이어 붙이고,
+집계는 새 이벤트가 닿은 dispute_id만 다시 계산한다. `--full`이면 처음부터 다시 디코딩,
+`--workers N`이면 블록 구간 파티션을 N개 프로세스로 나눠 디코딩.
+
+실행 (저장소 루트): python -m collectors.kleros_decoder [--full] [--workers N]
 """
 
-import json
+import sys
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
+
+from collectors.event_pipeline import (
+    DecodeWatermark, append_rows, decode_all, decode_partitioned, key_mask, read_raw_table, replace_keys,
+)
+from collectors.event_registry import (
+    APPEAL_POSSIBLE, DISPUTE_CREATION, DRAW, NEW_PERIOD, RULING, TOKEN_AND_ETH_SHIFT, VOTE_CAST,
+)
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 
+KLEROS_EVENTS = [DISPUTE_CREATION, RULING, VOTE_CAST, DRAW, APPEAL_POSSIBLE, NEW_PERIOD, TOKEN_AND_ETH_SHIFT]
 
-def hex_to_int(hex_str: str) -> int:
-    """32바이트 hex를 정수로 변환"""
-    hex_str = hex_str.replace("0x", "").strip()
-    return int(hex_str, 16) if hex_str else 0
+# KlerosCore Period enum 순서
+PERIODS = ["evidence", "commit", "vote", "appeal", "execution"]
 
+STATE_PATH = DATA_DIR / "kleros_decode_state.json"
 
-def hex_to_address(hex_str: str) -> str:
-    """32바이트 패딩된 hex를 이더리움 주소로 변환"""
-    hex_str = hex_str.replace("0x", "").strip()
-    return "0x" + hex_str[-40:]
+# decode_events 키 → 이벤트 단위로 이어 붙여 저장하는 테이블
+BASE_TABLES = {
+    "disputes": "kleros_decoded_creations",
+    "rulings": "kleros_decoded_rulings",
+    "votes": "kleros_decoded_votes",
+    "draws": "kleros_decoded_draws",
+    "appeals": "kleros_decoded_appeals",
+    "periods": "kleros_decoded_new_periods",
+    "shifts": "kleros_decoded_token_shifts",
+}
 
+# TokenAndETHShift _feeToken → 소수 자릿수 (Arbitrum One, 소문자 주소). 0 주소 = ETH
+FEE_TOKEN_DECIMALS = {
+    "0x0000000000000000000000000000000000000000": 18,  # ETH
+    "0x82af49447d8a07e3bd95bd0d56f35241523fbab1": 18,  # WETH
+    "0xda10009cbd5d07dd0cecc66161fc93d7c9000da1": 18,  # DAI
+    "0xaf88d065e77c8cc2239327c5edb3a432268e5831": 6,   # USDC
+    "0xff970a61a04b1ca14834a43f5de4533ebddb5cc8": 6,   # USDC.e
+}
 
-def decode_data_fields(data_hex: str) -> list:
-    """data 필드를 32바이트 청크로 분할"""
-    data = data_hex.replace("0x", "")
-    chunks = []
-    for i in range(0, len(data), 64):
-        chunk = data[i:i+64]
-        if chunk:
-            chunks.append(chunk)
-    return chunks
+# 분쟁 단위 집계 테이블 → 증분 교체 후 정렬 기준
+AGGREGATE_TABLES = {
+    "kleros_decoded_disputes": "block_number",
+    "kleros_dispute_rounds": "dispute_id",
+    "kleros_dispute_periods": "dispute_id",
+    "kleros_stake_flows": "dispute_id",
+}
 
 
-def decode_dispute_creation(events_df: pd.DataFrame) -> pd.DataFrame:
-    """DisputeCreation 이벤트 디코딩
+def _disputes_frame(decoded: pd.DataFrame) -> pd.DataFrame:
+    return decoded.rename(columns={"block_time": "created_time"})[
+        ["dispute_id", "arbitrable", "created_time", "block_number", "tx_hash"]
+    ]
 
-    KlerosCore의 DisputeCreation:
-    topics[1] = disputeId (uint256)
-    topics[2] = arbitrable (address, padded)
-    data = empty (0x)
-    """
-    disputes = events_df[
-        (events_df["event_name"] == "DisputeCreation") &
-        (events_df["contract"] == "KlerosCore")
-    ].copy()
 
-    records = []
-    for _, row in disputes.iterrows():
-        topics = json.loads(row["topics"])
-        dispute_id = hex_to_int(topics[1])
-        arbitrable = hex_to_address(topics[2])
+def _rulings_frame(decoded: pd.DataFrame) -> pd.DataFrame:
+    return decoded.rename(columns={"block_time": "ruling_time"})[
+        ["dispute_id", "arbitrable", "ruling", "ruling_time", "tx_hash"]
+    ]
 
-        records.append({
-            "dispute_id": dispute_id,
-            "arbitrable": arbitrable,
-            "created_time": row["timestamp"],
-            "block_number": row["block_number"],
-            "tx_hash": row["tx_hash"],
-        })
 
-    return pd.DataFrame(records)
+def _votes_frame(decoded: pd.DataFrame) -> pd.DataFrame:
+    return decoded.rename(columns={"core_dispute_id": "dispute_id", "juror": "voter", "block_time": "timestamp"})[
+        ["dispute_id", "voter", "choice", "vote_ids", "timestamp", "tx_hash"]
+    ]
 
 
-def decode_ruling(events_df: pd.DataFrame) -> pd.DataFrame:
-    """Ruling 이벤트 디코딩
+def _draws_frame(decoded: pd.DataFrame) -> pd.DataFrame:
+    return decoded.rename(columns={"address": "juror", "block_time": "timestamp"})[
+        ["dispute_id", "juror", "round_id", "vote_id", "timestamp"]
+    ]
 
-    KlerosCore의 Ruling:
-    topics[1] = arbitrable (address, padded)
-    topics[2] = disputeId (uint256)
-    data[0:32] = ruling (uint256)
-    """
-    rulings = events_df[
-        (events_df["event_name"] == "Ruling") &
-        (events_df["contract"] == "KlerosCore")
-    ].copy()
 
-    records = []
-    for _, row in rulings.iterrows():
-        topics = json.loads(row["topics"])
-        data_chunks = decode_data_fields(row["data"])
+def _appeals_frame(decoded: pd.DataFrame) -> pd.DataFrame:
+    return decoded.rename(columns={"block_time": "timestamp"})[["dispute_id", "arbitrable", "timestamp"]]
 
-        arbitrable = hex_to_address(topics[1])
-        dispute_id = hex_to_int(topics[2])
-        ruling = hex_to_int(data_chunks[0]) if data_chunks else 0
 
-        records.append({
-            "dispute_id": dispute_id,
-            "arbitrable": arbitrable,
-            "ruling": ruling,
-            "ruling_time": row["timestamp"],
-            "tx_hash": row["tx_hash"],
-        })
+def _periods_frame(decoded: pd.DataFrame) -> pd.DataFrame:
+    return decoded.rename(columns={"block_time": "timestamp"})[["dispute_id", "period", "timestamp", "block_number"]]
 
-    return pd.DataFrame(records)
 
+def _shifts_frame(decoded: pd.DataFrame) -> pd.DataFrame:
+    return decoded.rename(columns={"account": "juror", "block_time": "timestamp", "fee_amount": "fee_amount_raw"})[
+        ["dispute_id", "round_id", "juror", "degree_of_coherency", "pnk_amount", "fee_amount_raw", "fee_token", "timestamp", "tx_hash"]
+    ]
 
-def decode_vote_cast(events_df: pd.DataFrame) -> pd.DataFrame:
-    """VoteCast 이벤트 디코딩
 
-    DisputeKitClassic의 VoteCast:
-    topics[1] = coreDisputeId (uint256)
-    topics[2] = voter (address, padded)
-    topics[3] = choice (uint256)
-    data = justification (bytes, ABI encoded)
-    """
-    votes = events_df[
-        (events_df["event_name"] == "VoteCast") &
-        (events_df["contract"] == "DisputeKitClassic")
-    ].copy()
+def decode_dispute_creation(events_df: pd.DataFrame) -> pd.DataFrame:
+    """KlerosCore DisputeCreation 이벤트 디코딩 (시그니처는 event_registry 참고)"""
+    return _disputes_frame(DISPUTE_CREATION.decode(DISPUTE_CREATION.select(events_df)))
 
-    records = []
-    for _, row in votes.iterrows():
-        topics = json.loads(row["topics"])
-        dispute_id = hex_to_int(topics[1])
-        voter = hex_to_address(topics[2])
-        choice = hex_to_int(topics[3])
 
-        records.append({
-            "dispute_id": dispute_id,
-            "voter": voter,
-            "choice": choice,
-            "timestamp": row["timestamp"],
-            "tx_hash": row["tx_hash"],
-        })
+def decode_ruling(events_df: pd.DataFrame) -> pd.DataFrame:
+    """KlerosCore Ruling 이벤트 디코딩"""
+    return _rulings_frame(RULING.decode(RULING.select(events_df)))
 
-    return pd.DataFrame(records)
+
+def decode_vote_cast(events_df: pd.DataFrame) -> pd.DataFrame:
+    """DisputeKitClassic VoteCast 이벤트 디코딩"""
+    return _votes_frame(VOTE_CAST.decode(VOTE_CAST.select(events_df)))
 
 
 def decode_draw(events_df: pd.DataFrame) -> pd.DataFrame:
-    """Draw 이벤트 디코딩
+    """KlerosCore Draw 이벤트 디코딩"""
+    return _draws_frame(DRAW.decode(DRAW.select(events_df)))
 
-    KlerosCore의 Draw:
-    topics[1] = juror (address, padded)
-    topics[2] = disputeId (uint256)
-    data[0:32] = roundId (uint256)
-    data[32:64] = voteId (uint256)
-    """
-    draws = events_df[
-        (events_df["event_name"] == "Draw") &
-        (events_df["contract"] == "KlerosCore")
-    ].copy()
 
-    records = []
-    for _, row in draws.iterrows():
-        topics = json.loads(row["topics"])
-        data_chunks = decode_data_fields(row["data"])
+def decode_appeal_possible(events_df: pd.DataFrame) -> pd.DataFrame:
+    """KlerosCore AppealPossible 이벤트 디코딩"""
+    return _appeals_frame(APPEAL_POSSIBLE.decode(APPEAL_POSSIBLE.select(events_df)))
 
-        juror = hex_to_address(topics[1])
-        dispute_id = hex_to_int(topics[2])
-        round_id = hex_to_int(data_chunks[0]) if len(data_chunks) > 0 else 0
-        vote_id = hex_to_int(data_chunks[1]) if len(data_chunks) > 1 else 0
 
-        records.append({
-            "dispute_id": dispute_id,
-            "juror": juror,
-            "round_id": round_id,
-            "vote_id": vote_id,
-            "timestamp": row["timestamp"],
-        })
+def decode_new_period(events_df: pd.DataFrame) -> pd.DataFrame:
+    """KlerosCore NewPeriod 이벤트 디코딩 (period: PERIODS 순서의 enum 값)"""
+    return _periods_frame(NEW_PERIOD.decode(NEW_PERIOD.select(events_df)))
 
-    return pd.DataFrame(records)
 
+def decode_token_and_eth_shift(events_df: pd.DataFrame) -> pd.DataFrame:
+    """KlerosCore TokenAndETHShift 이벤트 디코딩 (PNK는 18 decimals, 수수료는 fee_token 단위 raw, 음수 = 차감)"""
+    return _shifts_frame(TOKEN_AND_ETH_SHIFT.decode(TOKEN_AND_ETH_SHIFT.select(events_df)))
 
-def decode_appeal_possible(events_df: pd.DataFrame) -> pd.DataFrame:
-    """AppealPossible 이벤트 디코딩
 
-    KlerosCore의 AppealPossible:
-    topics[1] = disputeId (uint256)
-    topics[2] = arbitrable (address, padded)
+def decode_events(events_df: pd.DataFrame) -> dict:
+    """KLEROS_EVENTS 전체를 topic0 단일 패스로 디코딩
+
+    Returns:
+        {"disputes", "rulings", "votes", "draws", "appeals", "periods", "shifts"} → decode_* 함수와 같은 형태
+    """
+    return event_tables(decode_all(events_df, KLEROS_EVENTS))
+
+
+def event_tables(decoded: dict) -> dict:
+    """decode_all / decode_partitioned 결과 → decode_events 형태의 테이블 dict"""
+    return {
+        "disputes": _disputes_frame(decoded[DISPUTE_CREATION.key]),
+        "rulings": _rulings_frame(decoded[RULING.key]),
+        "votes": _votes_frame(decoded[VOTE_CAST.key]),
+        "draws": _draws_frame(decoded[DRAW.key]),
+        "appeals": _appeals_frame(decoded[APPEAL_POSSIBLE.key]),
+        "periods": _periods_frame(decoded[NEW_PERIOD.key]),
+        "shifts": _shifts_frame(decoded[TOKEN_AND_ETH_SHIFT.key]),
+    }
+
+
+def assign_vote_rounds(votes_df: pd.DataFrame, draws_df: pd.DataFrame) -> pd.DataFrame:
+    """VoteCast에 Draw의 round_id를 붙임
+
+    배심원은 가장 최근에 뽑힌 라운드에서 투표하므로, 같은 (dispute_id, 배심원)의 Draw 중
+    투표 시각 이전 마지막 Draw의 round_id를 쓴다 (merge_asof 한 번).
+    Draw가 없는 투표는 round_id = -1.
+
+    Returns:
+        votes_df + round_id, weight (투표 수 = voteIDs 개수, 최소 1)
     """
-    appeals = events_df[
-        (events_df["event_name"] == "AppealPossible") &
-        (events_df["contract"] == "KlerosCore")
-    ].copy()
+    votes = votes_df.reset_index(drop=True)
+    if "vote_ids" in votes.columns:
+        votes["weight"] = votes["vote_ids"].str.len().fillna(0).clip(lower=1).astype(np.int64)
+    else:
+        votes["weight"] = 1
+
+    draws = draws_df.rename(columns={"juror": "voter"})[["dispute_id", "voter", "round_id", "timestamp"]]
+    matched = pd.merge_asof(
+        votes[["timestamp", "dispute_id", "voter"]].reset_index().sort_values("timestamp", kind="stable"),
+        draws.sort_values("timestamp", kind="stable"),
+        on="timestamp",
+        by=["dispute_id", "voter"],
+    ).set_index("index")["round_id"]
+    votes["round_id"] = matched.reindex(votes.index).fillna(-1).astype(np.int64)
+    return votes
+
+
+def build_dispute_rounds(votes_df: pd.DataFrame, draws_df: pd.DataFrame) -> pd.DataFrame:
+    """(dispute_id, round_id)별 합의 — (분쟁, 라운드, 선택) 단일 grouped count
+
+    Returns:
+        dispute_id, round_id, num_votes, num_choices, majority_choice, majority_share,
+        reversed (같은 분쟁 직전 라운드와 다수파 선택이 다르면 True, 첫 라운드는 False).
+        동률이면 작은 choice를 다수파로 본다. majority_share는 소수 4자리 반올림.
+        앞선 Draw가 없는 투표(round_id = -1)는 라운드를 알 수 없으므로 제외
+        (분쟁별 개수는 build_decoded_disputes의 unmatched_votes).
+    """
+    columns = ["dispute_id", "round_id", "num_votes", "num_choices", "majority_choice", "majority_share", "reversed"]
+    if votes_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    votes = assign_vote_rounds(votes_df, draws_df)
+    votes = votes[votes["round_id"] >= 0]
+    if votes.empty:
+        return pd.DataFrame(columns=columns)
+    counts = votes.groupby(["dispute_id", "round_id", "choice"])["weight"].sum().reset_index()
+    counts = counts.sort_values(
+        ["dispute_id", "round_id", "weight", "choice"], ascending=[True, True, False, True], kind="stable",
+    ).reset_index(drop=True)
+    by_round = counts.groupby(["dispute_id", "round_id"], sort=False)
+    rank = by_round.cumcount()
+
+    rounds = counts[rank == 0].reset_index(drop=True)
+    rounds["num_votes"] = by_round["weight"].sum().to_numpy()
+    rounds["num_choices"] = by_round.size().to_numpy()
+    rounds["majority_share"] = (rounds["weight"] / rounds["num_votes"]).round(4)
+    rounds = rounds.rename(columns={"choice": "majority_choice"})
+
+    previous = rounds.groupby("dispute_id")["majority_choice"].shift()
+    rounds["reversed"] = previous.notna() & (previous != rounds["majority_choice"])
+    return rounds[columns]
+
+
+def build_dispute_periods(periods_df: pd.DataFrame, disputes_df: pd.DataFrame) -> pd.DataFrame:
+    """(dispute_id, round_id)별 기간 시작 시각 타임라인
+
+    항소 후 새 라운드는 evidence 기간(NewPeriod 0)으로 다시 시작하므로, 분쟁 안에서
+    evidence 전환의 누적 횟수가 round_id가 된다. 첫 라운드 evidence는 NewPeriod 없이
+    분쟁 생성과 함께 시작하므로 DisputeCreation 시각을 쓴다.
+
+    Returns:
+        dispute_id, round_id, evidence_time, commit_time, vote_time, appeal_time, execution_time
+        (해당 기간에 들어가지 않았으면 NaN)
+    """
+    time_columns = [f"{p}_time" for p in PERIODS]
+    periods = periods_df.sort_values(["dispute_id", "block_number"], kind="stable")
+    rounds = (periods["period"] == 0).groupby(periods["dispute_id"]).cumsum()
+
+    timeline = (
+        periods.assign(round_id=rounds)
+        .groupby(["dispute_id", "round_id", "period"])["timestamp"].min()
+        .unstack("period")
+        .reindex(columns=range(len(PERIODS)))
+    )
+    timeline.columns = time_columns
+    timeline = timeline.reset_index()
 
-    records = []
-    for _, row in appeals.iterrows():
-        topics = json.loads(row["topics"])
-        dispute_id = hex_to_int(topics[1])
-        arbitrable = hex_to_address(topics[2])
+    # 첫 라운드 evidence = 분쟁 생성 시각 (NewPeriod가 아직 없는 분쟁도 포함)
+    created = disputes_df.drop_duplicates("dispute_id")[["dispute_id", "created_time"]].assign(round_id=0)
+    timeline = timeline.merge(created, on=["dispute_id", "round_id"], how="outer")
+    timeline["evidence_time"] = timeline["evidence_time"].fillna(timeline["created_time"])
 
-        records.append({
-            "dispute_id": dispute_id,
-            "arbitrable": arbitrable,
-            "timestamp": row["timestamp"],
-        })
+    timeline = timeline.sort_values(["dispute_id", "round_id"], kind="stable").reset_index(drop=True)
+    return timeline[["dispute_id", "round_id", *time_columns]]
 
-    return pd.DataFrame(records)
+
+def build_stake_flows(shifts_df: pd.DataFrame) -> pd.DataFrame:
+    """(dispute_id, juror, fee_token)별 TokenAndETHShift 합계
+
+    pnk_amount / fee_amount는 배심원 기준 순이동 (양수 = 보상, 음수 = 페널티).
+    fee_token이 0 주소면 수수료는 ETH. 수수료는 raw 단위로 합친 뒤 FEE_TOKEN_DECIMALS로
+    토큰별 환산하고, 자릿수를 모르는 토큰은 fee_amount = NaN (fee_amount_raw만 유효).
+
+    Returns:
+        dispute_id, juror, fee_token, num_rounds, pnk_amount, fee_amount_raw, fee_amount, avg_coherency
+    """
+    flows = shifts_df.groupby(["dispute_id", "juror", "fee_token"]).agg(
+        num_rounds=("round_id", "nunique"),
+        pnk_amount=("pnk_amount", "sum"),
+        fee_amount_raw=("fee_amount_raw", "sum"),
+        avg_coherency=("degree_of_coherency", "mean"),
+    ).reset_index()
+    decimals = flows["fee_token"].str.lower().map(FEE_TOKEN_DECIMALS).astype(float)
+    flows.insert(flows.columns.get_loc("fee_amount_raw") + 1, "fee_amount", flows["fee_amount_raw"] / 10.0 ** decimals)
+    return flows
 
 
 def build_decoded_disputes(
@@ -200,8 +285,15 @@ def build_decoded_disputes(
     votes_df: pd.DataFrame,
     draws_df: pd.DataFrame,
     appeals_df: pd.DataFrame,
+    rounds_df: pd.DataFrame = None,
 ) -> pd.DataFrame:
-    """분쟁-판결 매칭 및 통계 집계"""
+    """분쟁-판결 매칭 및 통계 집계
+
+    consensus_rate / majority_choice는 마지막 라운드(최종 판결 라운드) 기준.
+    num_rounds와 reversed(마지막 라운드 다수파가 첫 라운드와 다름)도 함께 붙인다.
+    rounds_df를 넘기지 않으면 build_dispute_rounds로 계산.
+    unmatched_votes: 앞선 Draw가 없어 라운드 집계에서 빠진 투표 수.
+    """
 
     # Ruling 매칭
     merged = disputes_df.merge(
@@ -215,28 +307,33 @@ def build_decoded_disputes(
         vote_stats = votes_df.groupby("dispute_id").agg(
             num_votes=("voter", "count"),
             num_unique_voters=("voter", "nunique"),
-        ).reset_index()
-
-        # 합의 강도 (다수파 비율)
-        consensus_records = []
-        for did, group in votes_df.groupby("dispute_id"):
-            choice_counts = group["choice"].value_counts()
-            total = choice_counts.sum()
-            majority_share = choice_counts.iloc[0] / total if total > 0 else 0
-            consensus_records.append({
-                "dispute_id": did,
-                "consensus_rate": round(majority_share, 4),
-                "majority_choice": int(choice_counts.index[0]),
-            })
-        consensus_df = pd.DataFrame(consensus_records)
+        )
+        unmatched = assign_vote_rounds(votes_df, draws_df)["round_id"] < 0
+        vote_stats["unmatched_votes"] = unmatched.groupby(votes_df["dispute_id"].to_numpy()).sum()
+        vote_stats = vote_stats.reset_index()
+
+        # 합의 강도 (다수파 비율) — 라운드별 결과에서 첫/마지막 라운드
+        if rounds_df is None:
+            rounds_df = build_dispute_rounds(votes_df, draws_df)
+        by_dispute = rounds_df.groupby("dispute_id")
+        first, last = by_dispute.head(1).set_index("dispute_id"), by_dispute.tail(1).set_index("dispute_id")
+        consensus_df = pd.DataFrame({
+            "consensus_rate": last["majority_share"],
+            "majority_choice": last["majority_choice"],
+            "num_rounds": by_dispute.size(),
+            "reversed": last["majority_choice"] != first["majority_choice"],
+        }).reset_index()
 
         merged = merged.merge(vote_stats, on="dispute_id", how="left")
         merged = merged.merge(consensus_df, on="dispute_id", how="left")
     else:
         merged["num_votes"] = 0
         merged["num_unique_voters"] = 0
+        merged["unmatched_votes"] = 0
         merged["consensus_rate"] = 0
         merged["majority_choice"] = 0
+        merged["num_rounds"] = 0
+        merged["reversed"] = False
 
     # Draw 통계 (배심원 수)
     if not draws_df.empty:
@@ -256,10 +353,14 @@ def build_decoded_disputes(
     else:
         merged["num_appeals"] = 0
 
+    # 생성 → 판결까지 걸린 시간 (초, 판결 전이면 NaN)
+    merged["time_to_ruling"] = merged["ruling_time"] - merged["created_time"]
+
     # NaN -> 0
-    for col in ["num_votes", "num_unique_voters", "consensus_rate", "num_jurors_drawn", "num_draws", "num_appeals", "majority_choice"]:
+    for col in ["num_votes", "num_unique_voters", "unmatched_votes", "consensus_rate", "num_jurors_drawn", "num_draws", "num_appeals", "majority_choice", "num_rounds"]:
         if col in merged.columns:
             merged[col] = merged[col].fillna(0)
+    merged["reversed"] = merged["reversed"].fillna(False).astype(bool)
 
     return merged
 
@@ -270,41 +371,88 @@ def save_data(df: pd.DataFrame, name: str):
     print(f"Saved: {path} ({len(df)} rows)")
 
 
-def main():
-    print("=== Kleros 이벤트 디코딩 시작 ===")
+def build_aggregates(tables: dict) -> dict:
+    """base 테이블 → AGGREGATE_TABLES 이름별 분쟁 단위 집계"""
+    rounds = build_dispute_rounds(tables["votes"], tables["draws"])
+    return {
+        "kleros_decoded_disputes": build_decoded_disputes(
+            tables["disputes"], tables["rulings"], tables["votes"], tables["draws"], tables["appeals"], rounds_df=rounds,
+        ),
+        "kleros_dispute_rounds": rounds,
+        "kleros_dispute_periods": build_dispute_periods(tables["periods"], tables["disputes"]),
+        "kleros_stake_flows": build_stake_flows(tables["shifts"]),
+    }
 
-    events_path = DATA_DIR / "kleros_court_events.parquet"
-    if not events_path.exists():
-        print(f"Error: {events_path} not found. Run kleros_oracle.py first.")
-        return
 
-    events_df = pd.read_parquet(events_path)
-    print(f"Loaded {len(events_df)} raw events")
+def update_decoded_tables(new_tables: dict, incremental: bool) -> tuple:
+    """새 이벤트를 base 테이블에 이어 붙이고 집계 테이블 갱신
 
-    # 디코딩
-    print("\n[1/5] DisputeCreation 디코딩...")
-    disputes_df = decode_dispute_creation(events_df)
-    print(f"  {len(disputes_df)} disputes decoded")
+    Returns:
+        (base 테이블 dict, 집계 테이블 dict)
+    """
+    if not incremental:
+        return new_tables, build_aggregates(new_tables)
 
-    print("\n[2/5] Ruling 디코딩...")
-    rulings_df = decode_ruling(events_df)
-    print(f"  {len(rulings_df)} rulings decoded")
+    base = {
+        name: append_rows(pd.read_parquet(DATA_DIR / f"{table}.parquet"), new_tables[name])
+        for name, table in BASE_TABLES.items()
+    }
 
-    print("\n[3/5] VoteCast 디코딩...")
-    votes_df = decode_vote_cast(events_df)
-    print(f"  {len(votes_df)} votes decoded")
+    # 새 이벤트가 닿은 분쟁만 다시 집계 → 기존 집계 테이블의 해당 행 교체
+    keys = pd.concat([new_tables[name][["dispute_id"]] for name in BASE_TABLES], ignore_index=True).drop_duplicates()
+    updated = build_aggregates({name: base[name][key_mask(base[name], keys)] for name in BASE_TABLES})
+    print(f"  갱신 분쟁: {len(keys)}")
 
-    print("\n[4/5] Draw 디코딩...")
-    draws_df = decode_draw(events_df)
-    print(f"  {len(draws_df)} draws decoded")
+    aggregates = {
+        name: replace_keys(pd.read_parquet(DATA_DIR / f"{name}.parquet"), updated[name], keys, order_col=order_col)
+        for name, order_col in AGGREGATE_TABLES.items()
+    }
+    return base, aggregates
 
-    print("\n[5/5] AppealPossible 디코딩...")
-    appeals_df = decode_appeal_possible(events_df)
-    print(f"  {len(appeals_df)} appeals decoded")
+
+def main(full: bool = False, workers: int = 1):
+    print("=== Kleros 이벤트 디코딩 시작 ===")
+
+    events_path = DATA_DIR / "kleros_court_events.parquet"
+    if not events_path.exists():
+        print(f"Error: {events_path} not found. Run `python -m collectors.kleros_oracle` first.")
+        return
+
+    # 이전 결과가 모두 있어야 이어서 디코딩 가능
+    watermark = DecodeWatermark(STATE_PATH)
+    outputs = [DATA_DIR / f"{t}.parquet" for t in [*BASE_TABLES.values(), *AGGREGATE_TABLES]]
+    # 수수료를 18자리로 일괄 환산하던 이전 shifts 테이블은 raw 단위와 섞이지 않게 처음부터 다시 디코딩
+    shifts_path = DATA_DIR / f"{BASE_TABLES['shifts']}.parquet"
+    stale_shifts = shifts_path.exists() and "fee_amount_raw" not in pq.read_schema(shifts_path).names
+    if full or stale_shifts or not all(p.exists() for p in outputs):
+        watermark.reset()
+    incremental = watermark.last_block is not None
+    if incremental:
+        print(f"증분 디코딩: block > {watermark.last_block}")
+
+    # 필요한 topic0의 행만 읽고, 한 번의 패스로 모든 이벤트 타입을 디코딩
+    events = read_raw_table(events_path, KLEROS_EVENTS, min_block=watermark.next_block)
+    print(f"Loaded {events.num_rows} raw events")
+    if incremental and events.num_rows == 0:
+        print("새 이벤트 없음")
+        return
+
+    print("\n이벤트 디코딩 (DisputeCreation / Ruling / VoteCast / Draw / AppealPossible / NewPeriod / TokenAndETHShift)...")
+    # workers > 1이면 블록 구간 파티션별로 프로세스 풀에서 디코딩
+    tables = event_tables(decode_partitioned(events, KLEROS_EVENTS, workers=workers))
+    print(f"  {len(tables['disputes'])} disputes decoded")
+    print(f"  {len(tables['rulings'])} rulings decoded")
+    print(f"  {len(tables['votes'])} votes decoded")
+    print(f"  {len(tables['draws'])} draws decoded")
+    print(f"  {len(tables['appeals'])} appeals decoded")
+    print(f"  {len(tables['periods'])} period changes decoded")
+    print(f"  {len(tables['shifts'])} token shifts decoded")
 
     # 매칭 및 통계 집계
     print("\n분쟁-판결 매칭 및 통계 집계...")
-    decoded_disputes = build_decoded_disputes(disputes_df, rulings_df, votes_df, draws_df, appeals_df)
+    base, aggregates = update_decoded_tables(tables, incremental)
+    decoded_disputes = aggregates["kleros_decoded_disputes"]
+    votes_df = base["votes"]
 
     # 통계 출력
     resolved = decoded_disputes[decoded_disputes["ruling"].notna() & (decoded_disputes["ruling"] > 0)]
@@ -319,6 +467,19 @@ def main():
         for val, count in ruling_dist.items():
             print(f"    Ruling {int(val)}: {count}")
 
+    appealed = decoded_disputes[decoded_disputes["num_rounds"] > 1]
+    print(f"\n  다중 라운드 분쟁: {len(appealed)} (첫 라운드 대비 다수파 번복 {int(appealed['reversed'].sum())})")
+    print(f"  Draw 없는 투표 (라운드 집계 제외): {int(decoded_disputes['unmatched_votes'].sum())}")
+
+    ruled = decoded_disputes["time_to_ruling"].dropna()
+    if not ruled.empty:
+        print(f"  생성 → 판결 중앙값: {ruled.median() / 86400:.1f}일")
+
+    flows = aggregates["kleros_stake_flows"]
+    if not flows.empty:
+        juror_pnk = flows.groupby("juror")["pnk_amount"].sum()
+        print(f"  PNK 순이익 배심원: {int((juror_pnk > 0).sum())}, 순손실 배심원: {int((juror_pnk < 0).sum())}")
+
     # 배심원 재참여 분석
     if not votes_df.empty:
         voter_counts = votes_df.groupby("voter")["dispute_id"].nunique()
@@ -327,12 +488,19 @@ def main():
         print(f"\n  고유 투표자: {total_voters}")
         print(f"  반복 참여 투표자 (2+ 분쟁): {repeat_voters} ({repeat_voters/max(total_voters,1)*100:.1f}%)")
 
-    # 저장
-    save_data(decoded_disputes, "kleros_decoded_disputes")
-    save_data(votes_df, "kleros_decoded_votes")
+    # 저장 (전부 저장한 뒤에 워터마크 전진)
+    for name, table_df in aggregates.items():
+        save_data(table_df, name)
+    for name, table in BASE_TABLES.items():
+        save_data(base[name], table)
+    watermark.advance(events)
 
     print("\n=== 디코딩 완료 ===")
 
 
 if __name__ == "__main__":
-    main()
+    args = sys.argv[1:]
+    main(
+        full="--full" in args,
+        workers=int(args[args.index("--workers") + 1]) if "--workers" in args else 1,
+    )
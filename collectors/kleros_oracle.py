@@ -3,6 +3,8 @@ Kleros 오라클 데이터 수집 (Etherscan API V2)
 - Ethereum: PNK 토큰 전체 홀더 분포
 - Arbitrum: Kleros v2 Court 스테이킹 분포
 - Arbitrum: Kleros v2 Court 분쟁 이벤트 (DisputeCreation, Draw, VoteCast, Ruling 등)
+
+실행 (저장소 루트): python -m collectors.kleros_oracle
 """
 
 import json
@@ -14,6 +16,8 @@ from pathlib import Path
 import pandas as pd
 import requests
 
+from collectors import event_registry
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
@@ -165,19 +169,8 @@ KLEROS_CORE = "0x991d2df165670b9cac3B022f4B68D65b664222ea"
 DISPUTE_KIT_CLASSIC = "0x70B464be85A547144C72485eBa2577E5D3A45421"
 ARBITRUM_CHAIN_ID = 42161
 
-# topic0 해시 → 이벤트 이름 매핑 (keccak256 of event signatures)
-KLEROS_EVENT_NAMES = {
-    # KlerosCore events
-    "0x141dfc18aa6a56fc816f44f0e9e2f1ebc92b15ab167770e17db5b084c10ed995": "DisputeCreation",
-    "0x6119cf536152c11e0a9a6c22f3953ce4ecc93ee54fa72ffa326ffabded21509b": "Draw",
-    "0x394027a5fa6e098a1191094d1719d6929b9abc535fcc0c8f448d6a4e75622276": "Ruling",
-    "0x4e6f5cf43b95303e86aee81683df63992061723a829ee012db21dad388756b91": "NewPeriod",
-    "0xa5d41b970d849372be1da1481ffd78d162bfe57a7aa2fe4e5fb73481fa5ac24f": "AppealPossible",
-    "0x8975b837fe0d18616c65abb8b843726a32b552ee4feca009944fa658bbb282e7": "TokenAndETHShift",
-    # DisputeKitClassic events
-    "0xa000893c71384499023d2d7b21234f7b9e80c78e0330f357dcd667ff578bd3a4": "VoteCast",
-    "0xd3106f74c2d30a4b9230e756a3e78bde53865d40f6af4c479bb010ebaab58108": "DisputeCreation",
-}
+# topic0 해시 → 이벤트 이름 매핑 (event_registry의 시그니처에서 keccak256 계산)
+KLEROS_EVENT_NAMES = event_registry.event_names((event_registry.KLEROS_CORE, event_registry.DISPUTE_KIT_CLASSIC))
 
 # Kleros v2 Court 배포 블록 (Arbitrum, 2024-11-07)
 KLEROS_COURT_START_BLOCK = 272000000
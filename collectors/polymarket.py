@@ -1,7 +1,9 @@
 """
 Polymarket 데이터 수집 (공식 API)
 - 마켓 데이터 (TVL, 거래량)
-- 거래 내역 (wash trading 분석용)
+- 거래 내역은 polymarket_trades.py에서 전체 수집 (wash trading 분석용)
+
+실행 (저장소 루트): python -m collectors.polymarket
 
 API 문서: https://docs.polymarket.com/
 """
@@ -15,6 +17,8 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from collectors.concentration_metrics import concentration_curve
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
@@ -80,23 +84,6 @@ def fetch_all_markets(closed: bool = False, max_markets: int = 5000) -> list:
     return all_markets
 
 
-def fetch_market_trades(clob_token_id: str, limit: int = 500) -> list:
-    """특정 마켓의 거래 내역 수집"""
-
-    url = f"{CLOB_API}/trades"
-    params = {
-        "asset_id": clob_token_id,
-        "limit": limit
-    }
-
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        return []
-
-
 def parse_resolution(outcome_prices_str, outcomes_str) -> str:
     """outcomePrices에서 해결 결과 추론
 
@@ -162,6 +149,7 @@ def collect_markets(closed: bool = False) -> pd.DataFrame:
             "closed": m.get("closed"),
             "outcomes": m.get("outcomes"),
             "outcome_prices": m.get("outcomePrices"),
+            "clob_token_ids": m.get("clobTokenIds"),
         })
 
     df = pd.DataFrame(records)
@@ -194,52 +182,23 @@ def collect_resolved_markets(max_markets: int = 10000) -> pd.DataFrame:
             "resolution": resolution,
             "condition_id": m.get("conditionId"),
             "resolution_source": m.get("resolutionSource"),
+            "clob_token_ids": m.get("clobTokenIds"),
         })
 
     df = pd.DataFrame(records)
     return df
 
 
-def collect_trades_sample(markets_df: pd.DataFrame, sample_size: int = 50) -> pd.DataFrame:
-    """상위 마켓들의 거래 내역 샘플 수집"""
-
-    # 거래량 상위 마켓 선택
-    top_markets = markets_df.nlargest(sample_size, "volume")
-
-    all_trades = []
-    for idx, row in top_markets.iterrows():
-        # clobTokenIds 파싱 시도
-        try:
-            market_id = row["id"]
-            trades = fetch_market_trades(market_id)
-
-            for t in trades:
-                t["market_id"] = market_id
-                t["market_question"] = row["question"]
-                all_trades.append(t)
-
-            print(f"  [{len(all_trades)}] {row['question'][:50]}...")
-            time.sleep(0.3)
-        except Exception as e:
-            continue
-
-    if all_trades:
-        return pd.DataFrame(all_trades)
-    return pd.DataFrame()
-
-
 def analyze_liquidity(markets_df: pd.DataFrame) -> dict:
     """유동성 집중도 분석"""
 
     total_volume = markets_df["volume"].sum()
     total_liquidity = markets_df["liquidity"].sum()
 
-    # 상위 N개 마켓 점유율
-    top10_volume = markets_df.nlargest(10, "volume")["volume"].sum()
-    top20_volume = markets_df.nlargest(20, "volume")["volume"].sum()
-    top50_volume = markets_df.nlargest(50, "volume")["volume"].sum()
-
-    top10_liquidity = markets_df.nlargest(10, "liquidity")["liquidity"].sum()
+    # 상위 N개 마켓 점유율 (지표별 정렬 1회 + 누적합)
+    # 마켓이 없으면 곡선도 비므로 점유율 0
+    shares = concentration_curve(markets_df, ["volume", "liquidity"], ns=[10, 20, 50]).set_index("top_n")
+    shares = shares.reindex([10, 20, 50], fill_value=0.0)
 
     # 활성 마켓 수
     active_markets = markets_df[markets_df["active"] == True]
@@ -251,10 +210,10 @@ def analyze_liquidity(markets_df: pd.DataFrame) -> dict:
         "liquid_markets_10k": len(liquid_markets),
         "total_volume_usd": total_volume,
         "total_liquidity_usd": total_liquidity,
-        "top10_volume_share": top10_volume / total_volume * 100 if total_volume > 0 else 0,
-        "top20_volume_share": top20_volume / total_volume * 100 if total_volume > 0 else 0,
-        "top50_volume_share": top50_volume / total_volume * 100 if total_volume > 0 else 0,
-        "top10_liquidity_share": top10_liquidity / total_liquidity * 100 if total_liquidity > 0 else 0,
+        "top10_volume_share": shares.loc[10, "volume_share"],
+        "top20_volume_share": shares.loc[20, "volume_share"],
+        "top50_volume_share": shares.loc[50, "volume_share"],
+        "top10_liquidity_share": shares.loc[10, "liquidity_share"],
     }
 
 
@@ -270,7 +229,7 @@ def main():
     print(f"시간: {datetime.now().isoformat()}")
 
     # 진행중인 마켓만 수집 (closed=False)
-    print("\n[1/3] 진행중인 마켓 데이터 수집 중 (최대 5000개)...")
+    print("\n[1/2] 진행중인 마켓 데이터 수집 중 (최대 5000개)...")
     markets_df = collect_markets(closed=False)
     save_data(markets_df, "polymarket_markets")
 
@@ -291,7 +250,7 @@ def main():
     stats_df["collected_at"] = datetime.now().isoformat()
     save_data(stats_df, "polymarket_liquidity_stats")
 
-    print("\n[2/3] 종료된 마켓 데이터 수집 중 (최대 10000개)...")
+    print("\n[2/2] 종료된 마켓 데이터 수집 중 (최대 10000개)...")
     resolved_df = collect_resolved_markets(max_markets=10000)
     save_data(resolved_df, "polymarket_resolved")
 
@@ -303,12 +262,7 @@ def main():
         for res, count in res_counts.items():
             print(f"  {res}: {count} ({count/len(resolved_df)*100:.1f}%)")
 
-    print("\n[3/3] 거래 내역 샘플 수집 중...")
-    trades_df = collect_trades_sample(markets_df, sample_size=30)
-    if not trades_df.empty:
-        save_data(trades_df, "polymarket_trades")
-    else:
-        print("  거래 내역 수집 실패 (API 제한일 수 있음)")
+    print("\n거래 내역은 polymarket_trades.py로 전체 수집합니다 (clob_token_ids 기준).")
 
     print("\n=== 수집 완료 ===")
 
@@ -0,0 +1,393 @@
+"""
+Polymarket CLOB 오더북 스냅샷 수집 및 스프레드/호가 깊이 저장소
+
+1. 대상 토큰의 오더북을 주기적으로 스냅샷 (POST /books 배치 조회)
+2. 상위 N호가를 정수 배열(가격 틱, 수량)로 인코딩
+3. 토큰별로 직전 스냅샷과의 차분(delta)만 저장 — 대부분 0이라 parquet에서 거의 공짜
+4. OrderBookStore: 특정 시점의 최우선 호가, X bps 이내 깊이, 체결 비용 조회
+
+저장 구조:
+    data/polymarket_orderbooks/date=YYYY-MM-DD/books-<unix_ms>.parquet
+    각 파일의 토큰별 첫 행은 keyframe (전체 값) → 파일 단위로 독립 복원 가능
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+DATA_DIR.mkdir(exist_ok=True)
+
+CLOB_API = "https://clob.polymarket.com"
+BOOKS_DIR = DATA_DIR / "polymarket_orderbooks"
+
+DEPTH = 20               # 저장할 호가 단계 수 (side별)
+PRICE_SCALE = 10_000     # 가격 1e-4 단위 정수 (Polymarket tick 0.01/0.001 수용)
+SIZE_SCALE = 100         # 수량 1e-2 단위 정수
+KEYFRAME_INTERVAL = 60   # 토큰별 keyframe 주기 (스냅샷 수)
+BOOK_FIELDS = ["bid_px", "bid_sz", "ask_px", "ask_sz"]
+
+
+def get_session() -> requests.Session:
+    """Retry 로직이 포함된 세션 생성"""
+    session = requests.Session()
+    retry = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=None)
+    adapter = HTTPAdapter(max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+def book_schema(depth: int = DEPTH) -> pa.Schema:
+    return pa.schema([
+        ("ts", pa.int64()),
+        ("token_id", pa.string()),
+        ("keyframe", pa.bool_()),
+        ("bid_px", pa.list_(pa.int32(), depth)),
+        ("bid_sz", pa.list_(pa.int64(), depth)),
+        ("ask_px", pa.list_(pa.int32(), depth)),
+        ("ask_sz", pa.list_(pa.int64(), depth)),
+    ])
+
+
+# ─── 수집 ─────────────────────────────────────────────────────────
+
+def fetch_books(session: requests.Session, token_ids: list, batch_size: int = 100) -> list:
+    """여러 토큰의 오더북을 배치로 조회.
+
+    Returns:
+        list of book dicts {asset_id, timestamp, bids: [{price, size}], asks: [...]}
+    """
+    books = []
+    for i in range(0, len(token_ids), batch_size):
+        batch = [{"token_id": t} for t in token_ids[i:i + batch_size]]
+        try:
+            resp = session.post(f"{CLOB_API}/books", json=batch, timeout=30)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            print(f"    에러 (batch={i // batch_size}): {e}", flush=True)
+            continue
+        books.extend(resp.json() or [])
+    return books
+
+
+def encode_levels(levels: list, descending: bool, depth: int = DEPTH) -> tuple:
+    """호가 리스트 → (가격 틱 배열, 수량 배열), 최우선 호가부터 depth개, 부족분은 0"""
+    px = np.zeros(depth, dtype=np.int32)
+    sz = np.zeros(depth, dtype=np.int64)
+    if not levels:
+        return px, sz
+
+    prices = np.array([float(lv["price"]) for lv in levels])
+    sizes = np.array([float(lv["size"]) for lv in levels])
+    order = np.argsort(-prices if descending else prices, kind="stable")[:depth]
+    k = len(order)
+    px[:k] = np.round(prices[order] * PRICE_SCALE).astype(np.int32)
+    sz[:k] = np.round(sizes[order] * SIZE_SCALE).astype(np.int64)
+    return px, sz
+
+
+class OrderBookWriter:
+    """스냅샷을 토큰별 delta로 인코딩해 버퍼링하고 parquet 파일로 flush.
+
+    flush할 때마다 직전 상태를 비우므로 각 파일의 토큰별 첫 행은 keyframe.
+    """
+
+    def __init__(self, out_dir: Path = None, depth: int = DEPTH, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.out_dir = out_dir or BOOKS_DIR
+        self.depth = depth
+        self.keyframe_interval = keyframe_interval
+        self._prev = {}       # token_id → 직전 스냅샷 배열 dict
+        self._since_key = {}  # token_id → 마지막 keyframe 이후 스냅샷 수
+        self._rows = {name: [] for name in ["ts", "token_id", "keyframe"] + BOOK_FIELDS}
+
+    def add(self, ts_ms: int, token_id: str, book: dict):
+        bid_px, bid_sz = encode_levels(book.get("bids"), descending=True, depth=self.depth)
+        ask_px, ask_sz = encode_levels(book.get("asks"), descending=False, depth=self.depth)
+        current = {"bid_px": bid_px, "bid_sz": bid_sz, "ask_px": ask_px, "ask_sz": ask_sz}
+
+        prev = self._prev.get(token_id)
+        keyframe = prev is None or self._since_key.get(token_id, 0) >= self.keyframe_interval
+        for name in BOOK_FIELDS:
+            self._rows[name].append(current[name] if keyframe else current[name] - prev[name])
+
+        self._rows["ts"].append(ts_ms)
+        self._rows["token_id"].append(token_id)
+        self._rows["keyframe"].append(keyframe)
+        self._prev[token_id] = current
+        self._since_key[token_id] = 1 if keyframe else self._since_key[token_id] + 1
+
+    def __len__(self):
+        return len(self._rows["ts"])
+
+    def flush(self) -> Path:
+        """버퍼를 parquet 파일 하나로 저장 (날짜 파티션)"""
+        if not len(self):
+            return None
+
+        schema = book_schema(self.depth)
+        arrays = [
+            pa.array(self._rows["ts"], pa.int64()),
+            pa.array(self._rows["token_id"], pa.string()),
+            pa.array(self._rows["keyframe"], pa.bool_()),
+        ]
+        for name in BOOK_FIELDS:
+            flat = np.concatenate(self._rows[name])
+            arrays.append(pa.FixedSizeListArray.from_arrays(pa.array(flat, schema.field(name).type.value_type), self.depth))
+        table = pa.Table.from_arrays(arrays, schema=schema)
+
+        first_ts = self._rows["ts"][0]
+        date = datetime.fromtimestamp(first_ts / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+        out_dir = self.out_dir / f"date={date}"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        path = out_dir / f"books-{first_ts}.parquet"
+        pq.write_table(table, path, compression="zstd")
+
+        self._rows = {name: [] for name in self._rows}
+        self._prev.clear()
+        self._since_key.clear()
+        return path
+
+
+def snapshot_loop(
+    token_ids: list,
+    interval: float = 60.0,
+    iterations: int = None,
+    flush_every: int = 30,
+    writer: OrderBookWriter = None,
+):
+    """대상 토큰 오더북을 interval초마다 스냅샷.
+
+    Args:
+        token_ids: CLOB 토큰 ID 목록
+        interval: 스냅샷 주기 (초)
+        iterations: 반복 횟수 (None이면 무한)
+        flush_every: 몇 라운드마다 파일로 flush할지
+    """
+    session = get_session()
+    writer = writer or OrderBookWriter()
+    targets = set(token_ids)
+    rounds = 0
+
+    try:
+        while iterations is None or rounds < iterations:
+            started = time.time()
+            books = fetch_books(session, list(token_ids))
+            for book in books:
+                token_id = book.get("asset_id")
+                if token_id not in targets:
+                    continue
+                ts_ms = int(book.get("timestamp") or started * 1000)
+                writer.add(ts_ms, token_id, book)
+            rounds += 1
+
+            if rounds % flush_every == 0:
+                path = writer.flush()
+                print(f"  [{rounds}] {len(books)} books → {path}", flush=True)
+
+            time.sleep(max(0.0, interval - (time.time() - started)))
+    finally:
+        writer.flush()
+
+
+# ─── 조회 ─────────────────────────────────────────────────────────
+
+class OrderBookStore:
+    """저장된 delta 스냅샷을 복원해 시점별 호가를 조회.
+
+    복원은 (token, ts) 정렬 후 keyframe 구간별 누적합 — 행 단위 루프 없음.
+    가격/수량은 float (가격 0~1, 수량 shares)으로 반환.
+    """
+
+    def __init__(self, tokens: dict):
+        # tokens: token_id → {"ts": (n,), "bid_px": (n, depth), ...}
+        self.tokens = tokens
+
+    @classmethod
+    def load(cls, books_dir: Path = None, token_ids: list = None, start_ms: int = None, end_ms: int = None):
+        books_dir = books_dir or BOOKS_DIR
+        dataset = ds.dataset(books_dir, format="parquet", partitioning="hive")
+
+        # keyframe 복원을 위해 시작 시점 필터는 복원 이후에 적용
+        filt = None
+        if token_ids is not None:
+            filt = ds.field("token_id").isin(list(token_ids))
+        if end_ms is not None:
+            cond = ds.field("ts") <= end_ms
+            filt = cond if filt is None else filt & cond
+        table = dataset.to_table(columns=["ts", "token_id", "keyframe"] + BOOK_FIELDS, filter=filt)
+        return cls(decode_table(table, start_ms=start_ms))
+
+    def _index(self, token_id: str, ts_ms: int) -> tuple:
+        book = self.tokens.get(token_id)
+        if book is None:
+            return None, -1
+        i = int(np.searchsorted(book["ts"], ts_ms, side="right")) - 1
+        return book, i
+
+    def best_bid_ask(self, token_id: str, ts_ms: int) -> dict:
+        """ts_ms 시점(이전 최신 스냅샷)의 최우선 매수/매도 호가"""
+        book, i = self._index(token_id, ts_ms)
+        if i < 0:
+            return {}
+        best_bid = book["bid_px"][i, 0] if book["bid_sz"][i, 0] > 0 else np.nan
+        best_ask = book["ask_px"][i, 0] if book["ask_sz"][i, 0] > 0 else np.nan
+        return {
+            "snapshot_ts": int(book["ts"][i]),
+            "best_bid": float(best_bid),
+            "best_ask": float(best_ask),
+            "spread": float(best_ask - best_bid),
+            "mid": float((best_ask + best_bid) / 2),
+        }
+
+    def depth_within_bps(self, token_id: str, ts_ms: int, bps: float) -> dict:
+        """mid 기준 ±bps 이내 호가 잔량 (shares, USDC)"""
+        quote = self.best_bid_ask(token_id, ts_ms)
+        if not quote or np.isnan(quote["mid"]):
+            return {}
+        book, i = self._index(token_id, ts_ms)
+        mid = quote["mid"]
+        band = mid * bps / 10_000
+
+        bid_px, bid_sz = book["bid_px"][i], book["bid_sz"][i]
+        ask_px, ask_sz = book["ask_px"][i], book["ask_sz"][i]
+        bid_mask = (bid_sz > 0) & (bid_px >= mid - band)
+        ask_mask = (ask_sz > 0) & (ask_px <= mid + band)
+
+        return {
+            **quote,
+            "bps": bps,
+            "bid_depth": float(bid_sz[bid_mask].sum()),
+            "ask_depth": float(ask_sz[ask_mask].sum()),
+            "bid_depth_usd": float((bid_px[bid_mask] * bid_sz[bid_mask]).sum()),
+            "ask_depth_usd": float((ask_px[ask_mask] * ask_sz[ask_mask]).sum()),
+        }
+
+    def estimate_fill(self, token_id: str, ts_ms: int, size: float, side: str = "buy") -> dict:
+        """size shares를 시장가로 체결할 때의 평균 체결가와 mid 대비 비용.
+
+        buy는 매도 호가를, sell은 매수 호가를 위에서부터 소진한다.
+        저장된 DEPTH 안에서 다 채워지지 않으면 filled < size.
+        """
+        quote = self.best_bid_ask(token_id, ts_ms)
+        if not quote:
+            return {}
+        book, i = self._index(token_id, ts_ms)
+        prefix = "ask" if side == "buy" else "bid"
+        px, sz = book[f"{prefix}_px"][i], book[f"{prefix}_sz"][i]
+
+        cum = np.cumsum(sz)
+        take = np.clip(size - (cum - sz), 0, sz)
+        filled = float(take.sum())
+        avg_price = float((take * px).sum() / filled) if filled > 0 else np.nan
+        cost = avg_price - quote["mid"] if side == "buy" else quote["mid"] - avg_price
+
+        return {
+            **quote,
+            "side": side,
+            "requested": size,
+            "filled": filled,
+            "avg_price": avg_price,
+            "slippage": float(cost),
+        }
+
+    def spread_series(self, token_id: str) -> pd.DataFrame:
+        """토큰의 전체 스냅샷 시계열 (ts, best_bid, best_ask, spread)"""
+        book = self.tokens.get(token_id)
+        if book is None:
+            return pd.DataFrame(columns=["ts", "best_bid", "best_ask", "spread"])
+        best_bid = np.where(book["bid_sz"][:, 0] > 0, book["bid_px"][:, 0], np.nan)
+        best_ask = np.where(book["ask_sz"][:, 0] > 0, book["ask_px"][:, 0], np.nan)
+        return pd.DataFrame({
+            "ts": book["ts"],
+            "best_bid": best_bid,
+            "best_ask": best_ask,
+            "spread": best_ask - best_bid,
+        })
+
+
+def decode_table(table: pa.Table, start_ms: int = None) -> dict:
+    """delta 인코딩된 스냅샷 테이블 → 토큰별 전체 호가 배열.
+
+    (token, ts)로 정렬하면 토큰별 체인은 keyframe으로 시작하므로,
+    누적합에서 각 keyframe 직전 누적값을 빼면 세그먼트별 누적합이 된다.
+    """
+    if table.num_rows == 0:
+        return {}
+
+    token_codes, token_ids = pd.factorize(table.column("token_id").to_numpy(zero_copy_only=False))
+    ts = table.column("ts").to_numpy()
+    keyframe = table.column("keyframe").to_numpy(zero_copy_only=False)
+    order = np.lexsort((ts, token_codes))
+
+    token_codes, ts, keyframe = token_codes[order], ts[order], keyframe[order]
+    segment = np.cumsum(keyframe) - 1
+    seg_start = np.flatnonzero(keyframe)[segment]
+
+    decoded = {}
+    for name in BOOK_FIELDS:
+        col = table.column(name).combine_chunks()
+        depth = col.type.list_size
+        values = col.flatten().to_numpy().reshape(-1, depth)[order].astype(np.int64)
+        cum = np.cumsum(values, axis=0)
+        before = np.where((seg_start > 0)[:, None], cum[np.maximum(seg_start - 1, 0)], 0)
+        scale = PRICE_SCALE if name.endswith("_px") else SIZE_SCALE
+        decoded[name] = (cum - before) / scale
+
+    bounds = np.flatnonzero(np.diff(token_codes)) + 1
+    tokens = {}
+    for idx in np.split(np.arange(len(order)), bounds):
+        if start_ms is not None:
+            # start_ms 직전 스냅샷 하나는 as-of 조회용으로 남김
+            k = int(np.searchsorted(ts[idx], start_ms, side="left"))
+            idx = idx[max(k - 1, 0):]
+        token_id = token_ids[token_codes[idx[0]]]
+        tokens[token_id] = {"ts": ts[idx], **{name: decoded[name][idx] for name in BOOK_FIELDS}}
+    return tokens
+
+
+def select_target_tokens(top_n: int = 200) -> list:
+    """유동성 상위 마켓의 Yes/No 토큰 목록"""
+    markets_df = pd.read_parquet(DATA_DIR / "polymarket_markets.parquet")
+    top = markets_df.nlargest(top_n, "liquidity")
+
+    token_ids = []
+    for raw in top["clob_token_ids"].dropna():
+        ids = json.loads(raw) if isinstance(raw, str) else list(raw)
+        token_ids.extend(str(t) for t in ids)
+    return list(dict.fromkeys(token_ids))
+
+
+def main():
+    print("=== Polymarket 오더북 스냅샷 수집 시작 ===", flush=True)
+    print(f"시간: {datetime.now().isoformat()}\n", flush=True)
+
+    markets_path = DATA_DIR / "polymarket_markets.parquet"
+    if not markets_path.exists():
+        print("ERROR: polymarket_markets.parquet이 없습니다. 먼저 `python -m collectors.polymarket`을 실행하세요.", flush=True)
+        return
+
+    token_ids = select_target_tokens()
+    print(f"대상 토큰: {len(token_ids)}건 (유동성 상위 마켓)", flush=True)
+    print(f"저장 위치: {BOOKS_DIR} (depth={DEPTH}, 60초 주기, Ctrl+C로 종료)\n", flush=True)
+
+    try:
+        snapshot_loop(token_ids)
+    except KeyboardInterrupt:
+        print("\n중단됨 — 버퍼 저장 완료", flush=True)
+
+    print("\n=== 수집 종료 ===", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -255,7 +255,7 @@ def main():
     # 기존 resolved 데이터 로드
     resolved_path = DATA_DIR / "polymarket_resolved.parquet"
     if not resolved_path.exists():
-        print("ERROR: polymarket_resolved.parquet이 없습니다. 먼저 polymarket.py를 실행하세요.", flush=True)
+        print("ERROR: polymarket_resolved.parquet이 없습니다. 먼저 `python -m collectors.polymarket`을 실행하세요.", flush=True)
         return
 
     resolved_df = pd.read_parquet(resolved_path)
@@ -0,0 +1,253 @@
+"""
+Polymarket 실시간 가격 피드 소비자 + 증분 Calibration
+
+1. CLOB market websocket 구독 (Yes 토큰 기준)
+2. 마켓별 최신 가격과 일별 마지막 가격(최근 31일)을 메모리에 유지
+3. 마켓이 해결되면 T-0/T-1d/T-7d/T-30d 가격을 RunningCalibration에 누적
+4. 현재 calibration curve / Brier score를 주기적으로 JSON에 기록
+
+테스트용으로 로컬 websocket 서버(같은 메시지 형식)를 가리킬 수 있음:
+    python -m collectors.polymarket_stream ws://localhost:8765
+"""
+
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from analysis.calibration import RunningCalibration
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+DATA_DIR.mkdir(exist_ok=True)
+
+WS_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+STATE_PATH = DATA_DIR / "streaming_calibration.json"
+
+DAY = 86400
+HORIZONS = {
+    "t0": 0,
+    "t1d": DAY,
+    "t7d": 7 * DAY,
+    "t30d": 30 * DAY,
+}
+
+
+class PriceFeedConsumer:
+    """websocket 메시지를 받아 마켓 가격 상태와 calibration 통계를 갱신.
+
+    네트워크와 분리되어 있어 on_message에 메시지를 직접 넣어도 동작한다.
+    """
+
+    def __init__(self, token_map: dict, calibration: RunningCalibration = None):
+        # token_map: token_id → (market_id, is_yes)
+        self.token_map = token_map
+        self.calibration = calibration or RunningCalibration(tuple(HORIZONS))
+        self.last_price = {}    # market_id → (ts, yes price)
+        self.daily_price = {}   # market_id → {day: yes price}
+        self.resolved = set()
+        self.messages = 0
+        self.bad_frames = 0  # JSON이 아닌 프레임 (텍스트 에러/PONG 변형 등) — 세고 건너뜀
+
+    # ── 가격 갱신 ──
+    def update_price(self, token_id: str, price: float, ts: float = None):
+        entry = self.token_map.get(token_id)
+        if entry is None or price is None:
+            return
+        market_id, is_yes = entry
+        if market_id in self.resolved:
+            return
+
+        ts = ts or time.time()
+        yes_price = price if is_yes else 1.0 - price
+        self.last_price[market_id] = (ts, yes_price)
+
+        days = self.daily_price.setdefault(market_id, {})
+        days[int(ts // DAY)] = yes_price
+        if len(days) > 31:
+            del days[min(days)]
+
+    def price_at(self, market_id: str, target_ts: float):
+        """target_ts 이전 가장 최근 일별 가격 (extract_snapshots와 같은 규칙)"""
+        days = self.daily_price.get(market_id, {})
+        target_day = int(target_ts // DAY)
+        candidates = [d for d in days if d <= target_day]
+        if not candidates:
+            return None
+        return days[max(candidates)]
+
+    # ── 해결 처리 ──
+    def resolve(self, market_id: str, outcome: int, ts: float = None):
+        """마켓 해결 → horizon별 가격을 calibration에 누적하고 추적 종료"""
+        if market_id in self.resolved or market_id not in self.last_price:
+            return
+        ts = ts or time.time()
+
+        for horizon, offset in HORIZONS.items():
+            price = self.last_price[market_id][1] if offset == 0 else self.price_at(market_id, ts - offset)
+            if price is not None:
+                self.calibration.add(horizon, price, outcome)
+
+        self.resolved.add(market_id)
+        self.last_price.pop(market_id, None)
+        self.daily_price.pop(market_id, None)
+
+    # ── 메시지 처리 ──
+    def on_message(self, raw):
+        if raw in ("PONG", b"PONG"):
+            return
+        try:
+            payload = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        except ValueError:
+            self.bad_frames += 1
+            return
+        events = payload if isinstance(payload, list) else [payload]
+
+        for event in events:
+            if not isinstance(event, dict):
+                self.bad_frames += 1
+                continue
+            self.messages += 1
+            event_type = event.get("event_type")
+            ts = float(event.get("timestamp", 0) or 0) / 1000 or None
+
+            if event_type == "last_trade_price":
+                self.update_price(event.get("asset_id"), _to_float(event.get("price")), ts)
+
+            elif event_type == "price_change":
+                for change in event.get("price_changes", []):
+                    bid, ask = _to_float(change.get("best_bid")), _to_float(change.get("best_ask"))
+                    price = (bid + ask) / 2 if bid is not None and ask is not None else _to_float(change.get("price"))
+                    self.update_price(change.get("asset_id"), price, ts)
+
+            elif event_type == "book":
+                bids = [_to_float(lv["price"]) for lv in event.get("bids", [])]
+                asks = [_to_float(lv["price"]) for lv in event.get("asks", [])]
+                if bids and asks:
+                    self.update_price(event.get("asset_id"), (max(bids) + min(asks)) / 2, ts)
+
+            elif event_type == "market_resolved":
+                winner = event.get("winning_asset_id")
+                entry = self.token_map.get(winner)
+                if entry is not None:
+                    market_id, is_yes = entry
+                    self.resolve(market_id, 1 if is_yes else 0, ts)
+
+    def current(self) -> dict:
+        """현재 calibration 상태 (analyze_calibration 결과와 같은 키)"""
+        return {
+            "updated_at": datetime.now().isoformat(),
+            "tracked_markets": len(self.last_price),
+            "resolved_markets": len(self.resolved),
+            "messages": self.messages,
+            "bad_frames": self.bad_frames,
+            **self.calibration.summary(),
+        }
+
+    def save(self, path: Path = None):
+        path = path or STATE_PATH
+        state = {**self.current(), "state": self.calibration.to_dict()}
+        with open(path, "w") as f:
+            json.dump(state, f)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_token_map() -> dict:
+    """polymarket_markets.parquet에서 token_id → (market_id, is_yes) 매핑 생성"""
+    markets_df = pd.read_parquet(DATA_DIR / "polymarket_markets.parquet")
+    token_map = {}
+    for row in markets_df.itertuples(index=False):
+        ids = row.clob_token_ids
+        if ids is None or (isinstance(ids, float) and pd.isna(ids)):
+            continue
+        ids = json.loads(ids) if isinstance(ids, str) else list(ids)
+        for i, token_id in enumerate(ids[:2]):
+            token_map[str(token_id)] = (str(row.id), i == 0)  # 첫 번째 = Yes
+    return token_map
+
+
+async def consume(consumer: PriceFeedConsumer, url: str = WS_URL, save_every: float = 60.0, max_messages: int = None):
+    """websocket 연결/구독/재연결 루프.
+
+    Args:
+        url: 피드 주소 (로컬 대체 서버 가능)
+        save_every: 상태 JSON 저장 주기 (초)
+        max_messages: 이만큼 받으면 종료 (테스트용, None이면 무한)
+    """
+    import websockets
+
+    yes_tokens = [t for t, (_, is_yes) in consumer.token_map.items() if is_yes]
+    backoff = 1
+    last_save = time.time()
+
+    while True:
+        try:
+            async with websockets.connect(url, ping_interval=None) as ws:
+                await ws.send(json.dumps({
+                    "assets_ids": yes_tokens,
+                    "type": "market",
+                    "custom_feature_enabled": True,  # market_resolved 이벤트 수신
+                }))
+                print(f"  구독: {len(yes_tokens)} 토큰 ({url})", flush=True)
+                backoff = 1
+
+                keepalive = asyncio.create_task(_keepalive(ws))
+                try:
+                    async for raw in ws:
+                        consumer.on_message(raw)
+                        if time.time() - last_save >= save_every:
+                            consumer.save()
+                            last_save = time.time()
+                        if max_messages and consumer.messages >= max_messages:
+                            return
+                finally:
+                    keepalive.cancel()
+        except (OSError, websockets.WebSocketException) as e:
+            print(f"  연결 끊김: {e} — {backoff}초 후 재연결", flush=True)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+
+async def _keepalive(ws, interval: float = 10.0):
+    """서버가 요구하는 PING 텍스트 메시지"""
+    while True:
+        await asyncio.sleep(interval)
+        await ws.send("PING")
+
+
+def main(url: str = WS_URL):
+    print("=== Polymarket 실시간 가격 피드 ===", flush=True)
+    print(f"시간: {datetime.now().isoformat()}\n", flush=True)
+
+    markets_path = DATA_DIR / "polymarket_markets.parquet"
+    if not markets_path.exists():
+        print("ERROR: polymarket_markets.parquet이 없습니다. 먼저 `python -m collectors.polymarket`을 실행하세요.", flush=True)
+        return
+
+    calibration = None
+    if STATE_PATH.exists():
+        with open(STATE_PATH) as f:
+            calibration = RunningCalibration.from_dict(json.load(f)["state"])
+        print(f"  기존 calibration 상태 로드: {STATE_PATH}", flush=True)
+
+    consumer = PriceFeedConsumer(load_token_map(), calibration)
+    try:
+        asyncio.run(consume(consumer, url))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        consumer.save()
+        print(f"\n  저장: {STATE_PATH} (해결 {len(consumer.resolved)} 마켓)", flush=True)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else WS_URL)
@@ -0,0 +1,368 @@
+"""
+Polymarket CLOB 거래 내역 전체 수집 (wash trading 분석용)
+
+1. 대상 토큰 선정 (polymarket_markets.parquet의 clob_token_ids)
+2. 토큰별 /trades 커서 페이지네이션으로 전체 거래 히스토리 수집
+3. 페이지 단위로 market 파티션 parquet에 스트리밍 저장
+4. 토큰별 커서를 상태 파일에 기록 → 중단 후 재실행 시 이어서 수집
+5. 한 바퀴(마지막 페이지까지)를 다 돌면 본 가장 늦은 match_time을 high-water mark로 남기고,
+   다음 실행은 그 시각 이후(after) 거래만 첫 페이지부터 다시 받는다 (진행중 마켓의 새 거래)
+
+저장 구조:
+    data/polymarket_trades/market_id=<market_id>/<token_id>-<page>.parquet
+    data/polymarket_trades_state.json
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+DATA_DIR.mkdir(exist_ok=True)
+
+CLOB_API = "https://clob.polymarket.com"
+
+TRADES_DIR = DATA_DIR / "polymarket_trades"
+STATE_PATH = DATA_DIR / "polymarket_trades_state.json"
+
+# CLOB 커서: 첫 페이지 / 마지막 페이지 표식 (base64 "0" / "-1")
+START_CURSOR = "MA=="
+END_CURSOR = "LTE="
+
+# 페이지 파일마다 스키마가 같아야 디렉토리 단위로 읽을 수 있음 (전부 null인 컬럼 방지)
+TRADE_SCHEMA = pa.schema([
+    ("trade_id", pa.string()),
+    ("market", pa.string()),
+    ("asset_id", pa.string()),
+    ("side", pa.string()),
+    ("price", pa.float64()),
+    ("size", pa.float64()),
+    ("fee_rate_bps", pa.float64()),
+    ("status", pa.string()),
+    ("match_time", pa.int64()),
+    ("outcome", pa.string()),
+    ("taker", pa.string()),
+    ("maker", pa.string()),
+    ("maker_order_id", pa.string()),
+    ("maker_asset_id", pa.string()),
+    ("maker_side", pa.string()),
+    ("transaction_hash", pa.string()),
+    ("bucket_index", pa.int64()),
+])
+TRADE_COLUMNS = TRADE_SCHEMA.names
+
+
+def get_session() -> requests.Session:
+    """Retry 로직이 포함된 세션 생성"""
+    session = requests.Session()
+    retry = Retry(total=5, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+# ─── 재개 상태 관리 ───────────────────────────────────────────────
+
+class TradeIngestState:
+    """토큰별 커서/진행 상태 (JSON 파일, 스레드 안전)
+
+    {token_id: {"cursor": str, "pages": int, "rows": int, "high_water": int|None,
+                "pass_max": int|None, "error": str|None}}
+
+    cursor: 진행중인 바퀴의 다음 페이지 (바퀴가 끝나면 START_CURSOR)
+    high_water: 끝난 바퀴들에서 본 가장 늦은 match_time (다음 바퀴의 after 기준)
+    pass_max: 진행중인 바퀴에서 지금까지 본 가장 늦은 match_time
+    pages: 누적 페이지 수 (페이지 파일 이름, 바퀴가 바뀌어도 계속 증가)
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = path or STATE_PATH
+        self._lock = threading.Lock()
+        self.tokens = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                self.tokens = json.load(f)
+
+    def get(self, token_id: str) -> dict:
+        with self._lock:
+            return dict(self.tokens.get(token_id) or {
+                "cursor": START_CURSOR, "pages": 0, "rows": 0, "high_water": None, "pass_max": None, "error": None,
+            })
+
+    def update(self, token_id: str, **fields):
+        with self._lock:
+            entry = self.tokens.setdefault(token_id, {
+                "cursor": START_CURSOR, "pages": 0, "rows": 0, "high_water": None, "pass_max": None, "error": None,
+            })
+            entry.update(fields)
+            self._flush()
+
+    def _flush(self):
+        # 임시 파일에 쓴 뒤 교체 — 중간에 죽어도 상태 파일이 깨지지 않음
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.tokens, f)
+        os.replace(tmp, self.path)
+
+
+# ─── 페이지 수집 ─────────────────────────────────────────────────
+
+def fetch_trades_page(session: requests.Session, token_id: str, cursor: str, after: int = None) -> tuple:
+    """/trades 단일 페이지 조회.
+
+    Args:
+        after: 이 시각(unix 초) 이후 거래만 (None이면 전체 히스토리)
+
+    Returns:
+        (trades list, next_cursor). 마지막 페이지면 next_cursor == END_CURSOR.
+    """
+    params = {"asset_id": token_id, "next_cursor": cursor}
+    if after is not None:
+        params["after"] = after
+    resp = session.get(f"{CLOB_API}/trades", params=params, timeout=30)
+    resp.raise_for_status()
+    payload = resp.json()
+
+    # 페이지네이션 응답: {"data": [...], "next_cursor": "..."}; 구버전은 리스트만 반환
+    if isinstance(payload, list):
+        return payload, END_CURSOR
+    return payload.get("data") or [], payload.get("next_cursor") or END_CURSOR
+
+
+def flatten_trades(trades: list) -> pd.DataFrame:
+    """CLOB trade 객체를 maker 체결 단위 행으로 평탄화.
+
+    taker 주문 하나가 여러 maker 주문과 체결되므로, (taker, maker) 주소 쌍을
+    보존하기 위해 maker_orders 하나당 한 행을 만든다. maker_orders가 없으면
+    trade 자체를 한 행으로 기록 (maker = None).
+    """
+    rows = []
+    for t in trades:
+        base = {
+            "trade_id": t.get("id"),
+            "market": t.get("market"),
+            "asset_id": t.get("asset_id"),
+            "side": t.get("side"),
+            "fee_rate_bps": float(t.get("fee_rate_bps", 0) or 0),
+            "status": t.get("status"),
+            "match_time": int(t.get("match_time", 0) or 0),
+            "outcome": t.get("outcome"),
+            "taker": (t.get("maker_address") or "").lower() or None,
+            "transaction_hash": t.get("transaction_hash"),
+            "bucket_index": int(t.get("bucket_index", 0) or 0),
+        }
+        maker_orders = t.get("maker_orders") or []
+        if not maker_orders:
+            rows.append({
+                **base,
+                "price": float(t.get("price", 0) or 0),
+                "size": float(t.get("size", 0) or 0),
+                "maker": None,
+                "maker_order_id": None,
+                "maker_asset_id": None,
+                "maker_side": None,
+            })
+            continue
+        for mo in maker_orders:
+            rows.append({
+                **base,
+                "price": float(mo.get("price", t.get("price", 0)) or 0),
+                "size": float(mo.get("matched_amount", 0) or 0),
+                "maker": (mo.get("maker_address") or "").lower() or None,
+                "maker_order_id": mo.get("order_id"),
+                "maker_asset_id": mo.get("asset_id"),
+                "maker_side": mo.get("side"),
+            })
+
+    return pd.DataFrame(rows, columns=TRADE_COLUMNS)
+
+
+def saved_high_water(market_id: str, token_id: str):
+    """이미 저장된 페이지 파일의 최대 match_time (high-water mark가 없는 이전 상태 파일 이전용)"""
+    files = sorted((TRADES_DIR / f"market_id={market_id}").glob(f"{token_id}-*.parquet"))
+    if not files:
+        return None
+    times = pq.read_table(files, columns=["match_time"]).column("match_time").to_pandas()
+    return int(times.max()) if len(times) and pd.notna(times.max()) else None
+
+
+def ingest_token_trades(
+    session: requests.Session,
+    token_id: str,
+    market_id: str,
+    state: TradeIngestState,
+    max_pages: int = None,
+) -> int:
+    """단일 토큰의 거래를 커서로 순회하며 페이지별로 저장.
+
+    high-water mark가 있으면 그 시각 이후 거래만 받는다. 같은 초의 거래를 놓치지 않도록
+    1초 겹쳐 받으며, 겹친 행은 load_trades의 (trade_id, maker_order_id) 중복 제거로 빠진다.
+    마지막 페이지까지 받으면 바퀴를 닫고(high_water 전진, 커서 초기화) 다음 실행에서 다시 폴링한다.
+
+    페이지 파일은 누적 페이지 번호로 이름을 정하므로, 상태 갱신 전에 중단되어
+    같은 페이지를 다시 받아도 덮어쓰기만 된다 (중복 없음).
+
+    Returns:
+        이번 실행에서 저장한 행 수
+    """
+    entry = state.get(token_id)
+    if entry.get("done") and entry.get("high_water") is None:
+        # 이전 형식(done 플래그) 상태 → 저장된 파일에서 high-water mark 복원
+        entry.update(cursor=START_CURSOR, high_water=saved_high_water(market_id, token_id), pass_max=None)
+        state.update(token_id, done=False, **{k: entry[k] for k in ["cursor", "high_water", "pass_max"]})
+
+    cursor = entry["cursor"]
+    pages = entry["pages"]
+    rows = entry["rows"]
+    high_water = entry.get("high_water")
+    pass_max = entry.get("pass_max")
+    after = None if high_water is None else high_water - 1
+    written = 0
+    trades = None
+
+    out_dir = TRADES_DIR / f"market_id={market_id}"
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    while cursor != END_CURSOR:
+        try:
+            trades, next_cursor = fetch_trades_page(session, token_id, cursor, after=after)
+        except requests.RequestException as e:
+            state.update(token_id, error=str(e)[:200])
+            print(f"    에러 (token={token_id[:12]}..., page={pages}): {e}", flush=True)
+            return written
+
+        if trades:
+            page_df = flatten_trades(trades)
+            table = pa.Table.from_pandas(page_df, schema=TRADE_SCHEMA, preserve_index=False)
+            pq.write_table(table, out_dir / f"{token_id}-{pages:05d}.parquet")
+            written += len(page_df)
+            rows += len(page_df)
+            page_max = int(page_df["match_time"].max())
+            pass_max = page_max if pass_max is None else max(pass_max, page_max)
+
+        pages += 1
+        cursor = next_cursor
+        state.update(token_id, cursor=cursor, pages=pages, rows=rows, pass_max=pass_max, error=None)
+
+        if not trades or (max_pages and pages >= max_pages):
+            break
+        time.sleep(0.1)
+
+    if cursor == END_CURSOR or not trades:
+        # 바퀴 종료: 다음 실행은 본 가장 늦은 거래 이후부터 첫 페이지로 다시 폴링
+        if pass_max is not None:
+            high_water = pass_max if high_water is None else max(high_water, pass_max)
+        state.update(token_id, cursor=START_CURSOR, high_water=high_water, pass_max=None)
+    return written
+
+
+def collect_all_trades(targets_df: pd.DataFrame, max_workers: int = 8, max_pages: int = None) -> int:
+    """대상 토큰 전체의 거래 히스토리 병렬 수집.
+
+    Args:
+        targets_df: columns [market_id, token_id]
+        max_workers: 동시 수집 토큰 수 (스레드 풀 크기)
+        max_pages: 토큰당 최대 페이지 수 (None이면 끝까지)
+
+    Returns:
+        저장한 총 행 수
+    """
+    session = get_session()
+    state = TradeIngestState()
+
+    # 진행중 마켓의 토큰은 매 실행 high-water mark 이후 거래를 다시 폴링
+    pending = [(row.market_id, row.token_id) for row in targets_df.itertuples(index=False)]
+    total = len(pending)
+    resuming = sum(state.get(token_id)["cursor"] != START_CURSOR for _, token_id in pending)
+    print(f"  대상 토큰: {total} (이어받기 {resuming}, {max_workers} threads)", flush=True)
+
+    saved = 0
+    done = 0
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(ingest_token_trades, session, token_id, market_id, state, max_pages): token_id
+            for market_id, token_id in pending
+        }
+        for future in as_completed(futures):
+            token_id = futures[future]
+            try:
+                saved += future.result()
+            except Exception as e:
+                # 예상 밖 응답(JSON 오류, 누락 필드 등)은 이 토큰만 건너뜀 — 저장된 페이지까지의 상태는 유지
+                failed += 1
+                state.update(token_id, error=f"{type(e).__name__}: {e}"[:200])
+                print(f"    에러 (token={token_id[:12]}...): {type(e).__name__}: {e}", flush=True)
+            done += 1
+            if done % 100 == 0 or done == total:
+                print(f"    진행: {done}/{total} 토큰, {saved:,} 행 저장", flush=True)
+
+    if failed:
+        print(f"  실패 토큰: {failed} (다음 실행에서 이어받기)", flush=True)
+    return saved
+
+
+def build_targets(markets_df: pd.DataFrame) -> pd.DataFrame:
+    """마켓 DataFrame에서 (market_id, token_id) 목록 생성 (Yes/No 토큰 모두)"""
+    records = []
+    for row in markets_df.itertuples(index=False):
+        token_ids = row.clob_token_ids
+        if isinstance(token_ids, str):
+            try:
+                token_ids = json.loads(token_ids)
+            except ValueError:
+                continue
+        if token_ids is None:
+            continue
+        for token_id in token_ids:
+            records.append({"market_id": str(row.id), "token_id": str(token_id)})
+    return pd.DataFrame(records, columns=["market_id", "token_id"]).drop_duplicates("token_id")
+
+
+def load_trades(columns: list = None) -> pd.DataFrame:
+    """파티션 저장된 거래 내역 전체 로드 (trade_id + maker_order_id 기준 중복 제거)"""
+    if not TRADES_DIR.exists():
+        return pd.DataFrame(columns=TRADE_COLUMNS + ["market_id"])
+
+    df = pd.read_parquet(TRADES_DIR, columns=columns)
+    if "trade_id" in df.columns and "maker_order_id" in df.columns:
+        df = df.drop_duplicates(["trade_id", "maker_order_id"])
+    return df.reset_index(drop=True)
+
+
+def main():
+    print("=== Polymarket 거래 내역 수집 시작 ===", flush=True)
+    print(f"시간: {datetime.now().isoformat()}\n", flush=True)
+
+    markets_path = DATA_DIR / "polymarket_markets.parquet"
+    if not markets_path.exists():
+        print("ERROR: polymarket_markets.parquet이 없습니다. 먼저 `python -m collectors.polymarket`을 실행하세요.", flush=True)
+        return
+
+    markets_df = pd.read_parquet(markets_path)
+    if "clob_token_ids" not in markets_df.columns:
+        print("ERROR: clob_token_ids 컬럼이 없습니다. `python -m collectors.polymarket`을 다시 실행하세요.", flush=True)
+        return
+
+    targets_df = build_targets(markets_df)
+    print(f"마켓 {len(markets_df)}건 → 토큰 {len(targets_df)}건\n", flush=True)
+
+    saved = collect_all_trades(targets_df)
+    print(f"\n  저장: {TRADES_DIR} ({saved:,} rows this run)", flush=True)
+
+    print("\n=== 수집 완료 ===", flush=True)
+
+
+if __name__ == "__main__":
+    main()
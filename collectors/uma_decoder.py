@@ -4,206 +4,253 @@ UMA raw hex 이벤트 디코딩
 기존 uma_voting_events.parquet의 raw topics/data 필드를 디코딩하여:
 - uma_decoded_requests.parquet: PriceRequest + PriceResolved 매칭
 - uma_decoded_votes.parquet: VoteRevealed 디코딩
+- uma_decoded_commits.parquet / uma_decoded_encrypted_votes.parquet: VoteCommitted / EncryptedVote 디코딩
+- uma_vote_lifecycle.parquet: (voter, round_id, identifier, request_time)별 commit ↔ reveal 짝
+- uma_round_power.parquet: 라운드별 공개 투표 토큰 가중치의 집중도 (실제 투표권 집중)
+- uma_ancillary.parquet: 고유 ancillaryData payload별 파싱 결과 (요청/투표는 ancillary_key로 참조)
+
+증분 실행: uma_decode_state.json의 마지막 블록 이후 raw 이벤트만 디코딩해 이어 붙이고,
+집계는 새 이벤트가 닿은 (round_id, identifier, request_time) 키만 다시 계산한다.
+`--full`이면 처음부터 다시 디코딩,
+`--workers N`이면 블록 구간 파티션을 N개 프로세스로 나눠 디코딩.
+
+실행 (저장소 루트): python -m collectors.uma_decoder [--full] [--workers N]
 """
 
-import json
-import struct
+import sys
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
-DATA_DIR = Path(__file__).parent.parent / "data"
-
-
-def hex_to_int(hex_str: str, signed: bool = False) -> int:
-    """32바이트 hex를 정수로 변환"""
-    hex_str = hex_str.replace("0x", "").strip()
-    if len(hex_str) > 64:
-        hex_str = hex_str[:64]
-    value = int(hex_str, 16)
-    if signed and value >= 2**255:
-        value -= 2**256
-    return value
-
-
-def hex_to_ascii(hex_str: str) -> str:
-    """hex를 ASCII 문자열로 변환 (null 바이트 제거)"""
-    hex_str = hex_str.replace("0x", "").strip()
-    try:
-        raw = bytes.fromhex(hex_str)
-        return raw.rstrip(b"\x00").decode("ascii", errors="replace").strip()
-    except Exception:
-        return hex_str
+from collectors.ancillary import ancillary_keys, build_ancillary_table
+from collectors.concentration_metrics import grouped_metrics
+from collectors.event_pipeline import (
+    DecodeWatermark, append_rows, decode_all, decode_partitioned, key_mask, read_raw_table, replace_keys,
+)
+from collectors.event_registry import (
+    ENCRYPTED_VOTE, PRICE_REQUEST_ADDED, PRICE_RESOLVED, VOTE_COMMITTED, VOTE_REVEALED,
+)
 
+DATA_DIR = Path(__file__).parent.parent / "data"
 
-def hex_to_address(hex_str: str) -> str:
-    """32바이트 패딩된 hex를 이더리움 주소로 변환"""
-    hex_str = hex_str.replace("0x", "").strip()
-    # 마지막 40자가 주소
-    return "0x" + hex_str[-40:]
+UMA_EVENTS = [PRICE_REQUEST_ADDED, PRICE_RESOLVED, VOTE_COMMITTED, ENCRYPTED_VOTE, VOTE_REVEALED]
+
+STATE_PATH = DATA_DIR / "uma_decode_state.json"
+REQUEST_KEY = ["round_id", "identifier", "request_time"]
+
+# 투표 하나 = 유권자 × 가격 요청 (같은 identifier/time에 ancillaryData가 다른 요청도 구분)
+LIFECYCLE_KEY = ["voter", "round_id", "identifier", "request_time", "ancillary_key"]
+LIFECYCLE_ORDER = ["round_id", "identifier", "request_time", "voter"]
+
+# decode_events 키 → 이벤트 단위로 이어 붙여 저장하는 테이블
+BASE_TABLES = {
+    "requests": "uma_decoded_price_requests",
+    "resolved": "uma_decoded_resolutions",
+    "votes": "uma_decoded_votes",
+    "commits": "uma_decoded_commits",
+    "encrypted": "uma_decoded_encrypted_votes",
+    "ancillary": "uma_ancillary",
+}
+
+# 집계 테이블 → replace_keys 정렬 기준 (전체 재계산과 같은 순서)
+AGGREGATE_TABLES = {
+    "uma_decoded_requests": "block_number",
+    "uma_vote_lifecycle": LIFECYCLE_ORDER,
+    "uma_round_power": "round_id",
+}
+
+# 각 base 테이블에서 request_time 역할을 하는 컬럼 (affected_keys / 증분 부분집합용)
+REQUEST_TIME_COLUMNS = {
+    "requests": "request_time",
+    "resolved": "resolve_time",
+    "votes": "timestamp",
+    "commits": "request_time",
+    "encrypted": "request_time",
+}
+
+
+def _time_or_block_time(decoded: pd.DataFrame) -> np.ndarray:
+    """ABI time 필드 (data가 비어 있어 0이면 블록 타임스탬프)"""
+    return np.where(decoded["time"] > 0, decoded["time"], decoded["block_time"])
+
+
+def resolution_labels(resolved_price: np.ndarray) -> np.ndarray:
+    """해결 가격 → 표시용 라벨 (Yes / No / Indeterminate / Unresolvable / 숫자)"""
+    resolved_price = np.asarray(resolved_price, dtype=float)
+    numeric = np.array([f"{p:.6f}" for p in resolved_price.tolist()], dtype=object)
+    return np.select(
+        [
+            np.abs(resolved_price - 1.0) < 0.001,
+            np.abs(resolved_price) < 0.001,
+            np.abs(resolved_price - 0.5) < 0.001,
+            resolved_price < -1e50,
+        ],
+        ["Yes", "No", "Indeterminate", "Unresolvable"],
+        default=numeric,
+    ).astype(object)
+
+
+def _requests_frame(decoded: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        "round_id": decoded["round_id"],
+        "identifier": decoded["identifier"],
+        "request_time": _time_or_block_time(decoded),
+        "block_number": decoded["block_number"],
+        "tx_hash": decoded["tx_hash"],
+    })
+
+
+def _resolved_frame(decoded: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        "round_id": decoded["round_id"],
+        "identifier": decoded["identifier"],
+        "resolve_time": _time_or_block_time(decoded),
+        "resolved_price": decoded["price"],
+        "resolution_label": resolution_labels(decoded["price"]),
+        "ancillary_key": ancillary_keys(decoded["ancillary_data"]),
+    })
+
+
+def _votes_frame(decoded: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        "round_id": decoded["round_id"],
+        "identifier": decoded["identifier"],
+        "voter": decoded["voter"],
+        "voted_price": decoded["price"],
+        "num_tokens": decoded["num_tokens"],
+        "timestamp": _time_or_block_time(decoded),
+        "ancillary_key": ancillary_keys(decoded["ancillary_data"]),
+        "reveal_time": decoded["block_time"],
+        "tx_hash": decoded["tx_hash"],
+    })
+
+
+def _commits_frame(decoded: pd.DataFrame) -> pd.DataFrame:
+    """VoteCommitted / EncryptedVote 공통 컬럼 (암호화된 투표 내용은 저장하지 않음)"""
+    return pd.DataFrame({
+        "voter": decoded["voter"],
+        "round_id": decoded["round_id"],
+        "identifier": decoded["identifier"],
+        "request_time": _time_or_block_time(decoded),
+        "ancillary_key": ancillary_keys(decoded["ancillary_data"]),
+        "commit_time": decoded["block_time"],
+        "block_number": decoded["block_number"],
+        "tx_hash": decoded["tx_hash"],
+    })
 
 
-def decode_data_fields(data_hex: str) -> list:
-    """data 필드를 32바이트 청크로 분할"""
-    data = data_hex.replace("0x", "")
-    chunks = []
-    for i in range(0, len(data), 64):
-        chunk = data[i:i+64]
-        if chunk:
-            chunks.append(chunk)
-    return chunks
+def decode_price_requests(events_df: pd.DataFrame) -> pd.DataFrame:
+    """PriceRequestAdded 이벤트 디코딩 (시그니처는 event_registry 참고)"""
+    return _requests_frame(PRICE_REQUEST_ADDED.decode(PRICE_REQUEST_ADDED.select(events_df)))
 
 
-def decode_price_requests(events_df: pd.DataFrame) -> pd.DataFrame:
-    """PriceRequestAdded 이벤트 디코딩
+def decode_price_resolved(events_df: pd.DataFrame) -> pd.DataFrame:
+    """PriceResolved 이벤트 디코딩
 
-    Event: PriceRequestAdded(uint256 indexed roundId, bytes32 indexed identifier, uint256 time)
-    topics[1] = roundId
-    topics[2] = identifier (bytes32, ASCII 인코딩)
-    data[0:32] = timestamp
+    UMA 가격은 18 decimals (1e18 = 1.0)로 레지스트리에서 float 변환된다.
     """
-    requests = events_df[events_df["event_name"] == "PriceRequestAdded"].copy()
+    return _resolved_frame(PRICE_RESOLVED.decode(PRICE_RESOLVED.select(events_df)))
 
-    records = []
-    for _, row in requests.iterrows():
-        topics = json.loads(row["topics"])
-        data_chunks = decode_data_fields(row["data"])
 
-        round_id = hex_to_int(topics[1])
-        identifier = hex_to_ascii(topics[2])
-        request_time = hex_to_int(data_chunks[0]) if data_chunks else row["timestamp"]
+def decode_vote_revealed(events_df: pd.DataFrame) -> pd.DataFrame:
+    """VoteRevealed 이벤트 디코딩 (price, numTokens 모두 18 decimals)"""
+    return _votes_frame(VOTE_REVEALED.decode(VOTE_REVEALED.select(events_df)))
 
-        records.append({
-            "round_id": round_id,
-            "identifier": identifier,
-            "request_time": request_time,
-            "block_number": row["block_number"],
-            "tx_hash": row["tx_hash"],
-        })
 
-    return pd.DataFrame(records)
+def decode_vote_committed(events_df: pd.DataFrame) -> pd.DataFrame:
+    """VoteCommitted 이벤트 디코딩 (commit 시점 = 블록 타임스탬프)"""
+    return _commits_frame(VOTE_COMMITTED.decode(VOTE_COMMITTED.select(events_df)))
 
 
-def decode_price_resolved(events_df: pd.DataFrame) -> pd.DataFrame:
-    """PriceResolved 이벤트 디코딩
+def decode_encrypted_vote(events_df: pd.DataFrame) -> pd.DataFrame:
+    """EncryptedVote 이벤트 디코딩 (commit과 같은 tx에서 발생, 암호문은 버림)"""
+    return _commits_frame(ENCRYPTED_VOTE.decode(ENCRYPTED_VOTE.select(events_df)))
 
-    Event: PriceResolved(uint256 indexed roundId, bytes32 indexed identifier, uint256 time, int256 price, bytes ancillaryData)
-    topics[1] = roundId
-    topics[2] = identifier
-    data[0:32] = timestamp
-    data[32:64] = resolvedPrice (int256)
-    data[64:96] = offset to ancillaryData
-    data[96:128] = length of ancillaryData
-    data[128:] = ancillaryData bytes
-    """
-    resolved = events_df[events_df["event_name"] == "PriceResolved"].copy()
-
-    records = []
-    for _, row in resolved.iterrows():
-        topics = json.loads(row["topics"])
-        data_chunks = decode_data_fields(row["data"])
-
-        round_id = hex_to_int(topics[1])
-        identifier = hex_to_ascii(topics[2])
-        resolve_time = hex_to_int(data_chunks[0]) if len(data_chunks) > 0 else row["timestamp"]
-        resolved_price_raw = hex_to_int(data_chunks[1], signed=True) if len(data_chunks) > 1 else 0
-
-        # UMA 가격은 18 decimals (1e18 = 1.0)
-        resolved_price = resolved_price_raw / 1e18
-
-        # ancillaryData 추출 (있으면)
-        ancillary_data = ""
-        if len(data_chunks) > 3:
-            anc_len = hex_to_int(data_chunks[3])
-            if anc_len > 0 and len(data_chunks) > 4:
-                anc_hex = "".join(data_chunks[4:])
-                try:
-                    ancillary_data = bytes.fromhex(anc_hex[:anc_len*2]).decode("utf-8", errors="replace")
-                except Exception:
-                    ancillary_data = anc_hex[:200]
-
-        # Classify the resolution for display
-        if abs(resolved_price - 1.0) < 0.001:
-            resolution_label = "Yes"
-        elif abs(resolved_price) < 0.001:
-            resolution_label = "No"
-        elif abs(resolved_price - 0.5) < 0.001:
-            resolution_label = "Indeterminate"
-        elif resolved_price < -1e50:
-            resolution_label = "Unresolvable"
-        else:
-            resolution_label = f"{resolved_price:.6f}"
-
-        records.append({
-            "round_id": round_id,
-            "identifier": identifier,
-            "resolve_time": resolve_time,
-            "resolved_price": resolved_price,
-            "resolution_label": resolution_label,
-            "ancillary_data": ancillary_data,
-        })
-
-    return pd.DataFrame(records)
 
+def decode_events(events_df: pd.DataFrame) -> dict:
+    """세 이벤트 타입을 topic0 단일 패스로 디코딩
 
-def decode_vote_revealed(events_df: pd.DataFrame) -> pd.DataFrame:
-    """VoteRevealed 이벤트 디코딩
-
-    Event: VoteRevealed(address indexed voter, uint256 indexed roundId, bytes32 indexed identifier, uint256 time, int256 price, bytes ancillaryData, uint256 numTokens)
-    topics[1] = voter (address, padded)
-    topics[2] = roundId
-    topics[3] = identifier
-    data[0:32] = timestamp
-    data[32:64] = price (int256, 18 decimals)
-    data[64:96] = offset to ancillaryData
-    data[96:128] = numTokens
-    data[128:160] = ancillaryData length
-    data[160:] = ancillaryData bytes
+    Returns:
+        {"requests", "resolved", "votes"} → decode_price_requests / decode_price_resolved /
+        decode_vote_revealed와 같은 형태의 DataFrame, "ancillary" → 고유 payload 테이블
+    """
+    return event_tables(decode_all(events_df, UMA_EVENTS))
+
+
+def event_tables(decoded: dict) -> dict:
+    """decode_all / decode_partitioned 결과 → decode_events 형태의 테이블 dict"""
+    return {
+        "requests": _requests_frame(decoded[PRICE_REQUEST_ADDED.key]),
+        "resolved": _resolved_frame(decoded[PRICE_RESOLVED.key]),
+        "votes": _votes_frame(decoded[VOTE_REVEALED.key]),
+        "commits": _commits_frame(decoded[VOTE_COMMITTED.key]),
+        "encrypted": _commits_frame(decoded[ENCRYPTED_VOTE.key]),
+        "ancillary": build_ancillary_table(pd.concat([
+            decoded[PRICE_RESOLVED.key]["ancillary_data"],
+            decoded[VOTE_COMMITTED.key]["ancillary_data"],
+            decoded[VOTE_REVEALED.key]["ancillary_data"],
+        ], ignore_index=True)),
+    }
+
+
+VOTE_KEY = ["round_id", "identifier", "timestamp"]
+VOTE_STAT_COLUMNS = ["num_voters", "total_tokens", "votes_count"]
+CONSENSUS_COLUMNS = ["consensus_rate", "num_price_choices", "runner_up_share"]
+
+
+def vote_consensus(votes_df: pd.DataFrame, entropy: bool = False) -> pd.DataFrame:
+    """요청별 토큰 가중 합의 지표 — (round_id, identifier, timestamp, voted_price) 단일 grouped pass
+
+    가격 선택지별 토큰 합을 한 번 구하고, 요청 안에서 토큰 내림차순으로 정렬해
+    1위/2위 선택지를 순위로 골라낸다.
+
+    Returns:
+        round_id, identifier, timestamp,
+        consensus_rate (다수파 토큰 비율), num_price_choices (서로 다른 가격 수),
+        runner_up_share (2위 토큰 비율, 선택지가 하나면 0),
+        [vote_entropy (가격 선택지 토큰 분포의 섀넌 엔트로피, bits)]
+        토큰 합이 0인 요청의 비율은 0. 비율/엔트로피는 소수 4자리 반올림.
     """
-    reveals = events_df[events_df["event_name"] == "VoteRevealed"].copy()
-
-    records = []
-    for _, row in reveals.iterrows():
-        topics = json.loads(row["topics"])
-        data_chunks = decode_data_fields(row["data"])
-
-        voter = hex_to_address(topics[1])
-        round_id = hex_to_int(topics[2])
-        identifier = hex_to_ascii(topics[3])
-
-        timestamp = hex_to_int(data_chunks[0]) if len(data_chunks) > 0 else row["timestamp"]
-        voted_price_raw = hex_to_int(data_chunks[1], signed=True) if len(data_chunks) > 1 else 0
-        voted_price = voted_price_raw / 1e18
-
-        num_tokens_raw = hex_to_int(data_chunks[3]) if len(data_chunks) > 3 else 0
-        num_tokens = num_tokens_raw / 1e18
-
-        # ancillaryData (if present)
-        ancillary_data = ""
-        if len(data_chunks) > 4:
-            anc_len = hex_to_int(data_chunks[4])
-            if anc_len > 0 and len(data_chunks) > 5:
-                anc_hex = "".join(data_chunks[5:])
-                try:
-                    ancillary_data = bytes.fromhex(anc_hex[:anc_len*2]).decode("utf-8", errors="replace")
-                except Exception:
-                    ancillary_data = ""
-
-        records.append({
-            "round_id": round_id,
-            "identifier": identifier,
-            "voter": voter,
-            "voted_price": voted_price,
-            "num_tokens": num_tokens,
-            "timestamp": timestamp,
-            "ancillary_data": ancillary_data,
-            "tx_hash": row["tx_hash"],
-        })
-
-    return pd.DataFrame(records)
-
-
-def build_decoded_requests(requests_df: pd.DataFrame, resolved_df: pd.DataFrame, votes_df: pd.DataFrame) -> pd.DataFrame:
+    price_tokens = votes_df.groupby(VOTE_KEY + ["voted_price"], sort=False)["num_tokens"].sum().reset_index()
+    price_tokens = price_tokens.sort_values(
+        VOTE_KEY + ["num_tokens"], ascending=[True, True, True, False], kind="stable",
+    ).reset_index(drop=True)
+
+    tokens = price_tokens["num_tokens"].to_numpy(dtype=float)
+    rank = price_tokens.groupby(VOTE_KEY, sort=False).cumcount().to_numpy()
+    group = price_tokens.groupby(VOTE_KEY, sort=False).ngroup().to_numpy()
+    n_groups = group.max() + 1 if len(group) else 0
+
+    total = np.bincount(group, weights=tokens, minlength=n_groups)
+    top = np.bincount(group, weights=np.where(rank == 0, tokens, 0.0), minlength=n_groups)
+    runner_up = np.bincount(group, weights=np.where(rank == 1, tokens, 0.0), minlength=n_groups)
+    has_tokens = total > 0
+
+    first = price_tokens[rank == 0]
+    result = pd.DataFrame({
+        "round_id": first["round_id"].to_numpy(),
+        "identifier": first["identifier"].to_numpy(),
+        "timestamp": first["timestamp"].to_numpy(),
+        "consensus_rate": np.round(np.divide(top, total, out=np.zeros(n_groups), where=has_tokens), 4),
+        "num_price_choices": np.bincount(group, minlength=n_groups),
+        "runner_up_share": np.round(np.divide(runner_up, total, out=np.zeros(n_groups), where=has_tokens), 4),
+    })
+
+    if entropy:
+        share = np.divide(tokens, total[group], out=np.zeros_like(tokens), where=total[group] > 0)
+        terms = -share * np.log2(share, where=share > 0, out=np.zeros_like(share))
+        result["vote_entropy"] = np.round(np.bincount(group, weights=terms, minlength=n_groups), 4)
+
+    return result
+
+
+def build_decoded_requests(
+    requests_df: pd.DataFrame,
+    resolved_df: pd.DataFrame,
+    votes_df: pd.DataFrame,
+    entropy: bool = False,
+) -> pd.DataFrame:
     """Request-Resolution 매칭 및 투표 통계 집계
 
     Unique key = (round_id, identifier, request_time/resolve_time).
@@ -211,6 +258,9 @@ def build_decoded_requests(requests_df: pd.DataFrame, resolved_df: pd.DataFrame,
     where resolved has a 'request_time' carried from the timestamp in the data field.
     Actually, PriceResolved data[0] = the same timestamp as PriceRequestAdded data[0].
     So we can join on (round_id, identifier, time).
+
+    entropy=True이면 투표 분포 엔트로피(vote_entropy)도 추가 (vote_consensus 참고).
+    공개된 투표가 없는 요청의 투표 통계/합의 지표는 0.
     """
 
     # Rename resolve_time column to request_time for join (they share the same 'time' field)
@@ -218,7 +268,7 @@ def build_decoded_requests(requests_df: pd.DataFrame, resolved_df: pd.DataFrame,
 
     # 매칭: (round_id, identifier, request_time) 기준
     merged = requests_df.merge(
-        resolved_for_join[["round_id", "identifier", "request_time", "resolved_price", "resolution_label", "ancillary_data"]],
+        resolved_for_join[["round_id", "identifier", "request_time", "resolved_price", "resolution_label", "ancillary_key"]],
         on=["round_id", "identifier", "request_time"],
         how="left",
         suffixes=("", "_resolved")
@@ -233,67 +283,220 @@ def build_decoded_requests(requests_df: pd.DataFrame, resolved_df: pd.DataFrame,
             votes_count=("voter", "count"),
         ).reset_index().rename(columns={"timestamp": "request_time"})
 
-        # 다수파 비율 (합의 강도) 계산
-        consensus_records = []
-        for (rid, ident, ts), group in votes_df.groupby(["round_id", "identifier", "timestamp"]):
-            # 토큰 가중 다수파 비율
-            price_tokens = group.groupby("voted_price")["num_tokens"].sum()
-            if price_tokens.sum() > 0:
-                majority_share = price_tokens.max() / price_tokens.sum()
-            else:
-                majority_share = 0
-            consensus_records.append({
-                "round_id": rid,
-                "identifier": ident,
-                "request_time": ts,
-                "consensus_rate": round(majority_share, 4),
-            })
-        consensus_df = pd.DataFrame(consensus_records)
+        # 다수파 비율 (합의 강도) 등 토큰 가중 합의 지표
+        consensus_df = vote_consensus(votes_df, entropy=entropy).rename(columns={"timestamp": "request_time"})
 
         merged = merged.merge(vote_stats, on=["round_id", "identifier", "request_time"], how="left")
         merged = merged.merge(consensus_df, on=["round_id", "identifier", "request_time"], how="left")
     else:
-        merged["num_voters"] = 0
-        merged["total_tokens"] = 0
-        merged["votes_count"] = 0
-        merged["consensus_rate"] = 0
-
+        for col in VOTE_STAT_COLUMNS + CONSENSUS_COLUMNS:
+            merged[col] = np.nan
+        if entropy:
+            merged["vote_entropy"] = np.nan
+
+    # 투표가 없는 요청은 0 (투표 유무와 관계없이 같은 값이라 증분 실행에서 일부 키만 다시 계산해도 같음)
+    stat_columns = VOTE_STAT_COLUMNS + CONSENSUS_COLUMNS + (["vote_entropy"] if entropy else [])
+    merged[stat_columns] = merged[stat_columns].fillna(0)
+    for col in ["num_voters", "votes_count", "num_price_choices"]:
+        merged[col] = merged[col].astype(int)
     return merged
 
 
+# ─── commit / reveal 짝 ─────────────────────────────────────────
+
+def build_vote_lifecycle(commits_df: pd.DataFrame, encrypted_df: pd.DataFrame, votes_df: pd.DataFrame) -> pd.DataFrame:
+    """commit ↔ reveal 해시 조인으로 유권자별 투표 생애주기 테이블 생성
+
+    reveal 전에 다시 commit하면 마지막 commit만 유효하므로 commit은 키별로 마지막 것을 쓴다.
+
+    Returns:
+        LIFECYCLE_KEY, num_commits, commit_time (마지막 commit), encrypted (EncryptedVote 동반 여부),
+        committed, revealed, non_reveal (commit 후 reveal 없음), reveal_time,
+        reveal_latency (reveal_time - commit_time, 초), voted_price, num_tokens.
+        commit 없이 reveal만 있는 행(수집 범위 밖에서 commit)은 committed=False.
+    """
+    commits = commits_df.groupby(LIFECYCLE_KEY, sort=False, dropna=False).agg(
+        num_commits=("commit_time", "size"),
+        commit_time=("commit_time", "max"),
+    ).reset_index()
+    commits["encrypted"] = key_mask(commits, encrypted_df[LIFECYCLE_KEY].drop_duplicates())
+
+    reveals = votes_df.rename(columns={"timestamp": "request_time"})
+    reveals = reveals.drop_duplicates(LIFECYCLE_KEY, keep="last")[LIFECYCLE_KEY + ["reveal_time", "voted_price", "num_tokens"]]
+
+    lifecycle = commits.merge(reveals, on=LIFECYCLE_KEY, how="outer")
+    lifecycle["committed"] = lifecycle["num_commits"].notna()
+    lifecycle["revealed"] = lifecycle["reveal_time"].notna()
+    lifecycle["non_reveal"] = lifecycle["committed"] & ~lifecycle["revealed"]
+    lifecycle["num_commits"] = lifecycle["num_commits"].fillna(0).astype(np.int64)
+    lifecycle["encrypted"] = lifecycle["encrypted"].fillna(False).astype(bool)
+    lifecycle["reveal_latency"] = lifecycle["reveal_time"] - lifecycle["commit_time"]
+
+    columns = [
+        *LIFECYCLE_KEY, "num_commits", "commit_time", "encrypted", "committed", "revealed", "non_reveal",
+        "reveal_time", "reveal_latency", "voted_price", "num_tokens",
+    ]
+    return lifecycle[columns].sort_values(LIFECYCLE_ORDER, kind="stable").reset_index(drop=True)
+
+
+def reveal_rates(lifecycle_df: pd.DataFrame, by="round_id") -> pd.DataFrame:
+    """생애주기 테이블 → 그룹별 정확한 reveal 비율 (by="round_id"면 라운드별, "voter"면 유권자 신뢰도)
+
+    Returns:
+        by 컬럼, commits, reveals, non_reveals, reveal_rate (소수 4자리, commit 없으면 NaN),
+        median_reveal_latency (초)
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    committed = lifecycle_df["committed"].to_numpy(dtype=bool)
+    frame = lifecycle_df[by].assign(
+        commits=committed,
+        reveals=committed & lifecycle_df["revealed"].to_numpy(dtype=bool),
+        latency=lifecycle_df["reveal_latency"].where(committed),
+    )
+    stats = frame.groupby(by).agg(
+        commits=("commits", "sum"),
+        reveals=("reveals", "sum"),
+        median_reveal_latency=("latency", "median"),
+    ).reset_index()
+    stats["non_reveals"] = stats["commits"] - stats["reveals"]
+    stats["reveal_rate"] = np.round(stats["reveals"] / stats["commits"].where(stats["commits"] > 0), 4)
+    return stats[[*by, "commits", "reveals", "non_reveals", "reveal_rate", "median_reveal_latency"]]
+
+
+# ─── 라운드별 투표권 집중도 ─────────────────────────────────────
+
+def build_round_power(votes_df: pd.DataFrame) -> pd.DataFrame:
+    """라운드별 공개 투표 토큰 가중치 집중도 (grouped_metrics 한 번 + 그룹 누적합)
+
+    한 유권자가 라운드 안 여러 요청에 공개해도 투표권은 같은 토큰 스냅샷이므로
+    (round_id, voter)별 최댓값을 그 라운드의 투표권으로 쓴다.
+
+    Returns:
+        round_id, voters, total_tokens, top_voter_share (%), swing_set (토큰 과반(>50%)에 필요한 최소 유권자 수),
+        top5/10/20_share, gini, hhi, nakamoto (51%), entropy, normalized_entropy, theil
+    """
+    power = votes_df.groupby(["round_id", "voter"], sort=False)["num_tokens"].max().reset_index()
+    power = power[power["num_tokens"] > 0]
+    metrics = grouped_metrics(power, "num_tokens", "round_id")
+    if metrics.empty:
+        return pd.DataFrame(columns=[
+            "round_id", "voters", "total_tokens", "top_voter_share", "swing_set",
+            "top5_share", "top10_share", "top20_share", "gini", "hhi", "nakamoto", "entropy", "normalized_entropy", "theil",
+        ])
+
+    # 라운드 안 토큰 내림차순 누적 점유율 → 과반을 넘기는 첫 순위
+    power = power.sort_values(["round_id", "num_tokens"], ascending=[True, False], kind="stable")
+    share = power["num_tokens"] / power.groupby("round_id")["num_tokens"].transform("sum")
+    within_half = (share.groupby(power["round_id"]).cumsum() <= 0.5).groupby(power["round_id"]).sum()
+    round_stats = pd.DataFrame({
+        "top_voter_share": np.round(share.groupby(power["round_id"]).max() * 100, 2),
+        "swing_set": np.minimum(within_half + 1, power.groupby("round_id").size()),
+    })
+
+    metrics = metrics.rename(columns={"sample_size": "voters", "total": "total_tokens"})
+    metrics = metrics.merge(round_stats, left_on="round_id", right_index=True, how="left")
+    columns = ["round_id", "voters", "total_tokens", "top_voter_share", "swing_set"]
+    return metrics[columns + [c for c in metrics.columns if c not in columns]]
+
+
 def save_data(df: pd.DataFrame, name: str):
     path = DATA_DIR / f"{name}.parquet"
     df.to_parquet(path, index=False)
     print(f"Saved: {path} ({len(df)} rows)")
 
 
-def main():
+def _request_keys(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """base 테이블 행의 (round_id, identifier, request_time) 키 컬럼"""
+    return df.rename(columns={REQUEST_TIME_COLUMNS[name]: "request_time"})[REQUEST_KEY]
+
+
+def affected_keys(tables: dict) -> pd.DataFrame:
+    """새로 디코딩한 이벤트가 닿은 (round_id, identifier, request_time) 키"""
+    keys = pd.concat([_request_keys(name, tables[name]) for name in REQUEST_TIME_COLUMNS], ignore_index=True)
+    return keys.drop_duplicates()
+
+
+def build_aggregates(tables: dict) -> dict:
+    """base 테이블 → AGGREGATE_TABLES 이름별 요청 단위 집계"""
+    return {
+        "uma_decoded_requests": build_decoded_requests(tables["requests"], tables["resolved"], tables["votes"]),
+        "uma_vote_lifecycle": build_vote_lifecycle(tables["commits"], tables["encrypted"], tables["votes"]),
+        "uma_round_power": build_round_power(tables["votes"]),
+    }
+
+
+def update_decoded_tables(new_tables: dict, incremental: bool) -> tuple:
+    """새 이벤트를 base 테이블에 이어 붙이고 집계 테이블 갱신
+
+    Returns:
+        (base 테이블 dict, 집계 테이블 dict)
+    """
+    if not incremental:
+        return new_tables, build_aggregates(new_tables)
+
+    base = {
+        name: append_rows(pd.read_parquet(DATA_DIR / f"{table}.parquet"), new_tables[name])
+        for name, table in BASE_TABLES.items()
+    }
+    base["ancillary"] = base["ancillary"].drop_duplicates("ancillary_key", ignore_index=True)
+
+    # 닿은 키의 이벤트만 모아 다시 집계 → 기존 집계 테이블의 해당 행 교체
+    keys = affected_keys(new_tables)
+    updated = build_aggregates({
+        name: base[name][key_mask(_request_keys(name, base[name]), keys)] for name in REQUEST_TIME_COLUMNS
+    })
+    print(f"  갱신 키: {len(keys)} (요청 행 {len(updated['uma_decoded_requests'])} 재계산)")
+
+    # 라운드 단위 집계는 닿은 라운드의 모든 투표로 다시 계산
+    round_keys = keys[["round_id"]].drop_duplicates()
+    updated["uma_round_power"] = build_round_power(base["votes"][key_mask(base["votes"], round_keys)])
+    replaced_keys = {name: keys for name in AGGREGATE_TABLES}
+    replaced_keys["uma_round_power"] = round_keys
+
+    aggregates = {
+        name: replace_keys(pd.read_parquet(DATA_DIR / f"{name}.parquet"), updated[name], replaced_keys[name], order_col=order_col)
+        for name, order_col in AGGREGATE_TABLES.items()
+    }
+    return base, aggregates
+
+
+def main(full: bool = False, workers: int = 1):
     print("=== UMA 이벤트 디코딩 시작 ===")
 
     events_path = DATA_DIR / "uma_voting_events.parquet"
     if not events_path.exists():
-        print(f"Error: {events_path} not found. Run uma_oracle.py first.")
+        print(f"Error: {events_path} not found. Run `python -m collectors.uma_oracle` first.")
         return
 
-    events_df = pd.read_parquet(events_path)
-    print(f"Loaded {len(events_df)} raw events")
-
-    # 디코딩
-    print("\n[1/3] PriceRequestAdded 디코딩...")
-    requests_df = decode_price_requests(events_df)
-    print(f"  {len(requests_df)} requests decoded")
-
-    print("\n[2/3] PriceResolved 디코딩...")
-    resolved_df = decode_price_resolved(events_df)
-    print(f"  {len(resolved_df)} resolutions decoded")
+    # 이전 결과가 모두 있어야 이어서 디코딩 가능
+    watermark = DecodeWatermark(STATE_PATH)
+    outputs = [DATA_DIR / f"{t}.parquet" for t in [*BASE_TABLES.values(), *AGGREGATE_TABLES]]
+    if full or not all(p.exists() for p in outputs):
+        watermark.reset()
+    incremental = watermark.last_block is not None
+    if incremental:
+        print(f"증분 디코딩: block > {watermark.last_block}")
+
+    # 필요한 topic0의 행만 읽고, 한 번의 패스로 세 이벤트 타입을 디코딩
+    events = read_raw_table(events_path, UMA_EVENTS, min_block=watermark.next_block)
+    print(f"Loaded {events.num_rows} raw events")
+    if incremental and events.num_rows == 0:
+        print("새 이벤트 없음")
+        return
 
-    print("\n[3/3] VoteRevealed 디코딩...")
-    votes_df = decode_vote_revealed(events_df)
-    print(f"  {len(votes_df)} votes decoded")
+    print("\n이벤트 디코딩 (PriceRequestAdded / PriceResolved / VoteCommitted / EncryptedVote / VoteRevealed)...")
+    # workers > 1이면 블록 구간 파티션별로 프로세스 풀에서 디코딩
+    tables = event_tables(decode_partitioned(events, UMA_EVENTS, workers=workers))
+    print(f"  {len(tables['requests'])} requests decoded")
+    print(f"  {len(tables['resolved'])} resolutions decoded")
+    print(f"  {len(tables['votes'])} votes decoded")
+    print(f"  {len(tables['commits'])} commits decoded ({len(tables['encrypted'])} encrypted)")
+    print(f"  {len(tables['ancillary'])} unique ancillary payloads")
 
     # 매칭 및 통계 집계
     print("\nRequest-Resolution 매칭 및 통계 집계...")
-    decoded_requests = build_decoded_requests(requests_df, resolved_df, votes_df)
+    base, aggregates = update_decoded_tables(tables, incremental)
+    decoded_requests = aggregates["uma_decoded_requests"]
 
     # 식별자 유형별 통계 출력
     print("\n--- 식별자 유형별 통계 ---")
@@ -309,12 +512,37 @@ def main():
             label = row.get("resolution_label", "Unknown")
             print(f"  Round {row['round_id']}: {label} (voters={row.get('num_voters', 0)}, consensus={row.get('consensus_rate', 0):.1%})")
 
-    # 저장
-    save_data(decoded_requests, "uma_decoded_requests")
-    save_data(votes_df, "uma_decoded_votes")
+    # commit → reveal 참여율 (commit 기준 정확한 비율)
+    lifecycle = aggregates["uma_vote_lifecycle"]
+    committed = lifecycle[lifecycle["committed"]]
+    if not committed.empty:
+        by_round = reveal_rates(lifecycle)
+        print("\n--- commit/reveal ---")
+        print(f"  commits: {len(committed)}, reveals: {int(committed['revealed'].sum())}, "
+              f"reveal rate: {committed['revealed'].mean():.1%}")
+        print(f"  median commit→reveal: {committed['reveal_latency'].median() / 3600:.1f}h")
+        print(f"  라운드별 reveal rate 중앙값: {by_round['reveal_rate'].median():.1%} ({len(by_round)} rounds)")
+
+    # 라운드별 실제 투표권 집중도
+    round_power = aggregates["uma_round_power"]
+    if not round_power.empty:
+        print(f"\n--- 라운드별 투표권 집중도 ({len(round_power)} rounds, 중앙값) ---")
+        print(f"  유권자: {round_power['voters'].median():.0f}, 과반 필요 유권자: {round_power['swing_set'].median():.0f}, "
+              f"최대 유권자 점유율: {round_power['top_voter_share'].median():.1f}%, 지니: {round_power['gini'].median():.3f}")
+
+    # 저장 (전부 저장한 뒤에 워터마크 전진)
+    for name, table_df in aggregates.items():
+        save_data(table_df, name)
+    for name, table in BASE_TABLES.items():
+        save_data(base[name], table)
+    watermark.advance(events)
 
     print("\n=== 디코딩 완료 ===")
 
 
 if __name__ == "__main__":
-    main()
+    args = sys.argv[1:]
+    main(
+        full="--full" in args,
+        workers=int(args[args.index("--workers") + 1]) if "--workers" in args else 1,
+    )
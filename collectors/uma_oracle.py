@@ -2,6 +2,8 @@
 UMA 오라클 데이터 수집 (Etherscan API)
 - 토큰 홀더 분포
 - 투표 컨트랙트 이벤트
+
+실행 (저장소 루트): python -m collectors.uma_oracle
 """
 
 import json
@@ -13,6 +15,8 @@ from pathlib import Path
 import pandas as pd
 import requests
 
+from collectors import event_registry
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
@@ -125,16 +129,8 @@ def collect_token_holders() -> pd.DataFrame:
     return df
 
 
-# topic0 해시 → 이벤트 이름 매핑 (keccak256 of event signatures)
-UMA_EVENT_NAMES = {
-    "0x8be0079c531659141344cd1fd0a4f28419497f9722a3daafe3b4186f6b6457e0": "OwnershipTransferred",
-    "0x5d80f93c41e95cacea0b9ce9bb825092d709fa503a70bb26ea3f536bf16946bd": "PriceRequestAdded",
-    "0x6beca723245953d9ed92ae4d320d4772838e841161bfff12c78ae4268df525eb": "VoteCommitted",
-    "0x0296c44e55ad4a025c9701a71c746d4275d63dfe301e390a7429551010a8fea1": "EncryptedVote",
-    "0x3fad5d37ee1be2f58ff1735699121a8ead73c3b70d02fc06d07b0db29854d3b4": "VoteRevealed",
-    "0xb1f1bf5aec084730c2c09f66ae2099185eaf6f951ddc113a19aa886a9f5e71b7": "PriceResolved",
-    "0x6fb9765a6e4b0dd2aaedad44f9b165a2a64a53ce67a6ec812075faa9220d41bc": "RewardsRetrieved",
-}
+# topic0 해시 → 이벤트 이름 매핑 (event_registry의 시그니처에서 keccak256 계산)
+UMA_EVENT_NAMES = event_registry.event_names((event_registry.UMA_VOTING,))
 
 # UMA Voting 첫 이벤트 블록 (2021-02-17)
 UMA_VOTING_START_BLOCK = 11876839
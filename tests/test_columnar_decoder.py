@@ -0,0 +1,44 @@
+"""
+columnar_decoder 동적 필드 경계 검사 (잘못된 로그 data)
+
+실행 (저장소 루트): python -m pytest tests
+"""
+
+import pandas as pd
+
+from collectors.columnar_decoder import EventColumns
+
+ZERO_TOPIC = "0x" + "00" * 32
+
+
+def word(value: int) -> str:
+    return f"{value % 2**256:064x}"
+
+
+def columns(*data_hex: str) -> EventColumns:
+    return EventColumns.from_frame(pd.DataFrame({"topic0": [ZERO_TOPIC] * len(data_hex), "data": ["0x" + d for d in data_hex]}))
+
+
+def test_malformed_dynamic_heads_are_empty():
+    cols = columns(
+        word(32) + word(3) + "616263".ljust(64, "0"),          # 정상: "abc"
+        word(32) + word(2**59) + word(1),                       # 원소 수 × 32가 int64를 넘어 0으로 감김
+        word(2**200 + 32) + word(3) + "616263".ljust(64, "0"),  # 하위 8바이트만 보면 정상 오프셋
+        word(2**63 - 1),                                        # 오프셋 + 32가 int64를 넘음
+        word(64) + word(1),                                     # 길이 word가 data 밖
+        word(32) + word(2**256 - 1),                            # 원소 수 = uint256 최댓값
+    )
+    assert cols.dynamic_text(0).tolist() == ["abc", "", "", "", "", ""]
+
+    # 배열로 읽으면 첫 행도 원소 3개(96바이트)가 data에 없으므로 모두 0개
+    words, counts = cols.dynamic_array(0)
+    assert counts.tolist() == [0] * 6
+    assert len(words) == 0
+
+
+def test_dynamic_array_within_bounds():
+    cols = columns(word(32) + word(2) + word(7) + word(9), word(32) + word(3) + word(7) + word(9))
+    words, counts = cols.dynamic_array(0)
+    assert counts.tolist() == [2, 0]
+    assert words.shape == (2, 32)
+    assert words[:, -1].tolist() == [7, 9]
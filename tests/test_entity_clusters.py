@@ -0,0 +1,126 @@
+"""
+entity_clusters 증분 실행 = 전체 재계산 검증
+
+실행 (저장소 루트): python -m pytest tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from collectors import entity_clusters
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """entity_clusters의 data 경로를 임시 디렉터리로 교체"""
+    monkeypatch.setattr(entity_clusters, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(entity_clusters, "ADDRESSES_PATH", tmp_path / "entity_addresses.parquet")
+    monkeypatch.setattr(entity_clusters, "PAIRS_PATH", tmp_path / "entity_pairs.parquet")
+    monkeypatch.setattr(entity_clusters, "LABELS_PATH", tmp_path / "address_labels.csv")
+    monkeypatch.setattr(entity_clusters, "STATE_PATH", str(tmp_path / "entity_state_{chain}.json"))
+    return tmp_path
+
+
+def synthetic_transfers(seed: int, chains: tuple = ("ethereum",), n: int = 3000, n_addresses: int = 400,
+                        seconds: int = 12000) -> pd.DataFrame:
+    """주소 일부가 대/소문자 섞여 나오는 시간 순 전송 로그
+
+    Ethereum은 12초당 블록 하나, Arbitrum은 초당 블록 4개 (블록 번호 척도가 다름).
+    """
+    rng = np.random.default_rng(seed)
+    pool = np.array([f"0x{i:040x}" for i in range(n_addresses)], dtype=object)
+    # 소수의 자금원 주소가 입금을 많이 보냄 → 공통 자금원 클러스터
+    sender = np.where(rng.random(n) < 0.3, rng.integers(0, 10, n), rng.integers(0, n_addresses, n))
+    chain = np.array(chains, dtype=object)[rng.integers(0, len(chains), n)]
+    arbitrum = chain == "arbitrum"
+    block = np.where(arbitrum, rng.integers(0, seconds * 4, n), rng.integers(0, seconds // 12, n))
+    df = pd.DataFrame({
+        "from": pool[sender],
+        "to": pool[rng.integers(0, n_addresses, n)],
+        "block_number": block,
+        "timestamp": np.where(arbitrum, block // 4, block * 12),
+        "chain": chain,
+    }).sort_values(["chain", "block_number"], kind="stable", ignore_index=True)
+    upper = rng.random(n) < 0.1
+    df.loc[upper, "from"] = df.loc[upper, "from"].str.upper().str.replace("0X", "0x")
+    return df
+
+
+def write_sources(data_dir, sources: dict, max_blocks: dict = None):
+    """max_blocks: {체인: 마지막 블록} — 그 블록까지만 수집된 로그를 씀"""
+    for name, df in sources.items():
+        if max_blocks is not None:
+            limit = df["chain"].map(max_blocks).fillna(np.inf)
+            df = df[df["block_number"] <= limit]
+        if name == "uma_transfers":
+            df = df.drop(columns="chain")
+        df.to_parquet(data_dir / f"{name}.parquet", index=False)
+
+
+def read_state(data_dir) -> tuple:
+    addresses = pd.read_parquet(data_dir / "entity_addresses.parquet")
+    pairs = pd.read_parquet(data_dir / "entity_pairs.parquet").sort_values(["a", "b"], ignore_index=True)
+    return addresses, pairs
+
+
+def two_chain_sources(seed: int) -> dict:
+    return {
+        "uma_transfers": synthetic_transfers(seed),
+        "kleros_transfers": synthetic_transfers(seed + 1, chains=("ethereum", "arbitrum")),
+    }
+
+
+def test_incremental_equals_full(data_dir):
+    sources = two_chain_sources(1)
+
+    # 전체 재계산
+    write_sources(data_dir, sources)
+    entity_clusters.main(full=True)
+    full_addresses, full_pairs = read_state(data_dir)
+
+    # 같은 로그를 여러 경계에서 나눠 증분 실행 (로그/체인마다 뒤처진 정도가 다르고,
+    # Arbitrum은 한 초의 블록 일부만 수집된 상태에서 끊김)
+    for path in data_dir.glob("entity_*"):
+        path.unlink()
+    write_sources(data_dir, sources, {"ethereum": 300, "arbitrum": 14401})
+    entity_clusters.main()
+    write_sources(data_dir, {"uma_transfers": sources["uma_transfers"]}, {"ethereum": 700})
+    write_sources(data_dir, {"kleros_transfers": sources["kleros_transfers"]}, {"ethereum": 650, "arbitrum": 22002})
+    entity_clusters.main()
+    write_sources(data_dir, sources)
+    entity_clusters.main()
+    incremental_addresses, incremental_pairs = read_state(data_dir)
+
+    pd.testing.assert_frame_equal(incremental_addresses, full_addresses)
+    pd.testing.assert_frame_equal(incremental_pairs, full_pairs)
+
+
+def test_first_funder_is_earliest_transfer(data_dir):
+    sources = two_chain_sources(3)
+    write_sources(data_dir, sources)
+    entity_clusters.main(full=True)
+    addresses, _ = read_state(data_dir)
+
+    # 두 로그를 합친 시간 순서에서 주소별 첫 입금의 보낸 주소 (가장 뒤처진 로그의 마지막 초는 제외)
+    transfers = pd.concat(sources.values(), ignore_index=True)
+    horizon = transfers.groupby("chain")["timestamp"].max().min()
+    transfers = entity_clusters.clean_transfers(transfers[transfers["timestamp"] < horizon])
+    expected = transfers.drop_duplicates("to").set_index("to")["from"]
+    funded = addresses[addresses["first_funder"].notna()].set_index("address")["first_funder"]
+    assert funded.to_dict() == expected.to_dict()
+
+
+def test_cross_chain_order_uses_timestamp(data_dir):
+    a, b, c, d, e, x = (f"0x{i:040x}" for i in range(1, 7))
+    # x는 Arbitrum에서 먼저(블록 번호는 더 큼) a에게, 나중에 Ethereum에서 b에게 받음
+    pd.DataFrame({
+        "from": [a, c], "to": [x, d], "block_number": [400_000, 500_000],
+        "timestamp": [100, 1000], "chain": ["arbitrum", "arbitrum"],
+    }).to_parquet(data_dir / "kleros_transfers.parquet", index=False)
+    pd.DataFrame({
+        "from": [b, c], "to": [x, e], "block_number": [20, 90], "timestamp": [240, 1080],
+    }).to_parquet(data_dir / "uma_transfers.parquet", index=False)
+    entity_clusters.main(full=True)
+    addresses, _ = read_state(data_dir)
+    assert addresses.set_index("address").loc[x, "first_funder"] == a
@@ -0,0 +1,22 @@
+"""
+수집기의 topic0 → 이벤트 이름 매핑 검증
+
+실행 (저장소 루트): python -m pytest tests
+"""
+
+from collectors import event_registry, kleros_oracle, uma_oracle
+
+
+def test_uma_event_names_cover_voting_events():
+    expected = {event.topic0: event.name for event in event_registry.events_for((event_registry.UMA_VOTING,))}
+    assert uma_oracle.UMA_EVENT_NAMES == expected
+    assert {"VoteCommitted", "EncryptedVote", "VoteRevealed", "PriceRequestAdded", "PriceResolved"} <= set(
+        uma_oracle.UMA_EVENT_NAMES.values()
+    )
+
+
+def test_kleros_event_names_cover_court_events():
+    contracts = (event_registry.KLEROS_CORE, event_registry.DISPUTE_KIT_CLASSIC)
+    expected = {event.topic0: event.name for event in event_registry.events_for(contracts)}
+    assert kleros_oracle.KLEROS_EVENT_NAMES == expected
+    assert {"DisputeCreation", "Draw", "VoteCast", "Ruling"} <= set(kleros_oracle.KLEROS_EVENT_NAMES.values())